@@ -0,0 +1,788 @@
+import asyncio
+import os
+import random
+import re
+import time
+import uuid
+from urllib.parse import urljoin
+
+from loguru import logger
+from playwright.async_api import async_playwright, TimeoutError
+
+from core.cancel import CancelToken, ScrapeCancelled
+from core.images import image_fetch_url, image_key
+from core.logs import reset_log_context, set_log_context
+from core.profiling import RunProfiler
+from core.progress import ScrapeProgress
+from core.ratelimit import parse_retry_after
+from core.report import RunReport
+from core.rows import OrderItem, OrderRows
+from core.scraper import JDScraper, STEALTH_INIT_SCRIPT
+
+
+# 一次 evaluate 取回整页订单的原始字段，选择器与 JDScraper._parse_row 保持一致
+ORDER_ROWS_JS = """(tbodies) => tbodies.map(tbody => {
+    const text = (el) => (el && el.innerText ? el.innerText.trim() : '');
+    const trTh = tbody.querySelector('tr.tr-th');
+    if (!trTh) return null;
+    const idEl = trTh.querySelector("a[name='orderIdLinks']");
+    const dateEl = trTh.querySelector('span.dealtime');
+    const shopEl = trTh.querySelector('.shop-name a');
+    const detailEl = Array.from(tbody.querySelectorAll('a')).find(a => (a.textContent || '').includes('订单详情'));
+    let rows = Array.from(tbody.querySelectorAll('tr.tr-bd'));
+    if (!rows.length) rows = [tbody];
+    const items = rows
+        .filter(row => !(row.getAttribute('class') || '').includes('sep-tr-bd'))
+        .map(row => {
+            const nameEl = row.querySelector('.p-name a, .p-name em, .p-name');
+            const skuEl = row.querySelector('[data-sku]') || row.querySelector('.p-sku');
+            const numEl = row.querySelector('.goods-number, .goods-number em, .goods-num');
+            const priceEl = row.querySelector('.amount span') || row.querySelector('.p-price strong');
+            const imgEl = row.querySelector('.p-img img');
+            return {
+                name: text(nameEl),
+                link: nameEl ? (nameEl.getAttribute('href') || '') : '',
+                sku: skuEl ? (skuEl.getAttribute('data-sku') || text(skuEl)) : '',
+                qty: text(numEl),
+                price: priceEl ? text(priceEl).replace('¥', '').trim() : '',
+                img_src: imgEl ? (imgEl.getAttribute('src') || '') : '',
+                img_lazy: imgEl ? (imgEl.getAttribute('data-lazy-img') || '') : '',
+            };
+        });
+    return {
+        tbody_id: tbody.id || '',
+        order_id: text(idEl),
+        order_time: dateEl ? (dateEl.getAttribute('title') || '') : '',
+        header_text: text(trTh),
+        shop: text(shopEl),
+        status: text(tbody.querySelector('.order-status')),
+        is_split: (tbody.getAttribute('class') || '').includes('split-tbody') || !!tbody.getAttribute('data-parentid'),
+        receiver: text(tbody.querySelector('.consignee, td.consignee, .consignee a')),
+        detail_href: detailEl ? (detailEl.getAttribute('href') || '') : '',
+        items: items,
+    };
+}).filter(Boolean)"""
+
+
+class AsyncJDScraper(JDScraper):
+    """
+    基于 playwright.async_api 的采集引擎，与 JDScraper 的 login/scrape_orders 约定及返回结构一致。
+    列表翻页、订单详情与商品图片以并发任务运行，共用同一组限速器。
+    只有 login / scrape_orders 以同名协程覆盖父类；其余协程助手一律以 _a / a 前缀另起名字，
+    继承下来的同步方法（导出线程里的取图与限速、_release_browser、maintain_profiles 等）仍调用同步实现。
+    """
+
+    def __init__(self, headless=False):
+        super().__init__(headless=headless)
+        self.http = None
+        self.detail_workers = max(1, self._safe_int(os.getenv("JD_ASYNC_DETAIL_WORKERS", "1"), default=1))
+        self.image_workers = max(1, self._safe_int(os.getenv("JD_ASYNC_IMAGE_WORKERS", "4"), default=4))
+        self._alock = asyncio.Lock()
+        self._detail_pages = []
+        self._image_cache = {}
+
+    def prelaunch(self, mode: str = None):
+        # 浏览器在 scrape_orders/login 的事件循环里启动，同步驱动无法被协程复用
+        return False
+
+    async def _acancel_wait(self, seconds: float) -> bool:
+        """CancelToken.wait 的协程版：分片睡眠，取消后立即返回 True。"""
+        deadline = time.monotonic() + seconds
+        while not self.cancel_token.cancelled:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(0.2, remaining))
+        return True
+
+    async def _arate_limit(self, kind: str):
+        wait_s = self.limiters[kind].reserve()
+        if wait_s > 0:
+            start = time.monotonic()
+            await self._acancel_wait(wait_s)
+            self.report.add_sleep(f"rate_{kind}", time.monotonic() - start)
+
+    async def _asleep(self, min_s=1.5, max_s=4.0):
+        delay = random.uniform(min_s, max_s)
+        start = time.monotonic()
+        await self._acancel_wait(delay)
+        self.report.add_sleep("random", time.monotonic() - start)
+
+    async def _await_networkidle(self, page, default_ms: int = 12000):
+        timeout = self.latency.networkidle_timeout_ms("networkidle", default_ms)
+        if timeout is None:
+            return False
+        try:
+            with self._track_latency("networkidle"):
+                await page.wait_for_load_state("networkidle", timeout=timeout)
+            return True
+        except TimeoutError:
+            return False
+
+    async def _aapply_window_state(self, page):
+        if not page or not (self.window_maximized or self.force_window_size):
+            return
+        try:
+            session = await self.context.new_cdp_session(page)
+            info = await session.send("Browser.getWindowForTarget")
+            window_id = info.get("windowId")
+            if not window_id:
+                return
+            if self.window_maximized:
+                bounds = {"windowState": "maximized"}
+            else:
+                bounds = {"width": self.window_width, "height": self.window_height}
+            await session.send("Browser.setWindowBounds", {"windowId": window_id, "bounds": bounds})
+        except Exception:
+            pass
+
+    async def astart_browser(self, use_storage: bool = True):
+        logger.info("Launching async browser (Headless={headless})...", headless=self.headless)
+        self.playwright = await async_playwright().start()
+        launch_args = self._launch_args()
+        load_options = {"storage_state": self.auth_file} if (use_storage and os.path.exists(self.auth_file)) else {}
+        context_options = self._context_options()
+
+        if self.use_persistent_context:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            last_err = None
+            for channel in self._launch_channels():
+                kwargs = dict(
+                    user_data_dir=str(self.profile_dir),
+                    headless=self.headless,
+                    args=launch_args,
+                    ignore_default_args=["--enable-automation"],
+                    **context_options,
+                    **load_options,
+                )
+                if channel:
+                    kwargs["channel"] = channel
+                try:
+                    logger.info("Persistent context channel: {channel}", channel=channel or "bundled")
+                    launch_started = time.monotonic()
+                    self.context = await self.playwright.chromium.launch_persistent_context(**kwargs)
+                    last_err = None
+                    if self.launch_state.get("channel") != (channel or "bundled"):
+                        logger.info("记住可用浏览器通道: {channel}", channel=channel or "bundled")
+                    # 写 launch.json 放到线程里，不阻塞事件循环
+                    await asyncio.to_thread(self._remember_channel, channel, time.monotonic() - launch_started)
+                    break
+                except Exception as e:
+                    last_err = e
+            if last_err:
+                logger.warning(
+                    "Persistent context launch failed, fallback to normal context: {err}", err=last_err
+                )
+                self.use_persistent_context = False
+            else:
+                self.browser = self.context.browser
+
+        if not self.use_persistent_context:
+            last_err = None
+            for channel in (None, "msedge", "chrome"):
+                try:
+                    kwargs = {"channel": channel} if channel else {}
+                    self.browser = await self.playwright.chromium.launch(
+                        headless=self.headless,
+                        args=launch_args,
+                        ignore_default_args=["--enable-automation"],
+                        **kwargs,
+                    )
+                    last_err = None
+                    break
+                except Exception as e:
+                    last_err = e
+            if last_err:
+                raise last_err
+            self.context = await self.browser.new_context(**context_options, **load_options)
+
+        await self.context.add_init_script(STEALTH_INIT_SCRIPT)
+        pages = self.context.pages
+        if pages:
+            self.page = pages[0]
+            for extra in pages[1:]:
+                try:
+                    await extra.close()
+                except Exception:
+                    pass
+        else:
+            self.page = await self.context.new_page()
+        await self._aapply_window_state(self.page)
+        try:
+            await self.stealth.apply_stealth_async(self.context)
+        except Exception as e:
+            logger.warning("Stealth apply failed: {err}", err=e)
+        self.context.set_default_timeout(self.action_timeout_ms)
+        self.context.set_default_navigation_timeout(self._timeout("goto", 20000))
+
+    async def aclose_browser(self):
+        for page in self._detail_pages:
+            try:
+                await page.close()
+            except Exception:
+                pass
+        self._detail_pages = []
+        if self.context:
+            try:
+                await self.context.close()
+            except Exception:
+                pass
+            self.context = None
+        if self.browser:
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+            self.browser = None
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+        self.page = None
+        self.latency.save()
+        self.limiters.save()
+
+    async def _adetect_risk_page(self, page):
+        url = (page.url or "").lower()
+        if "passport.jd.com" in url:
+            return ""
+        for kw in self.risk_url_keywords:
+            if kw in url:
+                return f"url:{kw}"
+        if not self.risk_text_check:
+            return ""
+        try:
+            haystack = f"{await page.title()}\n" + (await page.evaluate(
+                "() => (document.body && document.body.innerText) ? document.body.innerText.slice(0, 2000) : ''"
+            ) or "")
+        except Exception:
+            return ""
+        for kw in self.risk_text_keywords:
+            if kw in haystack:
+                return f"text:{kw}"
+        return ""
+
+    async def _ahandle_risk_page(self, page, reason: str, fatal: bool = True, wait_s: int = None):
+        if not reason:
+            return False
+        logger.warning("Detected risk page ({reason}).", reason=reason)
+        self._bump_backoff("page", factor=2.0)
+        self._bump_backoff("detail", factor=2.0)
+        wait_s = max(5, self.risk_wait_s if wait_s is None else wait_s)
+        if self.headless:
+            if fatal:
+                raise Exception(f"检测到风控/验证码页，请人工处理后重试: {reason}")
+            return True
+        start = time.time()
+        while time.time() - start < wait_s:
+            if await self._acancel_wait(2):
+                raise ScrapeCancelled("风控等待期间取消")
+            if not await self._adetect_risk_page(page):
+                logger.success("Risk page cleared manually.")
+                return False
+        if fatal:
+            raise Exception(f"风控页面未解除，请稍后重试: {reason}")
+        return True
+
+    async def _agoto_with_retry(self, url: str, wait_until="domcontentloaded", retries: int = None, timeout: int = None):
+        retries = retries or self.goto_retries
+        timeout = timeout or self._timeout("goto", 20000)
+        last_err = None
+        for attempt in range(1, retries + 1):
+            self.cancel_token.check()
+            try:
+                await self._arate_limit("page")
+                with self._track_latency("goto"):
+                    await self.page.goto(url, wait_until=wait_until, timeout=timeout)
+                reason = await self._adetect_risk_page(self.page)
+                if reason:
+                    await self._ahandle_risk_page(self.page, reason, fatal=True)
+                self._decay_backoff("page")
+                logger.info("Goto success [{attempt}/{retries}]: {url}", attempt=attempt, retries=retries, url=url)
+                return True
+            except ScrapeCancelled:
+                raise
+            except Exception as e:
+                last_err = e
+                logger.warning("Goto失败({attempt}/{retries}): {url} -> {err}", attempt=attempt, retries=retries, url=url, err=e)
+                self._bump_backoff("page")
+                await self._asleep(1.2, 2.5)
+        if last_err:
+            raise last_err
+
+    async def _ahas_auth_cookies(self):
+        try:
+            cookies = await self.context.cookies()
+        except Exception:
+            return False
+        now = time.time()
+        valid = set()
+        for c in cookies:
+            val = (c.get("value") or "").strip()
+            exp = c.get("expires")
+            if not val or val.lower() in ("deleted", "null", "undefined"):
+                continue
+            if exp and 0 < exp < now:
+                continue
+            valid.add(c.get("name"))
+        return "pt_key" in valid and "pt_pin" in valid
+
+    async def _await_auth_cookie(self, timeout=300000):
+        deadline = time.time() + (timeout / 1000)
+        while time.time() < deadline:
+            if await self._ahas_auth_cookies():
+                return True
+            for p in self.context.pages:
+                current_url = p.url or ""
+                if any(s in current_url for s in ("order.jd.com", "home.jd.com", "user.jd.com", "joycenter.jd.com")):
+                    self.page = p
+                    return True
+            await asyncio.sleep(1.0)
+        raise TimeoutError("等待登录 Cookie 超时")
+
+    async def login(self, force_fresh: bool = False, relogin: bool = False):
+        """Manually login and save state."""
+        async with self._alock:
+            log_token = set_log_context(profile=self.profile_name, phase="login")
+            try:
+                return await self._alogin_locked(force_fresh=force_fresh, relogin=relogin)
+            finally:
+                reset_log_context(log_token)
+
+    async def _alogin_locked(self, force_fresh: bool = False, relogin: bool = False):
+        logger.info("Starting async login process...")
+        if force_fresh:
+            self._rotate_profile("login", relogin=relogin)
+        if not self.browser and not self.context:
+            self.headless = False
+            await self.astart_browser(use_storage=not force_fresh)
+        if force_fresh:
+            try:
+                await self.context.clear_cookies()
+            except Exception:
+                pass
+        try:
+            if os.path.exists(self.auth_file) and not force_fresh:
+                await self._agoto_with_retry(f"{self.base_url}?s=4096")
+                await self._await_networkidle(self.page, 20000)
+                if "passport.jd.com" not in self.page.url:
+                    logger.success("会话有效，已打开我的订单列表。")
+                    await self.context.storage_state(path=self.auth_file)
+                    return True
+                logger.warning("会话已失效，转为扫码登录（不再复用旧存储状态）。")
+                await self.aclose_browser()
+                self.headless = False
+                await self.astart_browser(use_storage=False)
+
+            await self._arate_limit("page")
+            await self.page.goto("https://passport.jd.com/new/login.aspx", wait_until="domcontentloaded", timeout=60000)
+            logger.info("Please scan the QR code to login...")
+            await self._await_auth_cookie(timeout=300000)
+            for _ in range(2):
+                try:
+                    await self._agoto_with_retry(f"{self.base_url}?s=4096", retries=2)
+                except Exception as nav_err:
+                    logger.warning("订单页跳转失败重试: {err}", err=nav_err)
+                if "passport.jd.com" not in self.page.url:
+                    break
+                await asyncio.sleep(2)
+            else:
+                raise Exception("登录未生效，请重试扫码。")
+            logger.success("Login detected! Saving state and continuing.")
+            await self.context.storage_state(path=self.auth_file)
+            return True
+        except Exception as e:
+            logger.error("Login failed: {err}", err=e)
+            return False
+        finally:
+            await self.aclose_browser()
+
+    async def scrape_orders(self, year_filter="1", progress_cb=None, cancel_token=None):
+        """
+        Pipelined scraping: list pages, detail lookups and image fetches overlap.
+        progress_cb / cancel_token: same contract as JDScraper.scrape_orders; on cancel the
+        browser is closed and the rows collected so far are exported with status "cancelled".
+        """
+        async with self._alock:
+            self.run_id = uuid.uuid4().hex[:12]
+            log_token = set_log_context(run_id=self.run_id, profile=self.profile_name, phase="launch")
+            try:
+                self.progress = ScrapeProgress(progress_cb, self.limiters)
+                self.cancel_token = cancel_token or CancelToken()
+                self.report = RunReport()
+                self.profiler = RunProfiler.from_env()
+                if self.profiler.scope == "scrape":
+                    self.profiler.start()
+                try:
+                    result = await self._ascrape_locked(year_filter)
+                finally:
+                    self.profiler.stop()
+                if isinstance(result, dict):
+                    result["run_id"] = self.run_id
+                self._write_run_report(result, year_filter)
+                return result
+            finally:
+                reset_log_context(log_token)
+
+    async def _ascrape_locked(self, year_filter="1"):
+        logger.info("Starting async scrape task. Filter d={year_filter}", year_filter=year_filter)
+        if not os.path.exists(self.auth_file):
+            logger.warning("auth.json 未找到，自动弹出浏览器进行扫码登录...")
+            if not await self.login():
+                return {"status": "error", "message": "登录失败或超时，请扫码完成后再试。"}
+
+        if not self.context:
+            await self.astart_browser()
+
+        orders = OrderRows()
+        detail_queue = asyncio.Queue()
+        image_tasks = {}
+        image_sem = asyncio.Semaphore(self.image_workers)
+        detail_tasks = []
+        try:
+            if self.fetch_address:
+                detail_tasks = [
+                    asyncio.create_task(self._adetail_worker(detail_queue))
+                    for _ in range(self.detail_workers)
+                ]
+            url = f"{self.base_url}?d={year_filter}&s=4096"
+            await self._agoto_with_retry(url)
+            await self._await_networkidle(self.page, 20000)
+            self.progress.update(stage="list", force=True)
+
+            page_num = 1
+            queued_orders = set()
+            seen_orders = set()
+            while True:
+                self.cancel_token.check()
+                logger.info("Processing Page {page}...", page=page_num)
+                if "passport.jd.com" in self.page.url:
+                    raise Exception("Session expired. Please re-login.")
+                rows = await self._aread_order_rows(page_num)
+                if rows is None:
+                    logger.error(
+                        "Failed to parse page {page_num} after retries. Stopping to preserve data.", page_num=page_num
+                    )
+                    break
+                logger.info("Found {rows} order entries on page {page}.", rows=len(rows), page=page_num)
+                for raw in rows:
+                    self.cancel_token.check()
+                    items, detail_url = self._build_items(raw)
+                    orders.extend(items)
+                    order_id = items[0]["订单"] if items else ""
+                    if order_id:
+                        seen_orders.add(order_id)
+                    if self.fetch_address and detail_url and order_id and order_id not in queued_orders:
+                        queued_orders.add(order_id)
+                        detail_queue.put_nowait((order_id, detail_url))
+                    if self.embed_images:
+                        for item in items:
+                            img = item["商品图片"]
+                            # 按归一 key 建任务：同一张图的尺寸/镜像变体共用一次请求
+                            key = image_key(img) if img else ""
+                            if key and key not in image_tasks:
+                                image_tasks[key] = asyncio.create_task(self._afetch_image(img, key, image_sem))
+                self.progress.update(detail_pending=detail_queue.qsize(), images_total=len(image_tasks))
+                self.progress.page_done(page_num, len(seen_orders), len(orders))
+
+                if self.address_blocked:
+                    raise Exception(f"地址抓取被登录重定向中断: {self.address_blocked_reason}")
+                last_first_id = rows[0].get("tbody_id") if rows else None
+                if not await self._ago_next_page(last_first_id):
+                    logger.success("Reached last page or pagination blocked.")
+                    break
+                page_num += 1
+
+            if detail_tasks:
+                self.progress.update(stage="detail", force=True)
+                await self._await_detail_queue(detail_queue, detail_tasks)
+            if image_tasks:
+                await asyncio.gather(*image_tasks.values(), return_exceptions=True)
+            # 取消时 worker 与图片任务跳过剩余工作，上面的等待很快返回
+            self.cancel_token.check()
+            if self.address_blocked:
+                raise Exception(f"地址抓取被登录重定向中断: {self.address_blocked_reason}")
+            orders.fill_by_order("地址", self.address_cache)
+
+            return await asyncio.to_thread(self._export_orders, orders, self._cached_image)
+        except ScrapeCancelled:
+            return await self._aflush_cancelled(orders, detail_tasks + list(image_tasks.values()))
+        except Exception as e:
+            logger.error("Critical Scraping Error: {err}", err=e)
+            return {"status": "error", "message": str(e)}
+        finally:
+            for task in detail_tasks + list(image_tasks.values()):
+                task.cancel()
+            # 图片字节只在本次导出期间有用；不清理的话 daemon/bench 反复运行时内存随累计行数增长
+            self._image_cache.clear()
+            # 取消时 _aflush_cancelled 已关闭浏览器并落盘
+            if self.context or self.browser or self.playwright:
+                await self.aclose_browser()
+
+    async def _aflush_cancelled(self, orders, tasks):
+        """与 JDScraper._flush_cancelled 相同：停掉详情/图片任务、关闭浏览器后写出已采集的行（已取得的地址照常填入）。"""
+        logger.warning("采集已取消，保存已采集的 {rows} 行。", rows=len(orders))
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        orders.fill_by_order("地址", self.address_cache)
+        try:
+            await self.aclose_browser()
+        except Exception as e:
+            logger.debug("close browser after cancel failed: {err}", err=e)
+        result = await asyncio.to_thread(self._export_orders, orders)
+        if result.get("status") == "success":
+            result["status"] = "cancelled"
+            result["message"] = "采集已取消，已保存部分结果"
+        return result
+
+    async def _aread_order_rows(self, page_num: int, max_retries: int = 3):
+        for attempt in range(1, max_retries + 1):
+            try:
+                reason = await self._adetect_risk_page(self.page)
+                if reason:
+                    await self._ahandle_risk_page(self.page, reason, fatal=True)
+                with self._track_latency("selector"):
+                    await self.page.wait_for_selector("table.order-tb", timeout=self._timeout("selector", 8000))
+                with self._track_latency("selector"):
+                    await self.page.wait_for_selector("tbody[id^='tb-']", timeout=self._timeout("selector", 8000))
+                rows = await self.page.eval_on_selector_all("tbody[id^='tb-']", ORDER_ROWS_JS)
+                if not rows:
+                    raise Exception("页面没有找到订单列表")
+                return rows
+            except ScrapeCancelled:
+                raise
+            except Exception as pg_err:
+                logger.warning("Error parsing page {page}: {err}. Retrying ({attempt}/{retries})...",
+                               page=page_num, err=pg_err, attempt=attempt, retries=max_retries)
+                self._bump_backoff("page")
+                await self._asleep(2, 4)
+                try:
+                    await self.page.reload()
+                except Exception:
+                    pass
+        return None
+
+    def _build_items(self, raw: dict):
+        """把 ORDER_ROWS_JS 的原始字段整理为与 JDScraper._parse_row 相同的中文字段行。"""
+        order_id = raw.get("order_id") or raw.get("tbody_id", "").replace("tb-order-", "").replace("tb-", "")
+        order_time = raw.get("order_time") or ""
+        if not order_time:
+            parts = (raw.get("header_text") or "").strip().split(" ")
+            order_time = f"{parts[0]} {parts[1]}" if len(parts) >= 2 else ""
+        detail_url = raw.get("detail_href") or ""
+        if detail_url.startswith("//"):
+            detail_url = "https:" + detail_url
+        elif detail_url.startswith("/"):
+            detail_url = urljoin(self.base_url, detail_url)
+        if not detail_url and order_id:
+            detail_url = self.detail_url_template.format(order_id=order_id)
+
+        items = []
+        for it in raw.get("items") or []:
+            product_name = it.get("name") or ""
+            if not product_name:
+                continue
+            link = it.get("link") or ""
+            if link.startswith("//"):
+                link = "https:" + link
+            sku = (it.get("sku") or "").strip()
+            if not sku and link:
+                m = re.search(r"/(\d+)\.html", link)
+                if m:
+                    sku = m.group(1)
+            qty = self._extract_number(it.get("qty")) or 1
+            price = it.get("price") or ""
+            try:
+                amount_val = float(price) * int(qty)
+            except Exception:
+                amount_val = price or ""
+            img_src = it.get("img_src") or ""
+            lazy = it.get("img_lazy")
+            if lazy and lazy != "done":
+                img_src = lazy
+            if img_src.startswith("//"):
+                img_src = "https:" + img_src
+            items.append(OrderItem(
+                order_time=order_time,
+                order_id=order_id,
+                name=product_name,
+                sku=sku,
+                quantity=qty,
+                amount=amount_val,
+                receiver=raw.get("receiver") or "",
+                address="",
+                shop=raw.get("shop") or "自营/未知",
+                status=raw.get("status") or "",
+                is_split=bool(raw.get("is_split")),
+                image=img_src,
+            ))
+        return items, detail_url
+
+    async def _adetail_worker(self, queue: asyncio.Queue):
+        page = None
+        while True:
+            order_id, detail_url = await queue.get()
+            try:
+                # 建页放在 try 内：失败时照样 task_done，异常让 worker 退出，由 _await_detail_queue 让整次采集失败
+                if page is None:
+                    page = await self.context.new_page()
+                    self._detail_pages.append(page)
+                    await self._aapply_window_state(page)
+                if not (self.address_blocked or self.cancel_token.cancelled) and order_id not in self.address_cache:
+                    await self._aget_order_address(page, order_id, detail_url)
+            finally:
+                queue.task_done()
+                self.progress.update(detail_pending=queue.qsize(), detail_done=self.progress.state["detail_done"] + 1)
+
+    async def _await_detail_queue(self, queue: asyncio.Queue, workers: list):
+        """等待详情队列处理完；任一 worker 提前退出（如建页失败）时抛出其异常，而不是永远卡在 join()。"""
+        join_task = asyncio.create_task(queue.join())
+        try:
+            done, _ = await asyncio.wait([join_task, *workers], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not join_task.done():
+                join_task.cancel()
+        if join_task in done:
+            return
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+        raise RuntimeError("订单详情 worker 意外退出")
+
+    async def _aget_order_address(self, page, order_id: str, detail_url: str):
+        """进入订单详情页提取地址（与同步版相同的选择器与回退顺序）。"""
+        info_text = ""
+        try:
+            await self._arate_limit("detail")
+            with self._track_latency("detail"):
+                await page.goto(detail_url, wait_until="domcontentloaded", timeout=self._timeout("detail", 20000))
+            if "passport.jd.com" in (page.url or ""):
+                self.address_blocked = True
+                self.address_blocked_reason = "detail_redirect_to_passport"
+                return ""
+            reason = await self._adetect_risk_page(page)
+            if reason and await self._ahandle_risk_page(page, reason, fatal=False):
+                self.address_blocked = True
+                self.address_blocked_reason = f"detail_risk:{reason}"
+                return ""
+            try:
+                with self._track_latency("selector"):
+                    await page.wait_for_selector(".item .label, .addr, .info-rcol", timeout=self._timeout("selector", 8000))
+            except TimeoutError:
+                logger.warning("订单详情未及时加载地址元素: {order_id}", order_id=order_id)
+            info_text = await page.evaluate(
+                """() => {
+                    const label = Array.from(document.querySelectorAll('span.label')).find(el => /地址/.test(el.textContent || ''));
+                    if (label) {
+                        const container = label.closest('.item') || label.parentElement;
+                        const info = container ? container.querySelector('.info-rcol') : null;
+                        if (info && info.textContent.trim()) return info.textContent.trim();
+                    }
+                    const fallback = document.querySelector('.info-rcol, .addr');
+                    if (fallback && fallback.innerText.trim()) return fallback.innerText.trim();
+                    const textNodes = Array.from(document.querySelectorAll('body *'))
+                        .map(el => el.textContent ? el.textContent.trim() : '')
+                        .filter(t => t && /地址/.test(t));
+                    if (!textNodes.length) return '';
+                    const cand = textNodes.find(t => t.length < 200) || textNodes[0];
+                    const parts = cand.split(/[:：]/);
+                    return parts.length > 1 ? parts.slice(1).join(':').trim() : cand;
+                }"""
+            ) or ""
+            info_text = re.sub(r"\s+", " ", info_text).strip()
+            self.address_cache[order_id] = info_text
+            self._decay_backoff("detail")
+            await self._asleep(self.address_pause_min, self.address_pause_max)
+        except ScrapeCancelled:
+            raise
+        except Exception as e:
+            logger.warning("获取订单地址失败 {order_id}: {err}", order_id=order_id, err=e)
+            self._bump_backoff("detail")
+            self.address_cache[order_id] = ""
+        if not info_text:
+            logger.warning("订单地址为空，可能页面结构变化或需要登录态验证：{order_id}", order_id=order_id)
+        return info_text
+
+    def _cached_image(self, url: str):
+        return self._image_cache.get(image_key(url))
+
+    async def _afetch_image(self, url: str, key: str, sem: asyncio.Semaphore):
+        try:
+            await self._afetch_image_once(image_fetch_url(url), key, sem)
+        finally:
+            self.progress.update(images_done=self.progress.state["images_done"] + 1)
+
+    async def _afetch_image_once(self, url: str, key: str, sem: asyncio.Semaphore):
+        headers = {"Accept-Language": self.accept_language, "Referer": "https://www.jd.com/"}
+        async with sem:
+            for attempt in range(1, self.image_retries + 2):
+                if self.cancel_token.cancelled:
+                    return
+                try:
+                    await self._arate_limit("image")
+                    resp = await self.context.request.get(url, headers=headers, timeout=10000)
+                    if resp.status in (403, 429):
+                        self._bump_backoff("image", factor=1.8)
+                        retry_after = parse_retry_after(resp.headers.get("retry-after"))
+                        await resp.dispose()
+                        if retry_after is not None:
+                            self.limiters["image"].retry_after(min(retry_after, 120.0))
+                        else:
+                            await self._asleep(1.0, 2.0)
+                        continue
+                    if resp.ok:
+                        self._image_cache[key] = await resp.body()
+                        await resp.dispose()
+                        self._decay_backoff("image")
+                        return
+                    await resp.dispose()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self._bump_backoff("image", factor=1.4)
+                    if attempt > self.image_retries:
+                        logger.warning("Failed to fetch image {url}: {err}", url=url, err=e)
+                await self._asleep(0.6, 1.2)
+
+    async def _ago_next_page(self, last_first_id: str):
+        next_locator = None
+        for sel in ("a.ui-pager-next", "div.pagin a.next", "a.next"):
+            loc = self.page.locator(sel).first
+            if await loc.count() > 0:
+                next_locator = loc
+                break
+        if not next_locator:
+            logger.info("No next-page control found; assuming last page.")
+            return False
+        classes = (await next_locator.get_attribute("class") or "").lower()
+        if "disabled" in classes:
+            return False
+        href = (await next_locator.get_attribute("href") or "").strip()
+        await self._asleep(1.2, 3.5)
+        try:
+            if href and href != "#" and "javascript" not in href.lower():
+                target = f"https:{href}" if href.startswith("//") else urljoin(self.page.url, href)
+                await self._agoto_with_retry(target)
+            else:
+                with self._track_latency("pagination"):
+                    async with self.page.expect_navigation(wait_until="domcontentloaded", timeout=self._timeout("pagination", 12000)):
+                        await next_locator.click()
+        except TimeoutError as e:
+            logger.warning("Pagination navigation timeout: {err}", err=e)
+            return False
+
+        await self._await_networkidle(self.page, 12000)
+        try:
+            with self._track_latency("pagination"):
+                await self.page.wait_for_function(
+                    """(firstId) => {
+                        const first = document.querySelector("tbody[id^='tb-']");
+                        return !firstId || (first && first.id !== firstId);
+                    }""",
+                    arg=last_first_id,
+                    timeout=self._timeout("pagination", 12000),
+                )
+        except TimeoutError:
+            logger.warning("Pagination DOM did not change after navigating.")
+            return False
+        return True
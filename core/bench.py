@@ -0,0 +1,105 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from core.fixture_server import FixtureConfig, FixtureData, JDFixtureServer
+
+
+# 基准默认关闭限速与拟人停顿，只测流水线本身；--keep-delays 时保留用户环境中的配置
+_NO_DELAY_ENV = {
+    "JD_RATE_PAGE_MIN": "0",
+    "JD_RATE_DETAIL_MIN": "0",
+    "JD_RATE_IMAGE_MIN": "0",
+    "JD_DETAIL_SAFE_MIN": "0",
+    "JD_ADDR_PAUSE_MIN": "0",
+    "JD_ADDR_PAUSE_MAX": "0",
+}
+
+
+def run_benchmark(engine: str = "sync", orders: int = 200, per_page: int = 10, latency_ms: float = 50,
+                  jitter_ms: float = 20, error_rate: float = 0.0, risk_rate: float = 0.0, passport_after: int = 0,
+                  headless: bool = True, keep_delays: bool = False, workdir=None, seed: int = 42):
+    """
+    启动本地替身服务并完整跑一次采集，返回端到端吞吐（订单/分钟、商品行/分钟）、
+    服务端请求统计与 RunReport 路径。profile 与导出目录使用临时目录，不触碰真实账号数据。
+    """
+    workdir = Path(workdir or tempfile.mkdtemp(prefix="jd_bench_")).expanduser().resolve()
+    profile_dir = workdir / "profile"
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    # 空的 storage_state：替身服务不校验登录态，只需让 scrape_orders 跳过扫码登录
+    (profile_dir / "auth.json").write_text('{"cookies": [], "origins": []}', encoding="utf-8")
+
+    data = FixtureData(orders=orders, per_page=per_page, seed=seed)
+    config = FixtureConfig(latency_ms=latency_ms, jitter_ms=jitter_ms, error_rate=error_rate,
+                           risk_rate=risk_rate, passport_after=passport_after, seed=seed)
+    server = JDFixtureServer(data, config).start()
+
+    env = dict(server.scraper_env())
+    env.update({
+        "JD_PROFILE": "bench",
+        "JD_PROFILE_DIR": str(profile_dir),
+        "JD_DOWNLOAD_DIR": str(workdir / "downloads"),
+        "JD_SEARCH_DB": str(workdir / "orders_index.sqlite3"),
+        "JD_PERSISTENT_PROFILE": "0",
+        "JD_PROFILE_AUTO_NEW": "0",
+        "JD_PROFILE_AUTO_NEW_ON_RELOGIN": "0",
+        "JD_RISK_WAIT": "5",
+    })
+    if not keep_delays:
+        env.update(_NO_DELAY_ENV)
+    saved = {k: os.environ.get(k) for k in env}
+    os.environ.update(env)
+    started = time.time()
+    try:
+        if engine == "async":
+            import asyncio
+            from core.async_scraper import AsyncJDScraper
+            result = asyncio.run(AsyncJDScraper(headless=headless).scrape_orders("1"))
+        else:
+            from core.scraper import JDScraper
+            result = JDScraper(headless=headless).scrape_orders("1")
+    finally:
+        elapsed = time.time() - started
+        server.stop()
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+    result = result or {}
+    order_count = int(result.get("order_count") or 0)
+    item_count = int(result.get("count") or 0)
+    minutes = max(elapsed, 1e-6) / 60.0
+    summary = {
+        "engine": engine,
+        "status": result.get("status"),
+        "message": result.get("message"),
+        "orders_expected": len(data.orders),
+        "items_expected": sum(len(o["items"]) for o in data.orders),
+        "orders": order_count,
+        "items": item_count,
+        "elapsed_s": round(elapsed, 2),
+        "orders_per_min": round(order_count / minutes, 1),
+        "items_per_min": round(item_count / minutes, 1),
+        "fixture": {
+            "latency_ms": latency_ms,
+            "jitter_ms": jitter_ms,
+            "error_rate": error_rate,
+            "risk_rate": risk_rate,
+            "passport_after": passport_after,
+            "requests": dict(server.stats),
+        },
+        "keep_delays": keep_delays,
+        "file": result.get("file"),
+        "report": result.get("report"),
+        "workdir": str(workdir),
+    }
+    logger.info(
+        f"Benchmark [{engine}] {order_count}/{len(data.orders)} orders in {summary['elapsed_s']}s "
+        f"-> {summary['orders_per_min']} orders/min"
+    )
+    return summary
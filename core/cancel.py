@@ -0,0 +1,32 @@
+import threading
+
+
+class ScrapeCancelled(Exception):
+    """采集被用户取消（由 CancelToken.check 抛出）。"""
+
+
+class CancelToken:
+    """
+    协作式取消标记：任意线程调用 cancel()，采集线程在分页、详情、风控等待、图片循环中检查。
+    wait() 用于替代 time.sleep，取消后立即返回。
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise ScrapeCancelled("采集已取消")
+
+    def wait(self, seconds: float) -> bool:
+        """可被取消打断的睡眠，返回 True 表示已取消。"""
+        if seconds <= 0:
+            return self._event.is_set()
+        return self._event.wait(seconds)
@@ -0,0 +1,473 @@
+"""
+Headless command-line / daemon entry point (never imports PySide6).
+
+    python -m core scrape --range 2023 --format parquet
+    python -m core accounts --profiles a,b --range 1 --workers 2
+    python -m core daemon --range 1 --every 86400
+    python -m core serve --host 0.0.0.0 --port 8000
+    python -m core fixture --port 8765 --orders 300 --latency-ms 80
+    python -m core bench --engine async --orders 200 --latency-ms 50
+    python -m core bench-export --sizes 10000,50000,200000
+    python -m core index downloads/ old_exports/2021.xlsx
+    python -m core import old_exports/ --consolidate history.parquet
+    python -m core search 小米 充电器
+    python -m core rollups --limit 24
+    python -m core profiles --prune --measure
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_EMPTY = 3
+EXIT_NO_AUTH = 4
+EXIT_INTERRUPTED = 130
+
+
+def _exit_code(result: dict) -> int:
+    status = (result or {}).get("status")
+    if status == "success":
+        return EXIT_OK
+    if status == "empty":
+        return EXIT_EMPTY
+    if status == "no_auth":
+        return EXIT_NO_AUTH
+    if status == "cancelled":
+        return EXIT_INTERRUPTED
+    return EXIT_ERROR
+
+
+def _write_summary(summary: dict, path: str = None):
+    """运行摘要：始终输出一行 JSON 到 stdout，指定 --summary 时同时写文件。"""
+    line = json.dumps(summary, ensure_ascii=False, default=str)
+    print(line, flush=True)
+    if path:
+        target = Path(path).expanduser()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(json.dumps(summary, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+
+
+def _apply_common_env(args):
+    # 环境变量在导入 core.scraper 之前设置，JDScraper 从环境读取配置
+    if getattr(args, "profile", None):
+        os.environ["JD_PROFILE"] = args.profile
+    if getattr(args, "download_dir", None):
+        os.environ["JD_DOWNLOAD_DIR"] = args.download_dir
+    if getattr(args, "format", None):
+        os.environ["JD_EXPORT_FORMAT"] = args.format
+    if getattr(args, "no_images", False):
+        os.environ["JD_EMBED_IMAGES"] = "0"
+    if getattr(args, "no_address", False):
+        os.environ["JD_FETCH_ADDRESS"] = "0"
+    if getattr(args, "profiler", None):
+        os.environ["JD_PROFILER"] = args.profiler
+    if getattr(args, "profiler_scope", None):
+        os.environ["JD_PROFILER_SCOPE"] = args.profiler_scope
+
+
+def _make_scraper(args):
+    if args.engine == "async":
+        from core.async_scraper import AsyncJDScraper
+        return AsyncJDScraper(headless=args.headless)
+    from core.scraper import JDScraper
+    return JDScraper(headless=args.headless)
+
+
+def _scrape_once(args):
+    started = time.time()
+    scraper = _make_scraper(args)
+    summary = {
+        "command": "scrape",
+        "engine": args.engine,
+        "range": args.range,
+        "profile": scraper.profile_name,
+        "started_at": datetime.fromtimestamp(started).isoformat(timespec="seconds"),
+    }
+    if args.headless and not os.path.exists(scraper.auth_file):
+        result = {"status": "no_auth", "message": f"auth.json 不存在，请先在有界面的环境登录: {scraper.auth_file}"}
+    elif args.engine == "async":
+        import asyncio
+        result = asyncio.run(scraper.scrape_orders(args.range))
+    else:
+        result = scraper.scrape_orders(args.range)
+    summary.update(result or {})
+    summary["elapsed_s"] = round(time.time() - started, 2)
+    summary["exit_code"] = _exit_code(result)
+    return summary
+
+
+def cmd_scrape(args):
+    _apply_common_env(args)
+    summary = _scrape_once(args)
+    _write_summary(summary, args.summary)
+    return summary["exit_code"]
+
+
+def cmd_login(args):
+    _apply_common_env(args)
+    from core.scraper import JDScraper
+    scraper = JDScraper(headless=False)
+    ok = scraper.login(force_fresh=args.fresh)
+    _write_summary({"command": "login", "profile": scraper.profile_name, "status": "success" if ok else "error"}, args.summary)
+    return EXIT_OK if ok else EXIT_ERROR
+
+
+def cmd_accounts(args):
+    _apply_common_env(args)
+    from core.jobs import run_accounts
+
+    profiles = [p.strip() for p in args.profiles.split(",") if p.strip()]
+    ranges = [r.strip() for r in args.range.split(",") if r.strip()]
+
+    last_progress = {}
+
+    def _on_event(event):
+        if event.get("type") == "log":
+            print(f"[{event['profile']}] {event['level']}: {event['message']}", file=sys.stderr, flush=True)
+        elif event.get("type") == "progress":
+            # 进度快照约每 0.25s 一条，只在阶段/页码变化时输出
+            snap = event["progress"]
+            key = (snap.get("stage"), snap.get("page"))
+            if last_progress.get(event["profile"]) != key:
+                last_progress[event["profile"]] = key
+                print(f"[{event['profile']}] {snap.get('stage_label')} page={snap.get('page')} "
+                      f"orders={snap.get('orders')} items={snap.get('items')}", file=sys.stderr, flush=True)
+        else:
+            print(f"[{event['profile']}] {event['type']} range={event.get('range')}", file=sys.stderr, flush=True)
+
+    started = time.time()
+    result = run_accounts(
+        {p: ranges for p in profiles},
+        max_workers=args.workers,
+        headless=args.headless,
+        download_dir=args.download_dir,
+        on_event=_on_event,
+    )
+    summary = {"command": "accounts", "profiles": profiles, "ranges": ranges}
+    summary.update(result)
+    summary["elapsed_s"] = round(time.time() - started, 2)
+    summary["exit_code"] = _exit_code(result)
+    _write_summary(summary, args.summary)
+    return summary["exit_code"]
+
+
+def cmd_daemon(args):
+    """按固定间隔重复采集，直到收到 SIGTERM/SIGINT；每轮写一行 JSON 摘要。"""
+    _apply_common_env(args)
+    stop = {"flag": False}
+
+    def _stop(signum, frame):
+        stop["flag"] = True
+
+    signal.signal(signal.SIGTERM, _stop)
+    last_code = EXIT_OK
+    while not stop["flag"]:
+        summary = _scrape_once(args)
+        _write_summary(summary, args.summary)
+        last_code = summary["exit_code"]
+        deadline = time.time() + max(60, args.every)
+        while not stop["flag"] and time.time() < deadline:
+            time.sleep(1.0)
+    return last_code
+
+
+def cmd_serve(args):
+    _apply_common_env(args)
+    if args.headless:
+        os.environ["JD_HEADLESS"] = "1"
+    from core.server import run
+    run(host=args.host, port=args.port)
+    return EXIT_OK
+
+
+def cmd_fixture(args):
+    from core.fixture_server import FixtureConfig, FixtureData, JDFixtureServer
+
+    server = JDFixtureServer(
+        FixtureData(orders=args.orders, per_page=args.per_page, seed=args.seed),
+        _fixture_config(args, FixtureConfig),
+        host=args.host,
+        port=args.port,
+    )
+    for key, value in server.scraper_env().items():
+        print(f"{key}={value}", file=sys.stderr, flush=True)
+    server.serve_forever()
+    return EXIT_OK
+
+
+def _fixture_config(args, config_cls):
+    return config_cls(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        risk_rate=args.risk_rate,
+        passport_after=args.passport_after,
+        seed=args.seed,
+    )
+
+
+def cmd_bench(args):
+    from core.bench import run_benchmark
+
+    summary = run_benchmark(
+        engine=args.engine,
+        orders=args.orders,
+        per_page=args.per_page,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        risk_rate=args.risk_rate,
+        passport_after=args.passport_after,
+        headless=args.headless,
+        keep_delays=args.keep_delays,
+        workdir=args.workdir,
+        seed=args.seed,
+    )
+    summary["command"] = "bench"
+    summary["exit_code"] = _exit_code(summary)
+    _write_summary(summary, args.summary)
+    return summary["exit_code"]
+
+
+def cmd_bench_export(args):
+    _apply_common_env(args)
+    from core.export_bench import format_table, run_export_bench
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    strategies = [s.strip() for s in args.strategies.split(",") if s.strip()]
+
+    def _on_result(res):
+        print(f"[{res['strategy']} x {res['rows']}] {res.get('status')} wall={res.get('wall_s')}s "
+              f"rss={res.get('peak_rss_mb')}MB file={res.get('file_mb')}MB", file=sys.stderr, flush=True)
+
+    started = time.time()
+    summary = {"command": "bench-export", "sizes": sizes, "strategies": strategies}
+    summary.update(run_export_bench(sizes, strategies, workdir=args.workdir, seed=args.seed, on_result=_on_result))
+    summary["elapsed_s"] = round(time.time() - started, 2)
+    failed = [r for r in summary["results"] if r.get("status") not in ("success", "empty")]
+    summary["status"] = "error" if failed else "success"
+    summary["exit_code"] = _exit_code(summary)
+    print(format_table(summary["results"]), file=sys.stderr, flush=True)
+    _write_summary(summary, args.summary)
+    return summary["exit_code"]
+
+
+def cmd_index(args):
+    _apply_common_env(args)
+    from core.search_index import OrderIndex
+
+    index = OrderIndex(args.db)
+    summary = {"command": "index", "imported": []}
+    if not args.paths:
+        from core.scraper import _data_base_dir
+        args.paths = [os.getenv("JD_DOWNLOAD_DIR", str(_data_base_dir() / "downloads"))]
+    errors = []
+    for raw in args.paths:
+        path = Path(raw).expanduser()
+        if path.is_dir():
+            res = index.import_exports(path, force=args.force, chunk_rows=args.chunk_rows)
+            errors += res["errors"]
+        else:
+            try:
+                res = {"files": 1, "rows": index.index_file(path, force=args.force, chunk_rows=args.chunk_rows)}
+            except Exception as e:
+                res = {"files": 0, "rows": 0}
+                errors.append(f"{path.name}: {e}")
+        summary["imported"].append({"path": str(path), **res})
+    summary.update(index.stats())
+    if args.consolidate:
+        summary["consolidated"] = args.consolidate
+        summary["consolidated_rows"] = index.export_dataset(args.consolidate)
+    summary["errors"] = errors
+    summary["status"] = "error" if errors else "success"
+    summary["exit_code"] = _exit_code(summary)
+    _write_summary(summary, args.summary)
+    return summary["exit_code"]
+
+
+def cmd_search(args):
+    from core.search_index import search_orders
+
+    summary = {"command": "search", **search_orders(" ".join(args.query), limit=args.limit, db_path=args.db)}
+    for row in summary["results"]:
+        print(f"{row['日期']}  {row['订单']}  {row['店铺']}  {row['商品名称']}  {row['姓名']}", file=sys.stderr)
+    summary["status"] = "success" if summary["count"] else "empty"
+    summary["exit_code"] = _exit_code(summary)
+    _write_summary(summary, args.summary)
+    return summary["exit_code"]
+
+
+def cmd_rollups(args):
+    from core.search_index import OrderIndex
+
+    summary = {"command": "rollups", **OrderIndex(args.db).rollups(limit=args.limit)}
+    summary["status"] = "success" if summary["totals"]["orders"] else "empty"
+    summary["exit_code"] = _exit_code(summary)
+    _write_summary(summary, args.summary)
+    return summary["exit_code"]
+
+
+def cmd_profiles(args):
+    _apply_common_env(args)
+    if args.cache_mb is not None:
+        os.environ["JD_PROFILE_CACHE_MB"] = str(args.cache_mb)
+    if args.gc_days is not None:
+        os.environ["JD_PROFILE_GC_DAYS"] = str(args.gc_days)
+    if args.keep is not None:
+        os.environ["JD_PROFILE_KEEP"] = str(args.keep)
+    from core.scraper import JDScraper
+
+    scraper = JDScraper(headless=True)
+    summary = {"command": "profiles", "profile": scraper.profile_name,
+               **scraper.maintain_profiles(prune=args.prune or args.dry_run, dry_run=args.dry_run, measure=args.measure)}
+    for row in summary.get("after", summary["before"]):
+        flags = ",".join(k for k in ("active", "in_use", "has_auth") if row[k])
+        print(f"{row['size_mb']:>9.1f} MB  cache {row['cache_mb']:>8.1f} MB  {row['name']}  {flags}", file=sys.stderr)
+    summary["status"] = "success"
+    summary["exit_code"] = _exit_code(summary)
+    _write_summary(summary, args.summary)
+    return summary["exit_code"]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m core", description="JD 订单采集（无界面）")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def _common(p):
+        p.add_argument("--profile", help="账号 profile 名（等同 JD_PROFILE）")
+        p.add_argument("--download-dir", help="导出目录（等同 JD_DOWNLOAD_DIR）")
+        p.add_argument("--summary", help="运行摘要 JSON 写入路径")
+
+    def _scrape_opts(p):
+        p.add_argument("--range", default="1", help="时间范围：1=近三个月，2=今年内，或年份如 2023")
+        p.add_argument("--format", choices=("xlsx", "parquet", "csv"), help="导出格式（等同 JD_EXPORT_FORMAT）")
+        p.add_argument("--headed", dest="headless", action="store_false", help="显示浏览器窗口")
+        p.add_argument("--no-images", action="store_true", help="不嵌入商品图片")
+        p.add_argument("--no-address", action="store_true", help="不抓取订单详情地址")
+        _profiler_opts(p)
+        p.set_defaults(headless=True)
+
+    def _profiler_opts(p):
+        p.add_argument("--profiler", help="剖析模式：cprofile,sample,tracemalloc 或 all（等同 JD_PROFILER）")
+        p.add_argument("--profiler-scope", choices=("scrape", "export"), help="剖析范围（等同 JD_PROFILER_SCOPE）")
+
+    p_scrape = sub.add_parser("scrape", help="采集一次并导出")
+    _common(p_scrape)
+    _scrape_opts(p_scrape)
+    p_scrape.add_argument("--engine", choices=("sync", "async"), default="sync")
+    p_scrape.set_defaults(func=cmd_scrape)
+
+    p_login = sub.add_parser("login", help="打开浏览器扫码登录（需要图形界面）")
+    _common(p_login)
+    p_login.add_argument("--fresh", action="store_true", help="丢弃旧会话重新登录")
+    p_login.set_defaults(func=cmd_login)
+
+    p_accounts = sub.add_parser("accounts", help="多账号并行采集并合并")
+    _common(p_accounts)
+    _scrape_opts(p_accounts)
+    p_accounts.add_argument("--profiles", required=True, help="逗号分隔的 profile 列表")
+    p_accounts.add_argument("--workers", type=int, default=None, help="最多同时运行的采集进程数")
+    p_accounts.set_defaults(func=cmd_accounts)
+
+    p_daemon = sub.add_parser("daemon", help="按间隔循环采集")
+    _common(p_daemon)
+    _scrape_opts(p_daemon)
+    p_daemon.add_argument("--engine", choices=("sync", "async"), default="sync")
+    p_daemon.add_argument("--every", type=int, default=86400, help="两次采集的间隔秒数（最少 60）")
+    p_daemon.set_defaults(func=cmd_daemon)
+
+    p_serve = sub.add_parser("serve", help="启动 Web 后端（任务队列 API + static 页面）")
+    _common(p_serve)
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=8000)
+    p_serve.add_argument("--headless", action="store_true", help="浏览器无界面运行（需已有 auth.json）")
+    p_serve.set_defaults(func=cmd_serve)
+
+    def _fixture_opts(p):
+        p.add_argument("--orders", type=int, default=200, help="模拟订单数")
+        p.add_argument("--per-page", type=int, default=10, help="每页订单数")
+        p.add_argument("--latency-ms", type=float, default=50, help="每个请求的基础延迟")
+        p.add_argument("--jitter-ms", type=float, default=20, help="延迟抖动上限")
+        p.add_argument("--error-rate", type=float, default=0.0, help="返回 5xx 的概率")
+        p.add_argument("--risk-rate", type=float, default=0.0, help="跳转风控页的概率")
+        p.add_argument("--passport-after", type=int, default=0, help="第 N 次列表请求后跳转登录页（0 不启用）")
+        p.add_argument("--seed", type=int, default=42)
+
+    p_fixture = sub.add_parser("fixture", help="启动本地 JD 替身服务（离线调试/基准）")
+    _fixture_opts(p_fixture)
+    p_fixture.add_argument("--host", default="127.0.0.1")
+    p_fixture.add_argument("--port", type=int, default=8765)
+    p_fixture.set_defaults(func=cmd_fixture)
+
+    p_bench = sub.add_parser("bench", help="对本地替身服务跑一次端到端采集并输出吞吐")
+    _fixture_opts(p_bench)
+    p_bench.add_argument("--engine", choices=("sync", "async"), default="sync")
+    p_bench.add_argument("--headed", dest="headless", action="store_false", help="显示浏览器窗口")
+    p_bench.add_argument("--keep-delays", action="store_true", help="保留限速与拟人停顿配置")
+    p_bench.add_argument("--workdir", help="profile 与导出目录（默认临时目录）")
+    p_bench.add_argument("--summary", help="运行摘要 JSON 写入路径")
+    p_bench.set_defaults(func=cmd_bench, headless=True)
+
+    p_bench_export = sub.add_parser("bench-export", help="导出阶段微基准（合成数据，本地图片，无需网络）")
+    p_bench_export.add_argument("--sizes", default="10000,50000", help="逗号分隔的行数，如 10000,50000,200000")
+    p_bench_export.add_argument("--strategies", default="xlsx,xlsx_noimg,csv,parquet", help="逗号分隔的导出策略")
+    p_bench_export.add_argument("--workdir", help="输出目录（默认临时目录）")
+    p_bench_export.add_argument("--seed", type=int, default=7)
+    p_bench_export.add_argument("--summary", help="运行摘要 JSON 写入路径")
+    _profiler_opts(p_bench_export)
+    p_bench_export.set_defaults(func=cmd_bench_export)
+
+    p_index = sub.add_parser("index", aliases=["import"], help="把导出文件（含旧 xlsx）流式导入合并去重的订单库")
+    _common(p_index)
+    p_index.add_argument("paths", nargs="*", help="导出文件或目录（默认导出目录）")
+    p_index.add_argument("--db", help="索引数据库路径（等同 JD_SEARCH_DB）")
+    p_index.add_argument("--force", action="store_true", help="忽略已导入记录，重新导入")
+    p_index.add_argument("--chunk-rows", type=int, default=20000, help="流式读取时每批行数")
+    p_index.add_argument("--consolidate", help="导入后把合并去重的全部订单写成一个 Parquet 文件")
+    p_index.set_defaults(func=cmd_index)
+
+    p_search = sub.add_parser("search", help="在全文索引中搜索商品/店铺/收货人/地址/订单号")
+    p_search.add_argument("query", nargs="+", help="搜索词，多个词取交集")
+    p_search.add_argument("--limit", type=int, default=50)
+    p_search.add_argument("--db", help="索引数据库路径（等同 JD_SEARCH_DB）")
+    p_search.add_argument("--summary", help="运行摘要 JSON 写入路径")
+    p_search.set_defaults(func=cmd_search)
+
+    p_rollups = sub.add_parser("rollups", help="输出按月/店铺/状态/商品的消费汇总")
+    p_rollups.add_argument("--limit", type=int, default=12, help="每个维度最多返回的行数")
+    p_rollups.add_argument("--db", help="索引数据库路径（等同 JD_SEARCH_DB）")
+    p_rollups.add_argument("--summary", help="运行摘要 JSON 写入路径")
+    p_rollups.set_defaults(func=cmd_rollups)
+
+    p_profiles = sub.add_parser("profiles", help="报告浏览器 profile 大小，清理缓存并回收旧的轮换 profile")
+    _common(p_profiles)
+    p_profiles.add_argument("--prune", action="store_true", help="按预算清理缓存并回收过期的轮换 profile")
+    p_profiles.add_argument("--dry-run", action="store_true", help="只列出将被清理的内容")
+    p_profiles.add_argument("--cache-mb", type=int, help="每个 profile 的缓存预算 MB，0 不清理（等同 JD_PROFILE_CACHE_MB）")
+    p_profiles.add_argument("--gc-days", type=int, help="回收早于 N 天的轮换 profile，0 不回收（等同 JD_PROFILE_GC_DAYS）")
+    p_profiles.add_argument("--keep", type=int, help="每个账号至少保留的最新轮换 profile 数（等同 JD_PROFILE_KEEP）")
+    p_profiles.add_argument("--measure", action="store_true", help="清理前后各 headless 启动一次当前 profile 并对比耗时")
+    p_profiles.set_defaults(func=cmd_profiles)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    from core.logs import setup_logging
+    setup_logging(f"cli-{args.command}")
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    except Exception as e:
+        _write_summary({"command": args.command, "status": "error", "message": str(e), "exit_code": EXIT_ERROR},
+                       getattr(args, "summary", None))
+        return EXIT_ERROR
@@ -0,0 +1,156 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+from core.schema import CATEGORY_COLUMNS
+
+
+# 导出文件的列式副本（Arrow IPC，未压缩）放在下载目录的 .cache 下，可直接内存映射零拷贝读取
+CACHE_DIRNAME = ".cache"
+CACHE_SUFFIX = ".arrow"
+# 按文本读取的列：订单号/型号是长数字串，不能被推断成数值
+TEXT_COLUMNS = ("订单", "型号")
+
+
+def cache_path(export_path) -> Path:
+    export_path = Path(export_path)
+    return export_path.parent / CACHE_DIRNAME / (export_path.name + CACHE_SUFFIX)
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """统一列类型：日期为时间、金额/数量为数值、店铺/状态等为字典编码、其余为字符串（Arrow 要求单列单一类型）。"""
+    df = df.copy()
+    for col in df.columns:
+        if col == "日期":
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+        elif col in ("下单金额", "数量"):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        elif col in CATEGORY_COLUMNS:
+            if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype("string").fillna("").astype("category")
+        elif df[col].dtype == object or col in TEXT_COLUMNS:
+            df[col] = df[col].astype("string").fillna("")
+    return df
+
+
+def write_cache(df: pd.DataFrame, export_path) -> Path:
+    """把导出用的 DataFrame 写成列式副本；先写临时文件再替换，读者不会看到半截文件。"""
+    import pyarrow as pa
+
+    target = cache_path(export_path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(_normalize(df), preserve_index=False)
+    tmp = target.with_name(target.name + ".tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=65536)
+    os.replace(tmp, target)
+    return target
+
+
+def _id_text(value) -> str:
+    # 单元格若被 Excel 存成数字，去掉 ".0" 还原为号码串
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _xlsx_frame(rows, columns) -> pd.DataFrame:
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    for col in TEXT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].map(_id_text)
+    return df
+
+
+def iter_xlsx_chunks(path, chunk_rows: int = 20000):
+    """
+    流式读取导出的 xlsx：openpyxl read_only 逐行解析 sheet XML，不加载嵌入图片/绘图部件，内存与文件大小无关。
+    只读模式下合并单元格（下单金额）仅首格有值，其余为空，与导出时“仅首行保留金额”的口径一致。
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(str(path), read_only=True, data_only=True, keep_links=False)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            return
+        columns = [str(h) if h is not None else f"col{i}" for i, h in enumerate(header)]
+        width = len(columns)
+        buf = []
+        for row in rows:
+            if not row or all(v is None for v in row):
+                continue
+            buf.append(row[:width] + (None,) * (width - len(row)))
+            if len(buf) >= chunk_rows:
+                yield _xlsx_frame(buf, columns)
+                buf = []
+        if buf:
+            yield _xlsx_frame(buf, columns)
+    finally:
+        wb.close()
+
+
+def iter_export_chunks(export_path, chunk_rows: int = 20000):
+    """按块读取任意导出格式（xlsx / csv / parquet），每块为一个 DataFrame。"""
+    export_path = Path(export_path)
+    suffix = export_path.suffix.lower()
+    if suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(export_path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    elif suffix == ".csv":
+        text_dtypes = {col: str for col in TEXT_COLUMNS}
+        yield from pd.read_csv(export_path, encoding="utf-8-sig", dtype=text_dtypes, keep_default_na=False,
+                               chunksize=chunk_rows)
+    else:
+        yield from iter_xlsx_chunks(export_path, chunk_rows=chunk_rows)
+
+
+def load_export(export_path) -> pd.DataFrame:
+    chunks = list(iter_export_chunks(export_path))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+
+def open_columnar(export_path):
+    """
+    返回导出文件对应的 pyarrow.Table（内存映射，按需分页进内存）。
+    列式副本缺失或比导出文件旧时，先从导出文件重建（xlsx 较慢，调用方应放在后台线程）。
+    """
+    import pyarrow as pa
+
+    export_path = Path(export_path)
+    cached = cache_path(export_path)
+    try:
+        fresh = cached.stat().st_mtime >= export_path.stat().st_mtime
+    except OSError:
+        fresh = False
+    if not fresh:
+        logger.info(f"构建列式副本: {export_path.name}")
+        write_cache(load_export(export_path), export_path)
+    return pa.ipc.open_file(pa.memory_map(str(cached), "r")).read_all()
+
+
+def prune_cache(download_dir) -> int:
+    """删除源导出文件已不存在的列式副本，返回删除数量。"""
+    cache_dir = Path(download_dir) / CACHE_DIRNAME
+    removed = 0
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(CACHE_SUFFIX):
+                    continue
+                if not (Path(download_dir) / entry.name[: -len(CACHE_SUFFIX)]).exists():
+                    try:
+                        os.remove(entry.path)
+                        removed += 1
+                    except OSError:
+                        pass
+    except OSError:
+        pass
+    return removed
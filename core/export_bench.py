@@ -0,0 +1,196 @@
+"""
+导出阶段微基准：用与 _parse_row 完全一致的列集合与拆单模式构造合成数据，
+本地生成商品图片，逐个导出策略测量耗时、峰值 RSS 与输出文件大小（无需网络）。
+
+    python -m core bench-export --sizes 10000,50000 --strategies xlsx,xlsx_noimg,csv,parquet
+"""
+import io
+import multiprocessing
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from loguru import logger
+
+
+# 同一张图在线上会以不同镜像域名、尺寸桶与格式后缀出现（按行轮换，不消耗随机数，数据与旧版一致）
+_IMAGE_HOSTS = ("img10", "img14", "img30")
+_IMAGE_SIZES = ("n1/s110x110_jfs", "n5/jfs", "n7/s54x54_jfs")
+_IMAGE_SUFFIXES = ("", "!q70.dpg.webp", ".avif")
+
+STRATEGIES = {
+    # name: (JD_EXPORT_FORMAT, 是否嵌入图片)
+    "xlsx": ("xlsx", True),
+    "xlsx_noimg": ("xlsx", False),
+    "csv": ("csv", False),
+    "parquet": ("parquet", False),
+}
+
+
+def make_orders(rows: int, seed: int = 7, split_ratio: float = 0.1, images: int = 64):
+    """生成 rows 行商品数据（每单 1~3 件，按比例拆单，少量赠品无价格），字段与 JDScraper._parse_row 一致。"""
+    rng = random.Random(seed)
+    out = []
+    start = datetime(2024, 12, 31, 20, 0, 0)
+    i = 0
+    while len(out) < rows:
+        order_id = str(300000000000 + i * 7919)
+        order_time = (start - timedelta(minutes=i * 37)).strftime("%Y-%m-%d %H:%M:%S")
+        is_split = rng.random() < split_ratio
+        shop = rng.choice(("京东自营", "小米京东自营旗舰店", "优衣库官方旗舰店"))
+        receiver = rng.choice(("张三", "李四", "王五"))
+        status = rng.choice(("已完成", "已完成", "等待收货", "已取消"))
+        for _ in range(min(rng.randint(1, 3), rows - len(out))):
+            sku = str(100000000 + rng.randint(0, 899999))
+            qty = rng.randint(1, 3)
+            # 赠品行没有价格，与线上一样得到空字符串
+            amount = "" if rng.random() < 0.005 else round(rng.uniform(5, 900) * qty, 2)
+            out.append({
+                "日期": order_time,
+                "订单": order_id,
+                "商品名称": f"合成商品 {sku[-4:]} 规格{rng.randint(1, 9)}",
+                "型号": sku,
+                "数量": qty,
+                "下单金额": amount,
+                "姓名": receiver,
+                "地址": f"北京市朝阳区测试路{rng.randint(1, 999)}号",
+                "店铺": shop,
+                "状态": status,
+                "拆单标记": is_split,
+                "商品图片": _image_url(rng.randint(0, images - 1), len(out)),
+            })
+        i += 1
+    return out
+
+
+def _image_url(image_no: int, row_no: int) -> str:
+    host = _IMAGE_HOSTS[row_no % len(_IMAGE_HOSTS)]
+    size = _IMAGE_SIZES[(row_no // 3) % len(_IMAGE_SIZES)]
+    suffix = _IMAGE_SUFFIXES[(row_no // 9) % len(_IMAGE_SUFFIXES)]
+    return f"//{host}.360buyimg.com/{size}/t1/{image_no}/0/0/bench{image_no}.jpg{suffix}"
+
+
+def make_image_source(count: int = 64, size: int = 160):
+    """本地生成 count 张不同颜色的 JPEG（接近京东缩略图体积），返回 image_source(url) 回调。"""
+    try:
+        from PIL import Image
+
+        images = []
+        for n in range(count):
+            buf = io.BytesIO()
+            color = ((n * 37) % 256, (n * 91) % 256, (n * 53) % 256)
+            Image.new("RGB", (size, size), color).save(buf, format="JPEG", quality=85)
+            images.append(buf.getvalue())
+    except Exception:
+        from core.fixture_server import _png_bytes
+        images = [_png_bytes(size, (n * 37) % 256) for n in range(count)]
+
+    def _source(url: str):
+        match = re.search(r"(\d+)\.jpg", url)
+        idx = int(match.group(1)) if match else 0
+        return images[idx % len(images)]
+
+    return _source
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为 KB，macOS 为字节
+        return round(peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0, 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / (1024.0 * 1024.0), 1)
+    except Exception:
+        return None
+
+
+def _run_case(strategy: str, rows: int, workdir: str, seed: int):
+    """子进程入口：每个用例独占进程，峰值 RSS 不受前一个用例影响。"""
+    export_format, embed = STRATEGIES[strategy]
+    case_dir = Path(workdir) / f"{strategy}_{rows}"
+    os.environ.update({
+        "JD_PROFILE_DIR": str(case_dir / "profile"),
+        "JD_DOWNLOAD_DIR": str(case_dir / "out"),
+        "JD_EXPORT_FORMAT": export_format,
+        "JD_EMBED_IMAGES": "1" if embed else "0",
+        "JD_RUN_REPORT": "0",
+        # 合成数据不写入真实的全文索引
+        "JD_SEARCH_INDEX": "0",
+        # 只跑导出阶段，剖析（JD_PROFILER）固定包住导出
+        "JD_PROFILER_SCOPE": "export",
+    })
+    logger.remove()
+    from core.rows import OrderRows
+    from core.scraper import JDScraper
+
+    # 与线上一致：行数据以列式累加器交给导出
+    orders = OrderRows.from_records(make_orders(rows, seed=seed))
+    image_source = make_image_source()
+    scraper = JDScraper(headless=True)
+    baseline_mb = _peak_rss_mb()
+    started = time.perf_counter()
+    result = scraper._export_orders(orders, image_source=image_source)
+    wall_s = time.perf_counter() - started
+    scraper.report.finish()
+    summary_phases = scraper.report.summary()["phases"]
+    phases = {name: entry["total_s"] for name, entry in summary_phases.items() if name != "image_fetch"}
+    path = Path(result.get("file") or "")
+    profile_files = scraper.profiler.write(path.with_suffix("")) if path.is_file() else []
+    return {
+        "strategy": strategy,
+        "rows": rows,
+        "status": result.get("status"),
+        "wall_s": round(wall_s, 3),
+        "rows_per_s": round(rows / wall_s, 1) if wall_s > 0 else None,
+        "phases_s": phases,
+        "image_requests": summary_phases.get("image_fetch", {}).get("count", 0),
+        "peak_rss_mb": _peak_rss_mb(),
+        "baseline_rss_mb": baseline_mb,
+        "file_mb": round(path.stat().st_size / (1024.0 * 1024.0), 2) if path.is_file() else None,
+        "profile_files": profile_files,
+    }
+
+
+def run_export_bench(sizes=(10000, 50000), strategies=None, workdir=None, seed: int = 7, on_result=None):
+    """依次在独立子进程中运行各 (策略, 行数) 用例，返回结果列表。"""
+    strategies = list(strategies or STRATEGIES)
+    unknown = [s for s in strategies if s not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"unknown export strategies: {', '.join(unknown)}")
+    workdir = Path(workdir or tempfile.mkdtemp(prefix="jd_export_bench_")).expanduser().resolve()
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for rows in sizes:
+        for strategy in strategies:
+            with ctx.Pool(1, maxtasksperchild=1) as pool:
+                try:
+                    res = pool.apply(_run_case, (strategy, int(rows), str(workdir), seed))
+                except Exception as e:
+                    res = {"strategy": strategy, "rows": int(rows), "status": "error", "message": str(e)}
+            results.append(res)
+            if on_result:
+                on_result(res)
+    return {"status": "success", "workdir": str(workdir), "results": results}
+
+
+def format_table(results) -> str:
+    header = f"{'strategy':<12}{'rows':>9}{'wall_s':>10}{'rows/s':>10}{'rss_mb':>9}{'file_mb':>9}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r['strategy']:<12}{r['rows']:>9}{r.get('wall_s', '-'):>10}{r.get('rows_per_s') or '-':>10}"
+            f"{r.get('peak_rss_mb') or '-':>9}{r.get('file_mb') or '-':>9}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,325 @@
+"""
+本地 JD 替身服务：模拟订单列表分页、订单详情、商品图片、登录跳转与风控页，
+支持配置延迟与错误注入，供离线端到端基准使用（仅依赖标准库）。
+
+    python -m core fixture --port 8765 --orders 300 --latency-ms 80
+
+抓取端通过 JD_BASE_URL / JD_DETAIL_URL 指向本服务。登录页与风控页的路径分别包含
+"passport.jd.com" 与 "risk"，可直接命中 JDScraper 现有的 URL 判定逻辑。
+"""
+import html
+import random
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from loguru import logger
+
+
+LIST_PATH = "/center/list.action"
+DETAIL_PATH = "/details/normal/item.action"
+IMAGE_PREFIX = "/img/"
+PASSPORT_PATH = "/passport.jd.com/new/login.aspx"
+RISK_PATH = "/risk/verify"
+
+SHOPS = ("京东自营", "Apple产品京东自营旗舰店", "小米京东自营旗舰店", "优衣库官方旗舰店", "三只松鼠旗舰店")
+PRODUCTS = ("USB-C 数据线 1m", "无线鼠标", "机械键盘 87键", "保温杯 500ml", "坚果礼盒 1.5kg", "纯棉T恤", "护眼台灯")
+STATUSES = ("已完成", "已完成", "已完成", "等待收货", "已取消")
+
+
+def _png_bytes(size: int = 80, gray: int = 200) -> bytes:
+    """生成纯色灰度 PNG（openpyxl 嵌图需要可解码的真实图片）。"""
+    def _chunk(tag: bytes, payload: bytes) -> bytes:
+        return struct.pack(">I", len(payload)) + tag + payload + struct.pack(">I", zlib.crc32(tag + payload) & 0xFFFFFFFF)
+
+    raw = b"".join(b"\x00" + bytes([gray]) * size for _ in range(size))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + _chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 0, 0, 0, 0))
+        + _chunk(b"IDAT", zlib.compress(raw))
+        + _chunk(b"IEND", b"")
+    )
+
+
+class FixtureData:
+    """按种子生成确定性的订单数据：订单 -> 1~3 个商品，部分订单为拆单。"""
+
+    def __init__(self, orders: int = 200, per_page: int = 10, seed: int = 42):
+        rng = random.Random(seed)
+        self.per_page = max(1, per_page)
+        self.orders = []
+        start = datetime(2024, 12, 31, 20, 0, 0)
+        for i in range(max(0, orders)):
+            order_id = str(300000000000 + i * 7919)
+            items = []
+            for _ in range(rng.randint(1, 3)):
+                sku = str(100000000 + rng.randint(0, 899999))
+                items.append({
+                    "sku": sku,
+                    "name": f"{rng.choice(PRODUCTS)} #{sku[-4:]}",
+                    "qty": rng.randint(1, 3),
+                    "price": f"{rng.randint(5, 899)}.{rng.randint(0, 99):02d}",
+                })
+            self.orders.append({
+                "id": order_id,
+                "time": (start - timedelta(hours=i * 7)).strftime("%Y-%m-%d %H:%M:%S"),
+                "shop": rng.choice(SHOPS),
+                "status": rng.choice(STATUSES),
+                "receiver": rng.choice(("张三", "李四", "王五")),
+                "address": f"北京市朝阳区测试路{rng.randint(1, 999)}号",
+                "split": rng.random() < 0.1,
+                "items": items,
+            })
+        self.by_id = {o["id"]: o for o in self.orders}
+
+    @property
+    def total_pages(self) -> int:
+        return max(1, (len(self.orders) + self.per_page - 1) // self.per_page)
+
+    def page(self, page: int):
+        start = (page - 1) * self.per_page
+        return self.orders[start:start + self.per_page]
+
+
+class FixtureConfig:
+    """延迟与错误注入参数（概率均为 0~1）。"""
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, image_latency_ms: float = None,
+                 error_rate: float = 0.0, risk_rate: float = 0.0, passport_after: int = 0, seed: int = 42):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.image_latency_ms = latency_ms if image_latency_ms is None else image_latency_ms
+        self.error_rate = error_rate
+        self.risk_rate = risk_rate
+        # 第 N 次列表页请求之后一律跳转登录页（模拟会话过期），0 为不启用
+        self.passport_after = passport_after
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+
+    def roll(self, prob: float) -> bool:
+        if prob <= 0:
+            return False
+        with self.rng_lock:
+            return self.rng.random() < prob
+
+    def delay(self, base_ms: float):
+        if base_ms <= 0 and self.jitter_ms <= 0:
+            return
+        with self.rng_lock:
+            jitter = self.rng.uniform(0, self.jitter_ms) if self.jitter_ms > 0 else 0.0
+        time.sleep(max(0.0, base_ms + jitter) / 1000.0)
+
+
+def _page_shell(title: str, body: str) -> str:
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{html.escape(title)}</title></head><body>{body}</body></html>"
+    )
+
+
+def render_list_page(data: FixtureData, page: int, query: dict, origin: str) -> str:
+    rows = []
+    for order in data.page(page):
+        oid = order["id"]
+        split_cls = " split-tbody" if order["split"] else ""
+        products = []
+        for item in order["items"]:
+            products.append(
+                "<tr class='tr-bd'>"
+                f"<td><div class='p-img'><img src='{origin}{IMAGE_PREFIX}{item['sku']}.png' data-lazy-img='done'></div>"
+                f"<div class='p-name'><a href='//item.jd.com/{item['sku']}.html'>{html.escape(item['name'])}</a></div>"
+                f"<span data-sku='{item['sku']}'></span></td>"
+                f"<td><div class='goods-number'>x{item['qty']}</div></td>"
+                f"<td><div class='amount'><span>¥{item['price']}</span></div></td>"
+                "</tr>"
+            )
+        rows.append(
+            f"<tbody id='tb-{oid}' class='order-tbody{split_cls}'>"
+            "<tr class='tr-th'><td colspan='5'>"
+            f"<span class='dealtime' title='{order['time']}'>{order['time']}</span> "
+            f"订单号：<a name='orderIdLinks' href='{origin}{DETAIL_PATH}?orderid={oid}'>{oid}</a> "
+            f"<span class='shop-name'><a href='#'>{html.escape(order['shop'])}</a></span>"
+            "</td></tr>"
+            + "".join(products)
+            + f"<tr><td><span class='consignee'>{order['receiver']}</span></td>"
+            f"<td><span class='order-status'>{order['status']}</span></td>"
+            f"<td><a href='{origin}{DETAIL_PATH}?orderid={oid}'>订单详情</a></td></tr>"
+            "</tbody>"
+        )
+
+    def _href(p):
+        q = {k: v for k, v in query.items() if k != "page"}
+        q["page"] = p
+        return f"{LIST_PATH}?{urlencode(q)}"
+
+    pager = [f"<a href='{_href(p)}'>{p}</a>" for p in range(1, data.total_pages + 1)]
+    if page < data.total_pages:
+        pager.append(f"<a class='next' href='{_href(page + 1)}'>下一页</a>")
+    else:
+        pager.append("<a class='next disabled' href='#'>下一页</a>")
+    body = (
+        "<table class='order-tb'>" + "".join(rows) + "</table>"
+        + "<div class='pagin'>" + "".join(pager) + "</div>"
+    )
+    return _page_shell("我的订单", body)
+
+
+def render_detail_page(order: dict) -> str:
+    body = (
+        "<div class='order-info'>"
+        f"<div class='item'><span class='label'>收货地址：</span><div class='info-rcol'>{html.escape(order['address'])}</div></div>"
+        f"<div class='item'><span class='label'>收货人：</span><div class='info-rcol'>{order['receiver']}</div></div>"
+        "</div>"
+    )
+    return _page_shell(f"订单详情 {order['id']}", body)
+
+
+class JDFixtureServer:
+    """在后台线程运行的替身服务；stats 记录各路由请求数与注入次数。"""
+
+    def __init__(self, data: FixtureData = None, config: FixtureConfig = None, host: str = "127.0.0.1", port: int = 0):
+        self.data = data or FixtureData()
+        self.config = config or FixtureConfig()
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+        self._list_hits = 0
+        self._png = _png_bytes()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def origin(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def list_url(self) -> str:
+        return f"{self.origin}{LIST_PATH}"
+
+    @property
+    def detail_url_template(self) -> str:
+        return f"{self.origin}{DETAIL_PATH}?orderid={{order_id}}"
+
+    def scraper_env(self) -> dict:
+        """让 JDScraper 指向本服务所需的环境变量。"""
+        return {
+            "JD_BASE_URL": self.list_url,
+            "JD_DETAIL_URL": self.detail_url_template,
+            "JD_HOME_URL": f"{self.origin}/",
+        }
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="jd-fixture", daemon=True)
+        self._thread.start()
+        logger.info(f"JD fixture server listening on {self.origin} ({len(self.data.orders)} orders)")
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def serve_forever(self):
+        logger.info(f"JD fixture server listening on {self.origin} ({len(self.data.orders)} orders)")
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, fmt, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str = "text/html; charset=utf-8", headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _redirect(self, location: str):
+                self._send(302, b"", headers={"Location": location})
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+                cfg = server.config
+                path = parsed.path
+
+                if path == LIST_PATH:
+                    server._count("list")
+                    with server._stats_lock:
+                        server._list_hits += 1
+                        hits = server._list_hits
+                    cfg.delay(cfg.latency_ms)
+                    if cfg.passport_after and hits > cfg.passport_after:
+                        server._count("inject_passport")
+                        return self._redirect(f"{PASSPORT_PATH}?ReturnUrl={LIST_PATH}")
+                    if cfg.roll(cfg.risk_rate):
+                        server._count("inject_risk")
+                        return self._redirect(RISK_PATH)
+                    if cfg.roll(cfg.error_rate):
+                        server._count("inject_error")
+                        return self._send(502, b"Bad Gateway", "text/plain")
+                    page = max(1, min(server.data.total_pages, int(query.get("page", "1") or 1)))
+                    return self._send(200, render_list_page(server.data, page, query, server.origin).encode("utf-8"))
+
+                if path == DETAIL_PATH:
+                    server._count("detail")
+                    cfg.delay(cfg.latency_ms)
+                    if cfg.roll(cfg.risk_rate):
+                        server._count("inject_risk")
+                        return self._redirect(RISK_PATH)
+                    if cfg.roll(cfg.error_rate):
+                        server._count("inject_error")
+                        return self._send(502, b"Bad Gateway", "text/plain")
+                    order = server.data.by_id.get(query.get("orderid", ""))
+                    if order is None:
+                        return self._send(404, b"order not found", "text/plain")
+                    return self._send(200, render_detail_page(order).encode("utf-8"))
+
+                if path.startswith(IMAGE_PREFIX):
+                    server._count("image")
+                    cfg.delay(cfg.image_latency_ms)
+                    if cfg.roll(cfg.error_rate):
+                        server._count("inject_error")
+                        return self._send(503, b"", "text/plain", headers={"Retry-After": "1"})
+                    return self._send(200, server._png, "image/png", headers={"Cache-Control": "max-age=86400"})
+
+                if path == PASSPORT_PATH:
+                    server._count("passport")
+                    return self._send(200, _page_shell("京东-欢迎登录", "<div class='login-form'>请登录</div>").encode("utf-8"))
+
+                if path == RISK_PATH:
+                    server._count("risk")
+                    return self._send(200, _page_shell("安全验证", "<div class='captcha'>请完成验证</div>").encode("utf-8"))
+
+                if path == "/":
+                    server._count("home")
+                    return self._send(200, _page_shell("京东", "<div id='home'>home</div>").encode("utf-8"))
+
+                server._count("not_found")
+                return self._send(404, b"not found", "text/plain")
+
+        return Handler
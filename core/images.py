@@ -0,0 +1,105 @@
+"""
+商品图片取图辅助：URL 归一（同一张图的不同尺寸/镜像/格式变体得到同一个 key）、
+单飞（同一 key 的并发请求只发一次）与可选的感知哈希（不同 URL 下的同一张图合并存储）。
+"""
+import io
+import re
+import threading
+from urllib.parse import urlsplit
+
+
+# 京东图片 CDN：img10.360buyimg.com / img30.360buyimg.com ... 互为镜像
+_JD_IMAGE_HOST = re.compile(r"^img\d*\.360buyimg\.com$", re.I)
+# 路径中 jfs/ 之前是尺寸桶与缩放前缀，如 /n1/s110x110_jfs/、/n5/jfs/、/N7/s54x54_jfs/
+_JFS_PATH = re.compile(r"(?:^|/|_)(jfs/.+)$")
+# 末段扩展名之后的变体后缀，如 .jpg!q70.dpg.webp、.jpg.avif、.png!cc_100x100
+_VARIANT_SUFFIX = re.compile(r"(\.(?:jpe?g|png|gif|bmp|webp))(?:[!.].*)$", re.I)
+
+
+def image_fetch_url(url: str) -> str:
+    url = (url or "").strip()
+    return "https:" + url if url.startswith("//") else url
+
+
+def image_key(url: str) -> str:
+    """去重用的归一 key：京东图片只保留 jfs/ 之后的原图路径，其余 URL 去掉协议与片段。"""
+    url = image_fetch_url(url)
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    host = (parts.hostname or "").lower()
+    path = parts.path
+    if _JD_IMAGE_HOST.match(host):
+        match = _JFS_PATH.search(path)
+        if match:
+            path = "/" + match.group(1)
+        return "360buyimg.com" + _VARIANT_SUFFIX.sub(r"\1", path)
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{host}{path}{query}" if host else url
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """同一 key 的并发调用只执行一次 fn，其余调用阻塞等待并共享结果（或异常）；调用结束后不缓存。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+
+def image_dhash(data: bytes, size: int = 8):
+    """
+    差值哈希：缩成 (size+1)×size 灰度图，逐行比较相邻像素得到 size*size 位指纹，另附平均灰度，
+    避免纯色/近纯色图因指纹全 0 被误并。需要 Pillow，失败返回 None。
+    """
+    try:
+        from PIL import Image
+
+        with Image.open(io.BytesIO(data)) as img:
+            small = img.convert("L").resize((size + 1, size), Image.BILINEAR)
+        pixels = list(small.tobytes())
+    except Exception:
+        return None
+    bits = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits, sum(pixels) // len(pixels)
+
+
+def dhash_close(a, b, distance: int) -> bool:
+    return bin(a[0] ^ b[0]).count("1") <= distance and abs(a[1] - b[1]) <= 8
@@ -0,0 +1,172 @@
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+from core.columnar import load_export
+from core.schema import apply_schema, for_export
+
+
+ACCOUNT_COLUMN = "账号"
+
+
+def _account_worker(profile: str, ranges, headless: bool, download_dir: str, events):
+    """子进程入口：按 JD_PROFILE 隔离浏览器 profile / auth.json / fingerprint.json，依次采集各时间范围。"""
+    os.environ["JD_PROFILE"] = profile
+    os.environ.pop("JD_PROFILE_DIR", None)
+    os.environ.pop("JD_FINGERPRINT_FILE", None)
+    if download_dir:
+        os.environ["JD_DOWNLOAD_DIR"] = str(Path(download_dir) / profile)
+
+    def _forward(message):
+        record = message.record
+        try:
+            events.put_nowait({
+                "type": "log",
+                "profile": profile,
+                "level": record["level"].name,
+                "message": record["message"],
+                "time": record["time"].timestamp(),
+            })
+        except Exception:
+            pass
+
+    logger.add(_forward, level="INFO")
+    from core.logs import setup_logging
+    # 每个账号子进程写自己的日志文件，避免多进程同时轮转同一文件
+    setup_logging(f"account-{profile}")
+
+    from core.scraper import JDScraper
+
+    scraper = JDScraper(headless=headless)
+    results = []
+    for year_filter in ranges:
+        events.put({"type": "start", "profile": profile, "range": year_filter, "time": time.time()})
+
+        def _progress(snapshot, year_filter=year_filter):
+            try:
+                events.put_nowait({"type": "progress", "profile": profile, "range": year_filter,
+                                   "progress": snapshot, "time": time.time()})
+            except Exception:
+                pass
+
+        # 与 cli._scrape_once 一致：无界面子进程里没有 auth.json 时不要进入扫码登录（会切成有界面浏览器等待 300s）
+        if headless and not os.path.exists(scraper.auth_file):
+            result = {"status": "no_auth", "message": f"auth.json 不存在，请先在有界面的环境登录: {scraper.auth_file}"}
+        else:
+            try:
+                result = scraper.scrape_orders(year_filter, progress_cb=_progress)
+            except Exception as e:
+                result = {"status": "error", "message": str(e)}
+        result = dict(result or {}, range=year_filter)
+        results.append(result)
+        events.put({"type": "done", "profile": profile, "range": year_filter, "result": result, "time": time.time()})
+    return profile, results
+
+
+def merge_account_exports(account_results: dict, output_dir: Path):
+    """把各账号的导出文件合并成一个带「账号」列的数据集，返回 (文件路径, 行数)。"""
+    frames = []
+    for profile, results in account_results.items():
+        for result in results:
+            if result.get("status") != "success" or not result.get("file"):
+                continue
+            try:
+                df = load_export(result["file"])
+            except Exception as e:
+                logger.warning(f"读取账号导出失败 {profile}: {e}")
+                continue
+            df.insert(0, ACCOUNT_COLUMN, profile)
+            frames.append(df)
+    if not frames:
+        return None, 0
+    # 先合并原始数据再统一定型，避免各账号 category 取值不同时退化为 object
+    merged = apply_schema(pd.concat(frames, ignore_index=True))
+    if "商品图片" in merged.columns:
+        merged = merged.drop(columns=["商品图片"])
+    merged[ACCOUNT_COLUMN] = merged[ACCOUNT_COLUMN].astype("category")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    filepath = output_dir / f"jd_orders_accounts_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    for_export(merged).to_excel(filepath, index=False)
+    return filepath, len(merged)
+
+
+def run_accounts(jobs, max_workers: int = None, headless: bool = False, download_dir=None, on_event=None):
+    """
+    多账号并行采集：每个 profile 一个独立子进程（同时最多 max_workers 个），
+    进度事件通过 on_event(dict) 实时回传，结束后合并为一个带账号列的数据集。
+
+    jobs: {profile: [year_filter, ...]} 或 [(profile, [year_filter, ...]), ...]
+    """
+    jobs = list(jobs.items()) if isinstance(jobs, dict) else list(jobs)
+    if not jobs:
+        return {"status": "empty", "message": "No accounts given"}
+    if max_workers is None:
+        max_workers = int(os.getenv("JD_ACCOUNT_WORKERS", "2") or 2)
+    max_workers = max(1, min(max_workers, len(jobs)))
+    if download_dir is None:
+        from core.scraper import _data_base_dir
+        download_dir = os.getenv("JD_DOWNLOAD_DIR", _data_base_dir() / "downloads")
+    download_dir = Path(download_dir).expanduser().resolve()
+
+    # spawn：各子进程拥有独立的 Playwright 驱动与环境变量，互不共享 greenlet/线程状态
+    ctx = multiprocessing.get_context("spawn")
+    manager = ctx.Manager()
+    events = manager.Queue()
+    account_results = {}
+    started = time.time()
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx, max_tasks_per_child=1) as pool:
+            futures = {
+                pool.submit(_account_worker, profile, list(ranges), headless, str(download_dir), events): profile
+                for profile, ranges in jobs
+            }
+            pending = set(futures)
+            while pending:
+                try:
+                    event = events.get(timeout=0.5)
+                except queue.Empty:
+                    event = None
+                if event is not None and on_event:
+                    on_event(event)
+                for fut in [f for f in pending if f.done()]:
+                    pending.discard(fut)
+                    profile = futures[fut]
+                    try:
+                        _, results = fut.result()
+                    except Exception as e:
+                        logger.error(f"账号 {profile} 采集进程异常: {e}")
+                        results = [{"status": "error", "message": str(e)}]
+                    account_results[profile] = results
+            # 取尽剩余事件
+            while on_event:
+                try:
+                    on_event(events.get_nowait())
+                except queue.Empty:
+                    break
+    finally:
+        manager.shutdown()
+
+    merged_file, row_count = merge_account_exports(account_results, download_dir)
+    if merged_file:
+        status = "success"
+    elif any(r.get("status") == "error" for results in account_results.values() for r in results):
+        status = "error"
+    elif any(r.get("status") == "no_auth" for results in account_results.values() for r in results):
+        status = "no_auth"
+    else:
+        status = "empty"
+    return {
+        "status": status,
+        "file": str(merged_file) if merged_file else "",
+        "count": row_count,
+        "accounts": account_results,
+        "elapsed_s": round(time.time() - started, 1),
+    }
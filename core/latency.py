@@ -0,0 +1,158 @@
+import json
+import os
+import random
+import threading
+from collections import deque
+from pathlib import Path
+
+from loguru import logger
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except Exception:
+        return default
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except Exception:
+        return default
+
+
+class LatencyTracker:
+    """
+    按步骤类型记录耗时样本（ms），据成功样本的 p95 推导超时，并按 profile 持久化。
+    超时的等待不进入样本（有些等待本来就会超时，如没有订单的年份等不到订单表），只计入超时比例：
+    比例超过 JD_TIMEOUT_RAISE_RATIO 时超时按 JD_TIMEOUT_RAISE_STEP 上调一档，不会逐次叠加。
+    """
+
+    def __init__(self, path, window: int = 200):
+        self.path = Path(path)
+        self.window = window
+        self.enabled = os.getenv("JD_ADAPTIVE_TIMEOUT", "1") != "0"
+        self.min_ms = _env_int("JD_TIMEOUT_MIN_MS", 2000)
+        self.max_ms = _env_int("JD_TIMEOUT_MAX_MS", 60000)
+        self.headroom = _env_float("JD_TIMEOUT_HEADROOM", 2.5)
+        self.min_samples = _env_int("JD_LATENCY_MIN_SAMPLES", 8)
+        self.idle_skip_ratio = _env_float("JD_NETWORKIDLE_SKIP_RATIO", 0.6)
+        self.idle_probe_prob = _env_float("JD_NETWORKIDLE_PROBE_PROB", 0.1)
+        self.raise_ratio = _env_float("JD_TIMEOUT_RAISE_RATIO", 0.05)
+        self.raise_step = _env_float("JD_TIMEOUT_RAISE_STEP", 0.5)
+        self._samples = {}
+        self._timeouts = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def _series(self, kind: str):
+        series = self._samples.get(kind)
+        if series is None:
+            series = deque(maxlen=self.window)
+            self._samples[kind] = series
+            self._timeouts[kind] = deque(maxlen=self.window)
+        return series
+
+    def record(self, kind: str, seconds: float, timed_out: bool = False):
+        """记录一次等待：成功的计入耗时样本，超时的只计入超时比例。每个样本应只对应一次等待。"""
+        with self._lock:
+            series = self._series(kind)
+            if not timed_out:
+                series.append(round(seconds * 1000.0, 1))
+            self._timeouts[kind].append(1 if timed_out else 0)
+
+    def percentile(self, kind: str, q: float):
+        with self._lock:
+            values = sorted(self._samples.get(kind) or [])
+        if not values:
+            return None
+        pos = min(len(values) - 1, max(0, int(round(q / 100.0 * (len(values) - 1)))))
+        return values[pos]
+
+    def count(self, kind: str) -> int:
+        with self._lock:
+            return len(self._samples.get(kind) or [])
+
+    def timeout_ratio(self, kind: str) -> float:
+        with self._lock:
+            flags = self._timeouts.get(kind) or []
+            return (sum(flags) / len(flags)) if flags else 0.0
+
+    def timeout_ms(self, kind: str, default_ms: int) -> int:
+        """
+        成功样本不足时用默认值，否则取 p95 * headroom（不低于 min_ms）；超时比例偏高时再上调 raise_step
+        （一次，不叠加），结果不超过 max_ms。
+        """
+        if not self.enabled:
+            return int(default_ms)
+        if self.count(kind) < self.min_samples:
+            base = float(default_ms)
+        else:
+            base = (self.percentile(kind, 95) or default_ms) * self.headroom
+        base = max(self.min_ms, base)
+        if self.timeout_ratio(kind) > self.raise_ratio:
+            base *= 1.0 + self.raise_step
+        return int(min(self.max_ms, base))
+
+    def attempts(self, kind: str) -> int:
+        with self._lock:
+            return len(self._timeouts.get(kind) or [])
+
+    def networkidle_timeout_ms(self, kind: str, default_ms: int):
+        """返回 networkidle 等待时长；多数等待都超时时返回 None（跳过），偶尔探测以便恢复。"""
+        if not self.enabled or self.attempts(kind) < self.min_samples:
+            return int(default_ms)
+        if self.timeout_ratio(kind) >= self.idle_skip_ratio and random.random() > self.idle_probe_prob:
+            return None
+        return self.timeout_ms(kind, default_ms)
+
+    def summary(self):
+        kinds = list(self._samples.keys())
+        return {
+            kind: {
+                "count": self.count(kind),
+                "attempts": self.attempts(kind),
+                "p50_ms": self.percentile(kind, 50),
+                "p95_ms": self.percentile(kind, 95),
+                "timeout_ratio": round(self.timeout_ratio(kind), 3),
+            }
+            for kind in kinds
+        }
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f) or {}
+        except Exception as e:
+            logger.warning(f"读取延迟统计失败，将重新学习: {e}")
+            return
+        legacy = data.get("version") is None
+        with self._lock:
+            for kind, entry in (data.get("kinds") or {}).items():
+                series = self._series(kind)
+                samples = entry.get("samples") or []
+                flags = entry.get("timeouts") or [0] * len(samples)
+                if legacy and len(flags) == len(samples):
+                    # 旧格式把超时的等待也当作样本（值为超时时长），读入时剔除
+                    samples = [v for v, flag in zip(samples, flags) if not flag]
+                series.extend(samples)
+                self._timeouts[kind].extend(flags)
+
+    def save(self):
+        with self._lock:
+            data = {
+                "version": 2,
+                "kinds": {
+                    kind: {"samples": list(series), "timeouts": list(self._timeouts.get(kind) or [])}
+                    for kind, series in self._samples.items()
+                }
+            }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=True)
+        except Exception as e:
+            logger.warning(f"写入延迟统计失败: {e}")
@@ -0,0 +1,117 @@
+import atexit
+import contextvars
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+from loguru import logger
+
+
+# 当前上下文（线程/协程）的日志字段：run_id / profile / phase，由 patcher 注入每条记录的 extra
+_log_ctx = contextvars.ContextVar("jd_log_ctx", default=None)
+_setup_lock = threading.Lock()
+_configured = {}
+
+CONTEXT_FIELDS = ("run_id", "profile", "phase")
+
+
+def set_log_context(**fields):
+    """合并更新当前上下文的日志字段，返回可用于 reset_log_context 的 token。"""
+    ctx = dict(_log_ctx.get() or {})
+    ctx.update({k: v for k, v in fields.items() if v is not None})
+    return _log_ctx.set(ctx)
+
+
+def reset_log_context(token):
+    try:
+        _log_ctx.reset(token)
+    except ValueError:
+        # token 来自其他上下文（例如跨线程），直接清空
+        _log_ctx.set(None)
+
+
+def _patch(record):
+    ctx = _log_ctx.get()
+    extra = record["extra"]
+    if ctx:
+        for key, value in ctx.items():
+            extra.setdefault(key, value)
+    for key in CONTEXT_FIELDS:
+        extra.setdefault(key, "")
+
+
+def _json_format(record):
+    """一行一个 JSON 对象（JSON Lines），字段扁平，便于 grep / jq 跨运行检索。"""
+    extra = record["extra"]
+    entry = {
+        "ts": record["time"].isoformat(timespec="milliseconds"),
+        "level": record["level"].name,
+        "msg": record["message"],
+        "run_id": extra.get("run_id", ""),
+        "profile": extra.get("profile", ""),
+        "phase": extra.get("phase", ""),
+        "where": f"{record['name']}:{record['function']}:{record['line']}",
+        "thread": record["thread"].name,
+        "pid": record["process"].id,
+    }
+    for key, value in extra.items():
+        if key not in entry and not key.startswith("_"):
+            entry[key] = value
+    if record["exception"] is not None:
+        exc = record["exception"]
+        entry["exc"] = f"{getattr(exc.type, '__name__', exc.type)}: {exc.value}"
+    extra["_json"] = json.dumps(entry, ensure_ascii=False, default=str)
+    return "{extra[_json]}\n"
+
+
+def _retention(raw: str):
+    raw = (raw or "").strip()
+    return int(raw) if raw.isdigit() else (raw or None)
+
+
+def setup_logging(component: str = "app", log_dir=None):
+    """
+    进程级日志初始化（幂等）：
+    - stderr 改为 enqueue（后台线程写出，不阻塞采集线程），级别 JD_LOG_LEVEL；
+    - 追加 JSON Lines 文件 <log_dir>/jd_<component>.jsonl，按大小轮转（JD_LOG_ROTATION，默认 20 MB），
+      保留 JD_LOG_RETENTION 个文件（默认 10）；JD_LOG_FILE=0 关闭文件日志。
+    """
+    with _setup_lock:
+        if component in _configured:
+            return _configured[component]
+        if not _configured:
+            logger.configure(patcher=_patch)
+            try:
+                logger.remove(0)
+                logger.add(sys.stderr, level=os.getenv("JD_LOG_LEVEL", "INFO"), enqueue=True)
+            except ValueError:
+                # 默认 handler 已被其他代码移除/替换，保留现状
+                pass
+            atexit.register(logger.complete)
+
+        path = None
+        if os.getenv("JD_LOG_FILE", "1") != "0":
+            if log_dir is None:
+                from core.scraper import _data_base_dir
+                log_dir = os.getenv("JD_LOG_DIR") or (_data_base_dir() / "logs")
+            path = Path(log_dir).expanduser().resolve() / f"jd_{component}.jsonl"
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                logger.add(
+                    str(path),
+                    format=_json_format,
+                    level=os.getenv("JD_LOG_FILE_LEVEL", "DEBUG"),
+                    enqueue=True,
+                    rotation=os.getenv("JD_LOG_ROTATION", "20 MB"),
+                    retention=_retention(os.getenv("JD_LOG_RETENTION", "10")),
+                    encoding="utf-8",
+                    backtrace=False,
+                    diagnose=False,
+                )
+            except Exception as e:
+                logger.warning(f"文件日志初始化失败，仅输出到 stderr: {e}")
+                path = None
+        _configured[component] = path
+        return path
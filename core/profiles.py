@@ -0,0 +1,229 @@
+"""
+浏览器 profile 目录维护：统计各 profile 大小、把 Chromium 缓存子目录控制在预算内、回收过期的轮换 profile。
+只删除可再生的缓存与旧的轮换 profile；当前使用中的 profile 的 auth.json / fingerprint.json / Cookies 等登录状态从不触碰，
+浏览器正在使用（存在 SingletonLock）的 profile 整体跳过。
+
+    python -m core profiles                       # 报告
+    python -m core profiles --prune --measure     # 清理并测量清理前后的启动耗时
+"""
+import os
+import re
+import shutil
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from loguru import logger
+
+
+# Chromium 用户数据目录下可安全删除、下次启动自动重建的缓存
+CACHE_SUBDIRS = (
+    "Default/Cache",
+    "Default/Code Cache",
+    "Default/GPUCache",
+    "Default/DawnGraphiteCache",
+    "Default/DawnWebGPUCache",
+    "Default/Service Worker/CacheStorage",
+    "Default/Service Worker/ScriptCache",
+    "GrShaderCache",
+    "GraphiteDawnCache",
+    "ShaderCache",
+    "component_crx_cache",
+)
+LOCK_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie", "lockfile")
+# _rotate_profile 生成的目录名：<base>_<YYYYmmdd_HHMMSS>
+_ROTATED = re.compile(r"^(?P<base>.+)_(?P<ts>\d{8}_\d{6})$")
+
+
+def dir_size(path) -> int:
+    total = 0
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        total += dir_size(entry.path)
+                    else:
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return total
+
+
+def _mb(size: int) -> float:
+    return round(size / (1024.0 * 1024.0), 1)
+
+
+def profile_in_use(profile_dir) -> bool:
+    # SingletonLock 在 Linux/macOS 上是指向 主机名-进程号 的符号链接，目标不存在也算
+    return any(os.path.lexists(Path(profile_dir) / name) for name in LOCK_FILES)
+
+
+def cache_sizes(profile_dir) -> dict:
+    sizes = {}
+    for sub in CACHE_SUBDIRS:
+        path = Path(profile_dir) / sub
+        if path.is_dir():
+            sizes[sub] = dir_size(path)
+    return sizes
+
+
+def rotated_at(name: str):
+    match = _ROTATED.match(name)
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group("ts"), "%Y%m%d_%H%M%S")
+    except ValueError:
+        return None
+
+
+def _profile_dirs(profiles_root, active_dir=None) -> list:
+    """profiles_root 下的各 profile，外加（JD_PROFILE_DIR 指向别处时的）当前 profile。"""
+    dirs = []
+    try:
+        dirs = [Path(e.path) for e in os.scandir(profiles_root) if e.is_dir(follow_symlinks=False)]
+    except OSError:
+        pass
+    active = Path(active_dir).resolve() if active_dir else None
+    if active and active.is_dir() and active not in [d.resolve() for d in dirs]:
+        dirs.append(active)
+    return dirs
+
+
+def profile_report(profiles_root, active_dir=None) -> list:
+    """各 profile 的总大小、缓存大小、是否有登录状态、是否为当前/使用中，按大小降序。需要遍历全部文件。"""
+    active = Path(active_dir).resolve() if active_dir else None
+    rows = []
+    for path in _profile_dirs(profiles_root, active_dir):
+        caches = cache_sizes(path)
+        stamp = rotated_at(path.name)
+        rows.append({
+            "name": path.name,
+            "path": str(path),
+            "size_mb": _mb(dir_size(path)),
+            "cache_mb": _mb(sum(caches.values())),
+            "has_auth": (path / "auth.json").exists(),
+            "active": active is not None and path.resolve() == active,
+            "in_use": profile_in_use(path),
+            "rotated_at": stamp.isoformat(timespec="seconds") if stamp else None,
+        })
+    rows.sort(key=lambda r: r["size_mb"], reverse=True)
+    return rows
+
+
+def trim_caches(profile_dir, budget_bytes: int, dry_run: bool = False) -> dict:
+    """缓存总量超过预算时，从最大的缓存子目录开始整目录删除，直到回到预算内。"""
+    result = {"profile": str(profile_dir), "freed_mb": 0.0, "removed": [], "skipped": None}
+    if profile_in_use(profile_dir):
+        result["skipped"] = "in_use"
+        return result
+    sizes = cache_sizes(profile_dir)
+    total = sum(sizes.values())
+    freed = 0
+    for sub, size in sorted(sizes.items(), key=lambda kv: kv[1], reverse=True):
+        if total - freed <= budget_bytes:
+            break
+        if not dry_run:
+            shutil.rmtree(Path(profile_dir) / sub, ignore_errors=True)
+        freed += size
+        result["removed"].append(sub)
+    result["freed_mb"] = _mb(freed)
+    return result
+
+
+def gc_profiles(profiles_root, active_dir, max_age_days: int, keep_latest: int = 1, dry_run: bool = False,
+                sized: bool = True) -> list:
+    """
+    删除早于 max_age_days 的轮换 profile（<base>_<时间戳>）。每个 base 至少保留最新的 keep_latest 个，
+    当前 profile 与使用中的 profile 不删。年龄取自目录名；sized=False 时不统计被删目录的大小（size_mb 为 None）。
+    """
+    active = Path(active_dir).resolve() if active_dir else None
+    cutoff = datetime.now() - timedelta(days=max_age_days)
+    groups = {}
+    try:
+        entries = [Path(e.path) for e in os.scandir(profiles_root) if e.is_dir(follow_symlinks=False)]
+    except OSError:
+        return []
+    for path in entries:
+        stamp = rotated_at(path.name)
+        if stamp is not None:
+            groups.setdefault(_ROTATED.match(path.name).group("base"), []).append((stamp, path))
+    removed = []
+    for _base, items in groups.items():
+        items.sort(reverse=True)
+        for stamp, path in items[max(0, keep_latest):]:
+            if stamp >= cutoff or path.resolve() == active or profile_in_use(path):
+                continue
+            size = _mb(dir_size(path)) if sized else None
+            if not dry_run:
+                shutil.rmtree(path, ignore_errors=True)
+            removed.append({"name": path.name, "size_mb": size, "rotated_at": stamp.isoformat(timespec="seconds")})
+    return removed
+
+
+def measure_launch(profile_dir, channel=None, headless: bool = True):
+    """用该 profile 启动并关闭一次持久化上下文，返回耗时（秒）；无法启动返回 None。"""
+    if profile_in_use(profile_dir):
+        return None
+    from playwright.sync_api import sync_playwright
+
+    kwargs = {"user_data_dir": str(profile_dir), "headless": headless}
+    if channel and channel != "bundled":
+        kwargs["channel"] = channel
+    try:
+        with sync_playwright() as p:
+            started = time.monotonic()
+            context = p.chromium.launch_persistent_context(**kwargs)
+            elapsed = time.monotonic() - started
+            context.close()
+            return round(elapsed, 3)
+    except Exception as e:
+        logger.warning("启动耗时测量失败: {err}", err=e)
+        return None
+
+
+def maintain_profiles(profiles_root, active_dir, cache_budget_mb: int = 256, gc_days: int = 30, keep_latest: int = 1,
+                      prune: bool = True, dry_run: bool = False, measure: bool = False, channel=None,
+                      report: bool = True) -> dict:
+    """
+    报告 + 清理：cache_budget_mb <= 0 不清缓存，gc_days <= 0 不回收轮换 profile。
+    report=False（启动时）只统计缓存子目录的大小，不做前后两次整目录遍历，也不统计被回收 profile 的大小。
+    measure 时在清理前后各用当前 profile 启动一次（headless）对比耗时。
+    """
+    profiles_root = Path(profiles_root)
+    active_dir = Path(active_dir)
+    summary = {"profiles_root": str(profiles_root), "active": str(active_dir), "dry_run": dry_run}
+    if report:
+        summary["before"] = profile_report(profiles_root, active_dir)
+        summary["total_mb_before"] = round(sum(r["size_mb"] for r in summary["before"]), 1)
+    if measure:
+        summary["launch_s_before"] = measure_launch(active_dir, channel=channel)
+    if prune:
+        trimmed = []
+        if cache_budget_mb > 0:
+            for path in _profile_dirs(profiles_root, active_dir):
+                res = trim_caches(path, cache_budget_mb * 1024 * 1024, dry_run=dry_run)
+                if res["removed"] or res["skipped"]:
+                    trimmed.append(res)
+        summary["trimmed"] = trimmed
+        summary["removed_profiles"] = (
+            gc_profiles(profiles_root, active_dir, gc_days, keep_latest=keep_latest, dry_run=dry_run, sized=report)
+            if gc_days > 0 else []
+        )
+        freed = sum(t["freed_mb"] for t in trimmed) + sum(p["size_mb"] or 0 for p in summary["removed_profiles"])
+        summary["freed_mb"] = round(freed, 1)
+        if report and not dry_run:
+            summary["after"] = profile_report(profiles_root, active_dir)
+            summary["total_mb_after"] = round(sum(r["size_mb"] for r in summary["after"]), 1)
+        if freed or summary["removed_profiles"]:
+            logger.info(
+                "Profile 维护{mode}释放 {freed} MB（清理缓存 {trimmed} 个 profile，回收轮换 profile {removed} 个）",
+                mode="（dry-run）：可" if dry_run else "：", freed=summary["freed_mb"],
+                trimmed=sum(1 for t in trimmed if t["removed"]), removed=len(summary["removed_profiles"]),
+            )
+    if measure and prune and not dry_run:
+        summary["launch_s_after"] = measure_launch(active_dir, channel=channel)
+    return summary
@@ -0,0 +1,201 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+from loguru import logger
+
+
+PROFILER_MODES = ("cprofile", "sample", "tracemalloc")
+
+
+class StackSampler:
+    """
+    低开销采样：后台线程按固定间隔抓取所有线程的调用栈（sys._current_frames），
+    计数后输出 collapsed 格式（"线程;函数;函数 次数"），可直接给 flamegraph.pl / speedscope。
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = max(0.001, interval)
+        self.counts = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(tid, f"thread-{tid}"))
+                self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write(self, path: Path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RunProfiler:
+    """
+    采集/导出的可选剖析：JD_PROFILER=cprofile,sample,tracemalloc（任意组合），
+    JD_PROFILER_SCOPE=scrape|export 决定包住整次采集还是仅导出阶段。
+    tracemalloc 在阶段切换处（mark）记录当前/峰值内存与新增分配 Top N。
+    """
+
+    def __init__(self, modes=(), scope: str = "scrape", sample_interval: float = 0.01,
+                 trace_frames: int = 1, top_n: int = 15):
+        self.modes = tuple(m for m in modes if m in PROFILER_MODES)
+        self.scope = scope if scope in ("scrape", "export") else "scrape"
+        self.sample_interval = sample_interval
+        self.trace_frames = max(1, trace_frames)
+        self.top_n = top_n
+        self.active = False
+        self._cprofile = None
+        self._sampler = None
+        self._started_tracemalloc = False
+        self._last_snapshot = None
+        self._alloc_lines = []
+        self._t0 = None
+
+    @classmethod
+    def from_env(cls):
+        raw = (os.getenv("JD_PROFILER", "") or "").strip().lower()
+        modes = PROFILER_MODES if raw in ("1", "all") else tuple(m.strip() for m in raw.split(",") if m.strip())
+        unknown = [m for m in modes if m not in PROFILER_MODES]
+        if unknown:
+            logger.warning(f"未知的 JD_PROFILER 模式已忽略: {', '.join(unknown)}")
+
+        def _num(name, default, cast):
+            try:
+                return cast(os.getenv(name, "") or default)
+            except ValueError:
+                return default
+
+        return cls(
+            modes=modes,
+            scope=(os.getenv("JD_PROFILER_SCOPE", "scrape") or "scrape").strip().lower(),
+            sample_interval=_num("JD_PROFILER_INTERVAL_MS", 10, float) / 1000.0,
+            trace_frames=_num("JD_PROFILER_TRACE_FRAMES", 1, int),
+            top_n=_num("JD_PROFILER_TOP", 15, int),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.modes)
+
+    def start(self):
+        if not self.enabled or self.active:
+            return
+        self.active = True
+        self._t0 = time.monotonic()
+        self._alloc_lines = []
+        self._last_snapshot = None
+        if "tracemalloc" in self.modes and not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+            self._started_tracemalloc = True
+        if "sample" in self.modes:
+            self._sampler = StackSampler(self.sample_interval)
+            self._sampler.start()
+        if "cprofile" in self.modes:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        logger.info(f"Profiler started ({', '.join(self.modes)}, scope={self.scope})")
+        self.mark("start")
+
+    def mark(self, label: str):
+        """阶段边界：记录 tracemalloc 当前/峰值内存，以及相对上一个边界新增最多的分配位置。"""
+        if not self.active or not tracemalloc.is_tracing():
+            return
+        # 快照与统计本身开销不小，期间暂停 cProfile，避免污染调用统计
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        try:
+            self._record_allocations(label)
+        finally:
+            if self._cprofile is not None and self.active:
+                self._cprofile.enable()
+
+    def _record_allocations(self, label: str):
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        elapsed = time.monotonic() - self._t0
+        lines = [f"== {label} @ {elapsed:.1f}s: current {current / 1048576:.1f} MB, peak {peak / 1048576:.1f} MB"]
+        if self._last_snapshot is None:
+            stats = snapshot.statistics("lineno")[: self.top_n]
+            lines.extend(f"  {stat}" for stat in stats)
+        else:
+            stats = snapshot.compare_to(self._last_snapshot, "lineno")[: self.top_n]
+            lines.extend(f"  {stat}" for stat in stats)
+        self._alloc_lines.extend(lines + [""])
+        self._last_snapshot = snapshot
+
+    def stop(self):
+        if not self.active:
+            return
+        self.mark("end")
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self._last_snapshot = None
+        self.active = False
+
+    def write(self, base) -> list:
+        """在 base（不含扩展名）旁写出 .prof/.prof.txt、.collapsed.txt、.alloc.txt，返回写出的路径。"""
+        if not self.enabled:
+            return []
+        self.stop()
+        base = Path(base)
+        written = []
+        try:
+            base.parent.mkdir(parents=True, exist_ok=True)
+            if self._cprofile is not None:
+                prof_path = base.with_name(base.name + ".prof")
+                self._cprofile.dump_stats(str(prof_path))
+                buf = io.StringIO()
+                pstats.Stats(self._cprofile, stream=buf).sort_stats("cumulative").print_stats(40)
+                text_path = base.with_name(base.name + ".prof.txt")
+                text_path.write_text(buf.getvalue(), encoding="utf-8")
+                written += [prof_path, text_path]
+            if self._sampler is not None:
+                collapsed_path = base.with_name(base.name + ".collapsed.txt")
+                self._sampler.write(collapsed_path)
+                written.append(collapsed_path)
+            if self._alloc_lines:
+                alloc_path = base.with_name(base.name + ".alloc.txt")
+                alloc_path.write_text("\n".join(self._alloc_lines), encoding="utf-8")
+                written.append(alloc_path)
+        except Exception as e:
+            logger.warning(f"写入剖析结果失败: {e}")
+        if written:
+            logger.info(f"Profile written: {', '.join(p.name for p in written)}")
+        return [str(p) for p in written]
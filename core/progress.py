@@ -0,0 +1,111 @@
+import time
+
+from loguru import logger
+
+from core.logs import set_log_context
+
+
+STAGE_LABELS = {
+    "launch": "启动浏览器",
+    "list": "列表页",
+    "detail": "订单详情",
+    "export": "写入表格",
+    "images": "嵌入图片",
+    "done": "完成",
+}
+
+
+class ScrapeProgress:
+    """
+    采集进度快照：阶段、页码、订单/商品数、详情与图片队列深度、退避倍率，
+    并按实测吞吐（每页/每张图的平滑耗时）估算剩余时间。
+    """
+
+    def __init__(self, callback=None, limiters=None, min_interval: float = 0.25):
+        self.callback = callback
+        self.limiters = limiters
+        self.min_interval = min_interval
+        self.started = time.monotonic()
+        self.state = {
+            "stage": "launch",
+            "page": 0,
+            "total_pages": None,
+            "orders": 0,
+            "items": 0,
+            "detail_pending": 0,
+            "detail_done": 0,
+            "images_total": 0,
+            "images_done": 0,
+        }
+        self._unit_s = {}
+        self._unit_mark = {}
+        self._last_emit = 0.0
+
+    def _mark_unit(self, kind: str):
+        """记录一个工作单元完成，用指数平滑更新单位耗时。"""
+        now = time.monotonic()
+        last = self._unit_mark.get(kind)
+        self._unit_mark[kind] = now
+        if last is None:
+            return
+        sample = now - last
+        prev = self._unit_s.get(kind)
+        self._unit_s[kind] = sample if prev is None else prev * 0.7 + sample * 0.3
+
+    def eta_s(self):
+        st = self.state
+        if st["stage"] == "list" and st["total_pages"] and "page" in self._unit_s:
+            remaining = max(0, st["total_pages"] - st["page"])
+            return remaining * self._unit_s["page"]
+        if st["stage"] == "images" and "image" in self._unit_s:
+            return max(0, st["images_total"] - st["images_done"]) * self._unit_s["image"]
+        return None
+
+    def update(self, force: bool = False, **fields):
+        if "stage" in fields and fields["stage"] != self.state["stage"]:
+            # 日志的 phase 字段跟随采集阶段
+            set_log_context(phase=fields["stage"])
+        self.state.update(fields)
+        self.emit(force=force)
+
+    def page_done(self, page: int, orders: int, items: int):
+        self._mark_unit("page")
+        self.update(page=page, orders=orders, items=items, force=True)
+
+    def detail_queued(self, count: int):
+        self.update(detail_pending=count)
+
+    def detail_done(self):
+        self.state["detail_done"] += 1
+        self.state["detail_pending"] = max(0, self.state["detail_pending"] - 1)
+        self.emit()
+
+    def images_started(self, total: int):
+        self._unit_mark.pop("image", None)
+        self.update(stage="images", images_total=total, images_done=0, force=True)
+
+    def image_done(self):
+        self._mark_unit("image")
+        self.state["images_done"] += 1
+        self.emit()
+
+    def snapshot(self):
+        snap = dict(self.state)
+        snap["stage_label"] = STAGE_LABELS.get(snap["stage"], snap["stage"])
+        snap["elapsed_s"] = round(time.monotonic() - self.started, 1)
+        eta = self.eta_s()
+        snap["eta_s"] = round(eta, 1) if eta is not None else None
+        snap["backoff"] = self.limiters.multipliers() if self.limiters is not None else {}
+        return snap
+
+    def emit(self, force: bool = False):
+        if not self.callback:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_emit < self.min_interval:
+            return
+        self._last_emit = now
+        try:
+            self.callback(self.snapshot())
+        except Exception as e:
+            logger.debug(f"progress callback failed: {e}")
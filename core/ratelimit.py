@@ -0,0 +1,175 @@
+import json
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+from loguru import logger
+
+
+def parse_retry_after(value):
+    """解析 Retry-After 头（秒数或 HTTP 日期），无法解析时返回 None。"""
+    if not value:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+class RateLimiter:
+    """线程安全的令牌桶：突发容量 + 乘性退避 / 加性恢复（AIMD）+ Retry-After 冷却。"""
+
+    def __init__(self, kind: str, min_interval: float, burst: int = 1, backoff_max: float = 6.0,
+                 recovery_step: float = 0.1, jitter=(0.05, 0.25)):
+        self.kind = kind
+        self.min_interval = max(0.0, float(min_interval))
+        self.burst = max(1, int(burst))
+        self.backoff_max = max(1.0, float(backoff_max))
+        self.recovery_step = max(0.0, float(recovery_step))
+        self.jitter = jitter
+        self.multiplier = 1.0
+        self.blocked_until = 0.0
+        self.slept_s = 0.0
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def interval(self) -> float:
+        return self.min_interval * self.multiplier
+
+    def _refill(self, now: float):
+        interval = self.interval
+        if interval <= 0:
+            self._tokens = float(self.burst)
+        else:
+            self._tokens = min(float(self.burst), self._tokens + max(0.0, now - self._updated) / interval)
+        self._updated = max(self._updated, now)
+
+    def reserve(self) -> float:
+        """预占一个令牌，返回调用方需要等待的秒数（不阻塞，供同步/异步共用）。"""
+        with self._lock:
+            now = time.monotonic()
+            if self.min_interval <= 0:
+                # 不限速的类型也要遵守服务端要求的冷却
+                wait_s = max(0.0, self.blocked_until - now)
+                self.slept_s += wait_s
+                return wait_s
+            self._refill(now)
+            self._tokens -= 1.0
+            wait_s = 0.0
+            if self._tokens < 0:
+                wait_s = -self._tokens * self.interval
+            if self.blocked_until > now:
+                wait_s = max(wait_s, self.blocked_until - now)
+            if wait_s > 0 and self.jitter:
+                wait_s += random.uniform(*self.jitter)
+            self.slept_s += wait_s
+        return wait_s
+
+    def acquire(self):
+        wait_s = self.reserve()
+        if wait_s > 0:
+            time.sleep(wait_s)
+        return wait_s
+
+    def backoff(self, factor: float = 1.6):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.multiplier = min(self.multiplier * factor, self.backoff_max)
+
+    def recover(self, step: float = None):
+        step = self.recovery_step if step is None else step
+        with self._lock:
+            if self.multiplier > 1.0:
+                now = time.monotonic()
+                self._refill(now)
+                self.multiplier = max(1.0, self.multiplier - step)
+
+    def retry_after(self, seconds: float):
+        """服务端要求冷却（如 429 的 Retry-After）：在此之前的所有预占都顺延。"""
+        if seconds is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + float(seconds))
+            # 冷却期间不积攒突发令牌：冷却结束时只放行一个请求
+            self._refill(now)
+            self._tokens = min(self._tokens, 1.0)
+            self._updated = self.blocked_until
+
+    def state(self):
+        return {"multiplier": round(self.multiplier, 4)}
+
+    def restore(self, state: dict, elapsed_s: float = 0.0, recover_every_s: float = 600.0):
+        """恢复上次运行的退避倍率；间隔越久，按加性步长恢复越多。"""
+        try:
+            multiplier = float((state or {}).get("multiplier", 1.0))
+        except Exception:
+            return
+        if recover_every_s > 0 and elapsed_s > 0:
+            multiplier -= self.recovery_step * int(elapsed_s // recover_every_s)
+        with self._lock:
+            self.multiplier = min(self.backoff_max, max(1.0, multiplier))
+
+
+class RateLimiterGroup:
+    """按类型（page/detail/image）管理限速器，并把退避状态持久化到 profile 目录。"""
+
+    def __init__(self, intervals: dict, path, bursts: dict = None, backoff_max: float = 6.0,
+                 recovery_step: float = 0.1):
+        self.path = Path(path)
+        bursts = bursts or {}
+        self.limiters = {
+            kind: RateLimiter(kind, interval, burst=bursts.get(kind, 1), backoff_max=backoff_max,
+                              recovery_step=recovery_step)
+            for kind, interval in intervals.items()
+        }
+        self._lock = threading.Lock()
+
+    def get(self, kind: str):
+        limiter = self.limiters.get(kind)
+        if limiter is None:
+            with self._lock:
+                limiter = self.limiters.setdefault(kind, RateLimiter(kind, 0.0))
+        return limiter
+
+    def __getitem__(self, kind: str):
+        return self.get(kind)
+
+    def multipliers(self):
+        return {kind: limiter.multiplier for kind, limiter in self.limiters.items()}
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f) or {}
+        except Exception as e:
+            logger.warning(f"读取限速状态失败，将从默认节奏开始: {e}")
+            return
+        elapsed = max(0.0, time.time() - float(data.get("saved_at") or time.time()))
+        for kind, state in (data.get("limiters") or {}).items():
+            if kind in self.limiters:
+                self.limiters[kind].restore(state, elapsed_s=elapsed)
+
+    def save(self):
+        data = {
+            "saved_at": time.time(),
+            "limiters": {kind: limiter.state() for kind, limiter in self.limiters.items()},
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=True, indent=2)
+        except Exception as e:
+            logger.warning(f"写入限速状态失败: {e}")
@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from loguru import logger
+
+
+def _percentile(values, q: float):
+    if not values:
+        return None
+    values = sorted(values)
+    pos = min(len(values) - 1, max(0, int(round(q / 100.0 * (len(values) - 1)))))
+    return values[pos]
+
+
+class RunReport:
+    """
+    单次采集的分阶段计时：span(phase) 记录次数、总耗时与 p50/p95，
+    限速/随机等待单独计入 sleep，便于区分「在等」与「在干活」。
+    阶段可嵌套（如 parse_row 包含 detail），各阶段耗时均为含子阶段的总时长。
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._t0 = time.monotonic()
+        self.finished = None
+        self._durations = {}
+        self._sleeps = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, phase: str):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(phase, time.monotonic() - start)
+
+    def record(self, phase: str, seconds: float):
+        with self._lock:
+            self._durations.setdefault(phase, []).append(seconds)
+
+    def add_sleep(self, kind: str, seconds: float):
+        if seconds <= 0:
+            return
+        with self._lock:
+            self._sleeps[kind] = self._sleeps.get(kind, 0.0) + seconds
+
+    def finish(self):
+        if self.finished is None:
+            self.finished = time.monotonic()
+
+    def summary(self):
+        end = self.finished if self.finished is not None else time.monotonic()
+        wall_s = end - self._t0
+        with self._lock:
+            durations = {k: list(v) for k, v in self._durations.items()}
+            sleeps = dict(self._sleeps)
+        phases = {}
+        for phase, values in sorted(durations.items()):
+            phases[phase] = {
+                "count": len(values),
+                "total_s": round(sum(values), 3),
+                "p50_ms": round(_percentile(values, 50) * 1000.0, 1),
+                "p95_ms": round(_percentile(values, 95) * 1000.0, 1),
+                "max_ms": round(max(values) * 1000.0, 1),
+            }
+        sleep_total = sum(sleeps.values())
+        return {
+            "started_at": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+            "wall_s": round(wall_s, 3),
+            "sleep_s": round(sleep_total, 3),
+            "work_s": round(max(0.0, wall_s - sleep_total), 3),
+            "sleep": {k: round(v, 3) for k, v in sorted(sleeps.items())},
+            "phases": phases,
+        }
+
+    def write_json(self, path, extra: dict = None):
+        data = self.summary()
+        if extra:
+            data.update(extra)
+        path = Path(path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+            return path
+        except Exception as e:
+            logger.warning(f"写入运行报告失败: {e}")
+            return None
+
+    def write_prometheus(self, path, labels: dict = None, extra: dict = None):
+        """写 node_exporter textfile 格式（先写临时文件再替换，避免被读到半截）。"""
+        data = self.summary()
+        extra = extra or {}
+        base = dict(labels or {})
+
+        def _fmt(name, value, **more):
+            merged = dict(base, **more)
+            label_str = ",".join(f'{k}="{str(v).replace(chr(34), "")}"' for k, v in merged.items())
+            return f"{name}{{{label_str}}} {value}" if label_str else f"{name} {value}"
+
+        lines = [
+            "# TYPE jd_scrape_wall_seconds gauge",
+            _fmt("jd_scrape_wall_seconds", data["wall_s"]),
+            "# TYPE jd_scrape_sleep_seconds gauge",
+        ]
+        for kind, seconds in data["sleep"].items():
+            lines.append(_fmt("jd_scrape_sleep_seconds", seconds, kind=kind))
+        lines.append("# TYPE jd_scrape_phase_seconds_total gauge")
+        for phase, entry in data["phases"].items():
+            lines.append(_fmt("jd_scrape_phase_seconds_total", entry["total_s"], phase=phase))
+        lines.append("# TYPE jd_scrape_phase_count gauge")
+        for phase, entry in data["phases"].items():
+            lines.append(_fmt("jd_scrape_phase_count", entry["count"], phase=phase))
+        lines.append("# TYPE jd_scrape_phase_p95_seconds gauge")
+        for phase, entry in data["phases"].items():
+            lines.append(_fmt("jd_scrape_phase_p95_seconds", round(entry["p95_ms"] / 1000.0, 4), phase=phase))
+        lines.append("# TYPE jd_scrape_rows gauge")
+        lines.append(_fmt("jd_scrape_rows", int(extra.get("count") or 0)))
+        lines.append("# TYPE jd_scrape_success gauge")
+        lines.append(_fmt("jd_scrape_success", 1 if extra.get("status") == "success" else 0))
+        lines.append("# TYPE jd_scrape_last_run_timestamp_seconds gauge")
+        lines.append(_fmt("jd_scrape_last_run_timestamp_seconds", int(self.started)))
+
+        path = Path(path)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            tmp.replace(path)
+            return path
+        except Exception as e:
+            logger.warning(f"写入 Prometheus textfile 失败: {e}")
+            return None
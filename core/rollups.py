@@ -0,0 +1,190 @@
+"""
+消费汇总（按月 / 店铺 / 状态 / 商品），与全文索引共用 SQLite 库，由触发器随 items 的增删改增量维护：
+
+    items ──触发器──> orders（每单一行：金额合计、件数、状态） ──触发器──> rollup_month / rollup_shop / rollup_status
+          └─触发器──> rollup_sku
+
+金额口径：items.amount 已按导出规则归一（未拆单的一单多商品只有首行带整单金额，拆单各行各自金额），
+因此订单金额 = 该单各行金额之和；spend 为排除“已取消”后的有效消费。
+"""
+
+ROLLUP_VERSION = "1"
+ORDER_DIMENSIONS = {
+    "month": "substr({row}.order_time, 1, 7)",
+    "shop": "{row}.shop",
+    "status": "{row}.status",
+}
+_CANCELLED = "({row}.status LIKE '%取消%')"
+_SKU_KEY = "CASE WHEN {row}.sku != '' THEN {row}.sku ELSE {row}.name END"
+
+
+def _order_rollup_sql(dim: str, expr: str) -> str:
+    table = f"rollup_{dim}"
+    key_new = expr.format(row="new")
+    key_old = expr.format(row="old")
+    cancelled_new = _CANCELLED.format(row="new")
+    cancelled_old = _CANCELLED.format(row="old")
+    add = f"""
+    INSERT INTO {table} (key, orders, cancelled, items, quantity, amount, spend)
+    VALUES ({key_new}, 1, {cancelled_new}, new.items, new.quantity, new.amount,
+            CASE WHEN {cancelled_new} THEN 0 ELSE new.amount END)
+    ON CONFLICT (key) DO UPDATE SET
+        orders = orders + 1,
+        cancelled = cancelled + excluded.cancelled,
+        items = items + excluded.items,
+        quantity = quantity + excluded.quantity,
+        amount = amount + excluded.amount,
+        spend = spend + excluded.spend;"""
+    sub = f"""
+    UPDATE {table} SET
+        orders = orders - 1,
+        cancelled = cancelled - {cancelled_old},
+        items = items - old.items,
+        quantity = quantity - old.quantity,
+        amount = amount - old.amount,
+        spend = spend - CASE WHEN {cancelled_old} THEN 0 ELSE old.amount END
+    WHERE key = {key_old};
+    DELETE FROM {table} WHERE key = {key_old} AND orders <= 0;"""
+    return f"""
+CREATE TABLE IF NOT EXISTS {table} (
+    key TEXT PRIMARY KEY,
+    orders INTEGER NOT NULL DEFAULT 0,
+    cancelled INTEGER NOT NULL DEFAULT 0,
+    items INTEGER NOT NULL DEFAULT 0,
+    quantity INTEGER NOT NULL DEFAULT 0,
+    amount REAL NOT NULL DEFAULT 0,
+    spend REAL NOT NULL DEFAULT 0
+);
+CREATE TRIGGER IF NOT EXISTS orders_{dim}_ai AFTER INSERT ON orders BEGIN{add}
+END;
+CREATE TRIGGER IF NOT EXISTS orders_{dim}_ad AFTER DELETE ON orders BEGIN{sub}
+END;
+CREATE TRIGGER IF NOT EXISTS orders_{dim}_au AFTER UPDATE ON orders BEGIN{sub}{add}
+END;
+"""
+
+
+_ORDER_ADD = """
+    INSERT INTO orders (order_id, order_time, shop, status, items, quantity, amount)
+    VALUES (new.order_id, new.order_time, new.shop, new.status, 1, COALESCE(new.quantity, 0), COALESCE(new.amount, 0))
+    ON CONFLICT (order_id) DO UPDATE SET
+        order_time = CASE WHEN excluded.order_time != '' THEN excluded.order_time ELSE order_time END,
+        shop = excluded.shop,
+        status = excluded.status,
+        items = items + 1,
+        quantity = quantity + excluded.quantity,
+        amount = amount + excluded.amount;"""
+_ORDER_SUB = """
+    UPDATE orders SET
+        items = items - 1,
+        quantity = quantity - COALESCE(old.quantity, 0),
+        amount = amount - COALESCE(old.amount, 0)
+    WHERE order_id = old.order_id;
+    DELETE FROM orders WHERE order_id = old.order_id AND items <= 0;"""
+_SKU_ADD = f"""
+    INSERT INTO rollup_sku (key, name, lines, quantity, amount)
+    VALUES ({_SKU_KEY.format(row="new")}, new.name, 1, COALESCE(new.quantity, 0), COALESCE(new.amount, 0))
+    ON CONFLICT (key) DO UPDATE SET
+        name = excluded.name,
+        lines = lines + 1,
+        quantity = quantity + excluded.quantity,
+        amount = amount + excluded.amount;"""
+_SKU_SUB = f"""
+    UPDATE rollup_sku SET
+        lines = lines - 1,
+        quantity = quantity - COALESCE(old.quantity, 0),
+        amount = amount - COALESCE(old.amount, 0)
+    WHERE key = {_SKU_KEY.format(row="old")};
+    DELETE FROM rollup_sku WHERE key = {_SKU_KEY.format(row="old")} AND lines <= 0;"""
+
+ROLLUP_SCHEMA = (
+    """
+CREATE TABLE IF NOT EXISTS rollup_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS orders (
+    order_id TEXT PRIMARY KEY,
+    order_time TEXT NOT NULL DEFAULT '',
+    shop TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '',
+    items INTEGER NOT NULL DEFAULT 0,
+    quantity INTEGER NOT NULL DEFAULT 0,
+    amount REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS rollup_sku (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL DEFAULT '',
+    lines INTEGER NOT NULL DEFAULT 0,
+    quantity INTEGER NOT NULL DEFAULT 0,
+    amount REAL NOT NULL DEFAULT 0
+);
+"""
+    + "".join(_order_rollup_sql(dim, expr) for dim, expr in ORDER_DIMENSIONS.items())
+    + f"""
+CREATE TRIGGER IF NOT EXISTS items_rollup_ai AFTER INSERT ON items BEGIN{_ORDER_ADD}{_SKU_ADD}
+END;
+CREATE TRIGGER IF NOT EXISTS items_rollup_ad AFTER DELETE ON items BEGIN{_ORDER_SUB}{_SKU_SUB}
+END;
+CREATE TRIGGER IF NOT EXISTS items_rollup_au AFTER UPDATE OF order_id, sku, name, shop, order_time, quantity, amount, status
+ON items BEGIN{_ORDER_SUB}{_SKU_SUB}{_ORDER_ADD}{_SKU_ADD}
+END;
+"""
+)
+
+# 仅在汇总表首次创建（或口径版本变化）时从 items 全量回填一次，之后全部由触发器增量维护；
+# 写入 orders 会触发按月/店铺/状态的汇总触发器
+_BACKFILL = f"""
+DELETE FROM orders;
+DELETE FROM rollup_sku;
+{"".join(f"DELETE FROM rollup_{dim};" for dim in ORDER_DIMENSIONS)}
+INSERT INTO orders (order_id, order_time, shop, status, items, quantity, amount)
+SELECT order_id, MAX(order_time), MAX(shop), MAX(status), COUNT(*), COALESCE(SUM(quantity), 0), COALESCE(SUM(amount), 0)
+FROM items GROUP BY order_id;
+INSERT INTO rollup_sku (key, name, lines, quantity, amount)
+SELECT {_SKU_KEY.format(row="items")}, MAX(name), COUNT(*), COALESCE(SUM(quantity), 0), COALESCE(SUM(amount), 0)
+FROM items GROUP BY 1;
+"""
+
+
+def ensure_rollups(conn):
+    conn.executescript(ROLLUP_SCHEMA)
+    row = conn.execute("SELECT value FROM rollup_meta WHERE key = 'version'").fetchone()
+    if row and row[0] == ROLLUP_VERSION:
+        return
+    with conn:
+        for statement in _BACKFILL.strip().split(";"):
+            if statement.strip():
+                conn.execute(statement)
+        conn.execute("INSERT OR REPLACE INTO rollup_meta (key, value) VALUES ('version', ?)", (ROLLUP_VERSION,))
+
+
+def _rows(conn, sql, params=()):
+    cursor = conn.execute(sql, params)
+    names = [d[0] for d in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def query_rollups(conn, limit: int = 12) -> dict:
+    """汇总读取：全部为小表上的主键/排序查询，与历史订单量无关。"""
+    columns = "key, orders, cancelled, items, quantity, ROUND(amount, 2) AS amount, ROUND(spend, 2) AS spend"
+    totals = conn.execute(
+        "SELECT COALESCE(SUM(orders), 0), COALESCE(SUM(cancelled), 0), COALESCE(SUM(items), 0), "
+        "ROUND(COALESCE(SUM(amount), 0), 2), ROUND(COALESCE(SUM(spend), 0), 2) FROM rollup_status"
+    ).fetchone()
+    return {
+        "totals": {
+            "orders": totals[0],
+            "cancelled": totals[1],
+            "items": totals[2],
+            "amount": totals[3],
+            "spend": totals[4],
+            "shops": conn.execute("SELECT COUNT(*) FROM rollup_shop").fetchone()[0],
+        },
+        "month": _rows(conn, f"SELECT {columns} FROM rollup_month WHERE key != '' ORDER BY key DESC LIMIT ?", (limit,)),
+        "shop": _rows(conn, f"SELECT {columns} FROM rollup_shop ORDER BY spend DESC LIMIT ?", (limit,)),
+        "status": _rows(conn, f"SELECT {columns} FROM rollup_status ORDER BY orders DESC"),
+        "sku": _rows(
+            conn,
+            "SELECT key, name, lines, quantity, ROUND(amount, 2) AS amount FROM rollup_sku "
+            "ORDER BY amount DESC LIMIT ?",
+            (limit,),
+        ),
+    }
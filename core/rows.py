@@ -0,0 +1,142 @@
+import sys
+from array import array
+
+import numpy as np
+import pandas as pd
+
+
+# 导出列顺序（与 JDScraper._parse_row 一致）
+ORDER_FIELDS = ("日期", "订单", "商品名称", "型号", "数量", "下单金额", "姓名", "地址", "店铺", "状态", "拆单标记", "商品图片")
+_SLOTS = ("order_time", "order_id", "name", "sku", "quantity", "amount", "receiver", "address", "shop", "status",
+          "is_split", "image")
+_FIELD_SLOTS = dict(zip(ORDER_FIELDS, _SLOTS))
+# 同一订单/店铺/收货人反复出现的字符串：驻留后每个取值只保存一份
+_INTERNED = ("日期", "订单", "姓名", "地址", "店铺", "状态")
+
+
+class OrderItem:
+    """
+    单个商品行（__slots__，不为每行建 dict）。保留 item["订单"] 形式的读写，兼容原先按中文字段访问的代码。
+    """
+
+    __slots__ = _SLOTS
+
+    def __init__(self, order_time="", order_id="", name="", sku="", quantity=1, amount="", receiver="",
+                 address="", shop="", status="", is_split=False, image=""):
+        self.order_time = order_time
+        self.order_id = order_id
+        self.name = name
+        self.sku = sku
+        self.quantity = quantity
+        self.amount = amount
+        self.receiver = receiver
+        self.address = address
+        self.shop = shop
+        self.status = status
+        self.is_split = is_split
+        self.image = image
+
+    def __getitem__(self, field):
+        return getattr(self, _FIELD_SLOTS[field])
+
+    def __setitem__(self, field, value):
+        setattr(self, _FIELD_SLOTS[field], value)
+
+    def __contains__(self, field):
+        return field in _FIELD_SLOTS
+
+    def get(self, field, default=None):
+        slot = _FIELD_SLOTS.get(field)
+        return getattr(self, slot) if slot else default
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, slot) for field, slot in _FIELD_SLOTS.items()}
+
+
+class OrderRows:
+    """
+    列式累加器：每列一个数组，商品行追加时拆成列值后即可丢弃行对象。
+    - 重复字符串（日期/订单/收货人/地址/店铺/状态）驻留，100k 行只保存各自的不同取值；
+    - 数量、拆单标记用 array 紧凑存储（每行 8 + 1 字节），to_frame 时复制成 numpy 数组，之后仍可继续追加；
+    - 下单金额保持原始取值（浮点或价格原文），口径与之前的 list[dict] 完全一致。
+    """
+
+    def __init__(self):
+        self._columns = {field: [] for field in ORDER_FIELDS}
+        self._columns["数量"] = array("q")
+        self._columns["拆单标记"] = array("b")
+        self._order_ids = set()
+
+    @classmethod
+    def from_records(cls, records):
+        rows = cls()
+        rows.extend(records)
+        return rows
+
+    def __len__(self):
+        return len(self._columns["订单"])
+
+    @property
+    def order_count(self) -> int:
+        return len(self._order_ids)
+
+    def append(self, item):
+        """追加一个 OrderItem（或同字段的 dict）。"""
+        cols = self._columns
+        for field in ORDER_FIELDS:
+            value = item.get(field)
+            if field == "数量":
+                try:
+                    value = int(value)
+                except (TypeError, ValueError):
+                    value = 1
+            elif field == "拆单标记":
+                value = bool(value)
+            elif field in _INTERNED:
+                value = sys.intern(str(value)) if value is not None else ""
+            cols[field].append(value)
+        self._order_ids.add(cols["订单"][-1])
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def column(self, field: str):
+        return self._columns[field]
+
+    def fill_by_order(self, field: str, mapping: dict, default=""):
+        """按订单号整列回填（如异步引擎在详情页全部完成后补地址）。"""
+        values = [mapping.get(oid) or default for oid in self._columns["订单"]]
+        if field in _INTERNED:
+            values = [sys.intern(str(v)) for v in values]
+        self._columns[field] = values
+
+    def __iter__(self):
+        # 按需生成行对象（兼容逐行遍历的旧代码；热路径应直接用列）
+        cols = [self._columns[field] for field in ORDER_FIELDS]
+        for values in zip(*cols):
+            yield OrderItem(*values)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        由各列直接构造 DataFrame：数值列复制为 numpy 数组（不用 np.frombuffer 包装，
+        否则 array 缓冲区被导出后无法再扩容，之后的 append 会抛 BufferError），字符串列只复制对象指针。
+        """
+        data = {}
+        for field in ORDER_FIELDS:
+            values = self._columns[field]
+            if field == "数量":
+                values = np.array(values, dtype=np.int64)
+            elif field == "拆单标记":
+                values = np.array(values, dtype=np.bool_)
+            data[field] = values
+        return pd.DataFrame(data, copy=False)
+
+
+def rows_to_frame(orders) -> pd.DataFrame:
+    """OrderRows / list[dict] / DataFrame 统一转成 DataFrame。"""
+    if isinstance(orders, pd.DataFrame):
+        return orders
+    if isinstance(orders, OrderRows):
+        return orders.to_frame()
+    return pd.DataFrame(orders)
@@ -0,0 +1,96 @@
+"""
+导出数据的统一列类型。采集结果（以及读回的历史导出）先经 apply_schema 定型，
+排序、金额合并、各导出格式、列式副本与全文索引都基于同一份定型后的 DataFrame：
+
+- 日期：datetime64（无法解析为 NaT）
+- 下单金额：以“分”为单位的可空整数 Int64；合并后不显示金额的行为 <NA>，不再混入 ""
+- 数量：Int32；拆单标记：bool
+- 姓名 / 地址 / 店铺 / 状态：category（字典编码，重复取值只存一份，分组聚合按整数编码进行）
+- 其余文本列：string
+
+写文件时由 for_export 把金额换算回“元”（Float64），文件内容与之前一致。
+非空但不是数值的金额（如“暂无”）不会丢：原文保存在「下单金额原文」列（仅在出现时才有该列），
+xlsx/csv 导出时写回金额单元格；parquet 等需要单一列类型的格式保留金额（<NA>）与原文两列。
+"""
+import pandas as pd
+from loguru import logger
+
+
+AMOUNT_COLUMN = "下单金额"
+AMOUNT_TEXT_COLUMN = "下单金额原文"
+CATEGORY_COLUMNS = ("姓名", "地址", "店铺", "状态")
+TEXT_COLUMNS = ("订单", "商品名称", "型号", "商品图片")
+
+
+def amount_to_cents(values: pd.Series) -> pd.Series:
+    """金额（元）原值：浮点、"12.30"、"¥1,299.00"、"" 等统一转为分（Int64），无法解析为 <NA>。"""
+    numeric = pd.to_numeric(values, errors="coerce")
+    if numeric.isna().any() and not pd.api.types.is_numeric_dtype(values):
+        text = values.astype("string").str.replace(r"[¥￥,\s]", "", regex=True)
+        numeric = numeric.fillna(pd.to_numeric(text, errors="coerce"))
+    return (numeric.astype("float64") * 100).round().astype("Int64")
+
+
+def unparsed_amounts(values: pd.Series, cents: pd.Series) -> pd.Series:
+    """金额原值中非空、却没能转成分的原文（如“暂无”），其余为 <NA>。"""
+    text = values.astype("string").str.strip()
+    return text.where(cents.isna() & text.fillna("").ne(""))
+
+
+def cents_to_yuan(cents: pd.Series) -> pd.Series:
+    return cents.astype("Float64") / 100
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """把原始商品行（金额单位为元）转成定型的 DataFrame；未知列原样保留。"""
+    out = {}
+    for col in df.columns:
+        series = df[col]
+        if col == "日期":
+            series = pd.to_datetime(series, errors="coerce")
+        elif col == AMOUNT_COLUMN:
+            series = amount_to_cents(df[col])
+            raw = unparsed_amounts(df[col], series)
+            if AMOUNT_TEXT_COLUMN in df.columns:
+                raw = df[AMOUNT_TEXT_COLUMN].astype("string").where(lambda t: t.fillna("").ne("")).fillna(raw)
+            if raw.notna().any():
+                out[AMOUNT_TEXT_COLUMN] = raw
+                logger.info(
+                    "{count} 行下单金额不是数值（如“{sample}”），原文保留在「{column}」",
+                    count=int(raw.notna().sum()), sample=raw.dropna().iloc[0], column=AMOUNT_TEXT_COLUMN,
+                )
+        elif col == AMOUNT_TEXT_COLUMN:
+            continue
+        elif col == "数量":
+            series = pd.to_numeric(series, errors="coerce").round().astype("Int32")
+        elif col == "拆单标记":
+            series = series.fillna(False).astype(bool)
+        elif col in CATEGORY_COLUMNS:
+            series = series.astype("string").fillna("").astype("category")
+        elif col in TEXT_COLUMNS:
+            series = series.astype("string").fillna("")
+        out[col] = series
+    if AMOUNT_TEXT_COLUMN in out:
+        # 原文列放在最后，不打乱原有列序
+        out[AMOUNT_TEXT_COLUMN] = out.pop(AMOUNT_TEXT_COLUMN)
+    return pd.DataFrame(out, index=df.index)
+
+
+def for_export(df: pd.DataFrame, keep_text_column: bool = False) -> pd.DataFrame:
+    """
+    写文件用的视图：金额换回元（Float64，<NA> 写为空），其余列共用定型后的数据。
+    有「下单金额原文」时默认把原文写回金额列（该列变为 object）并去掉原文列，与之前的 xlsx/csv 内容一致；
+    keep_text_column=True 时金额保持数值、原文单独成列（parquet、全文索引用）。
+    """
+    if AMOUNT_COLUMN not in df.columns:
+        return df
+    out = df.copy(deep=False)
+    out[AMOUNT_COLUMN] = cents_to_yuan(df[AMOUNT_COLUMN])
+    if AMOUNT_TEXT_COLUMN in df.columns and not keep_text_column:
+        text = df[AMOUNT_TEXT_COLUMN]
+        amount = out[AMOUNT_COLUMN].astype(object).where(out[AMOUNT_COLUMN].notna(), None)
+        restore = text.notna() & out[AMOUNT_COLUMN].isna()
+        amount[restore] = text[restore].astype(object)
+        out[AMOUNT_COLUMN] = amount
+        out = out.drop(columns=[AMOUNT_TEXT_COLUMN])
+    return out
@@ -6,9 +6,11 @@ import random
 import re
 from datetime import datetime
 import threading
+import uuid
 from pathlib import Path
 from urllib.parse import urljoin
 import io
+from contextlib import contextmanager
 import requests
 from playwright.sync_api import sync_playwright, TimeoutError
 from playwright_stealth import Stealth
@@ -17,6 +19,39 @@ import pandas as pd
 from openpyxl import load_workbook
 from openpyxl.drawing.image import Image as XLImage
 from openpyxl.utils import get_column_letter
+from core.cancel import CancelToken, ScrapeCancelled
+from core.columnar import write_cache as write_columnar_cache
+from core.images import SingleFlight, image_key
+from core.latency import LatencyTracker
+from core.logs import reset_log_context, set_log_context
+from core.profiles import maintain_profiles
+from core.profiling import RunProfiler
+from core.progress import ScrapeProgress
+from core.ratelimit import RateLimiterGroup, parse_retry_after
+from core.report import RunReport
+from core.rows import OrderItem, OrderRows, rows_to_frame
+from core.schema import AMOUNT_TEXT_COLUMN, apply_schema, for_export
+from core.search_index import OrderIndex
+from core.xlsx_images import StreamingImageEmbedder
+
+
+STEALTH_INIT_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => [1, 2, 3, 4, 5]
+    });
+    Object.defineProperty(navigator, 'languages', {
+        get: () => ['zh-CN', 'zh', 'en']
+    });
+    const originalQuery = window.navigator.permissions.query;
+    window.navigator.permissions.query = (parameters) => (
+        parameters.name === 'notifications' ?
+        Promise.resolve({ state: Notification.permission }) :
+        originalQuery(parameters)
+    );
+"""
 
 
 def _data_base_dir():
@@ -25,6 +60,9 @@ def _data_base_dir():
     return Path(__file__).resolve().parent.parent
 
 class JDScraper:
+    # 进程内共享：多个实例（如 Web 后端并发任务）同时请求同一张图时只发一次请求
+    _image_flight = SingleFlight()
+
     def __init__(self, headless=False):
         self.headless = headless
         self.browser = None
@@ -43,13 +81,40 @@ class JDScraper:
         self.use_persistent_context = os.getenv("JD_PERSISTENT_PROFILE", "1") != "0"
         self.skip_home_warmup = os.getenv("JD_SKIP_HOME_WARMUP", "1") != "0"
         self.browser_channel = (os.getenv("JD_BROWSER_CHANNEL", "chrome") or "chrome").strip()
+        # 显式配置了通道时优先按配置尝试；否则优先使用本 profile 上次启动成功的通道（launch.json）
+        self.browser_channel_explicit = bool(os.getenv("JD_BROWSER_CHANNEL"))
+        # GUI 登录窗口显示期间预启动：driver（默认，仅 Playwright 驱动）/ context（连同浏览器）/ 0（关闭）
+        self.prelaunch_mode = (os.getenv("JD_PRELAUNCH", "driver") or "0").strip().lower()
+        # profile 目录维护（见 core.profiles）：启动时清理超出预算的浏览器缓存、回收过期的轮换 profile；0 表示关闭对应项
+        self.profile_maintenance = os.getenv("JD_PROFILE_MAINTENANCE", "1") != "0"
+        self.profile_cache_mb = self._safe_int(os.getenv("JD_PROFILE_CACHE_MB", "256"), default=256)
+        self.profile_gc_days = self._safe_int(os.getenv("JD_PROFILE_GC_DAYS", "30"), default=30)
+        self.profile_keep = self._safe_int(os.getenv("JD_PROFILE_KEEP", "1"), default=1)
         # 可配置下载目录与嵌入图片开关
         self.download_dir = Path(os.getenv("JD_DOWNLOAD_DIR", self.base_dir / "downloads")).expanduser().resolve()
-        self.base_url = "https://order.jd.com/center/list.action"
+        # 站点地址可覆盖，便于指向本地 fixture 服务做离线基准（见 core/fixture_server.py）
+        self.base_url = (os.getenv("JD_BASE_URL", "") or "https://order.jd.com/center/list.action").strip()
+        self.detail_url_template = (
+            os.getenv("JD_DETAIL_URL", "") or "https://details.jd.com/normal/item.action?orderid={order_id}"
+        ).strip()
+        self.home_url = (os.getenv("JD_HOME_URL", "") or "https://www.jd.com/").strip()
         self.stealth = Stealth()
         self._lock = threading.RLock()
         self.address_cache = {}
         self.embed_images = os.getenv("JD_EMBED_IMAGES", "1") != "0"
+        # 图片嵌入方式：stream（默认，图片逐个写入 xlsx 且相同图片只存一份，内存与行数无关）/ openpyxl（旧实现）
+        self.image_embed_mode = (os.getenv("JD_IMAGE_EMBED_MODE", "stream") or "stream").strip().lower()
+        # 感知哈希去重：不同 URL 但画面相同（重编码/缩放）的图片只存一份；JD_IMAGE_PHASH_DIST 为允许的汉明距离
+        self.image_phash = os.getenv("JD_IMAGE_PHASH", "0") != "0"
+        self.image_phash_distance = self._safe_int(os.getenv("JD_IMAGE_PHASH_DIST", "3"), default=3)
+        # 长驻进程（如 Web 后端）可保留浏览器会话，在多个采集任务间复用
+        self.keep_browser = os.getenv("JD_KEEP_BROWSER", "0") != "0"
+        # 导出格式：xlsx（默认，含金额合并与图片）/ parquet / csv
+        self.export_format = (os.getenv("JD_EXPORT_FORMAT", "xlsx") or "xlsx").strip().lower()
+        # 同时写一份 Arrow 列式副本（下载目录 .cache/），供 GUI 表格预览内存映射读取
+        self.columnar_cache = os.getenv("JD_COLUMNAR_CACHE", "1") != "0"
+        # 导出后增量写入全文索引（JD_SEARCH_DB，默认 data/orders_index.sqlite3）
+        self.search_index = os.getenv("JD_SEARCH_INDEX", "1") != "0"
         self.fetch_address = os.getenv("JD_FETCH_ADDRESS", "1") != "0"
         self.address_blocked = False
         self.address_blocked_reason = ""
@@ -57,14 +122,19 @@ class JDScraper:
         self.address_pause_max = self._safe_float(os.getenv("JD_ADDR_PAUSE_MAX", "3.6"), default=3.6)
         self.detail_safe_min = self._safe_float(os.getenv("JD_DETAIL_SAFE_MIN", "5.5"), default=5.5)
         self.goto_retries = self._safe_int(os.getenv("JD_GOTO_RETRIES", "3"), default=3)
+        self.action_timeout_ms = self._safe_int(os.getenv("JD_ACTION_TIMEOUT_MS", "15000"), default=15000)
         self.risk_wait_s = self._safe_int(os.getenv("JD_RISK_WAIT", "120"), default=120)
         self.rate_limits = {
             "page": self._safe_float(os.getenv("JD_RATE_PAGE_MIN", "2.5"), default=2.5),
             "detail": self._safe_float(os.getenv("JD_RATE_DETAIL_MIN", "4.0"), default=4.0),
             "image": self._safe_float(os.getenv("JD_RATE_IMAGE_MIN", "0.6"), default=0.6),
         }
-        self.rate_last = {"page": 0.0, "detail": 0.0, "image": 0.0}
-        self.rate_multipliers = {"page": 1.0, "detail": 1.0, "image": 1.0}
+        self.rate_bursts = {
+            "page": self._safe_int(os.getenv("JD_RATE_PAGE_BURST", "1"), default=1),
+            "detail": self._safe_int(os.getenv("JD_RATE_DETAIL_BURST", "1"), default=1),
+            "image": self._safe_int(os.getenv("JD_RATE_IMAGE_BURST", "1"), default=1),
+        }
+        self.rate_recovery_step = self._safe_float(os.getenv("JD_RATE_RECOVERY_STEP", "0.1"), default=0.1)
         self.rate_backoff_max = self._safe_float(os.getenv("JD_RATE_BACKOFF_MAX", "6"), default=6.0)
         self.image_retries = self._safe_int(os.getenv("JD_IMAGE_RETRIES", "2"), default=2)
         self.browse_prob = self._safe_float(os.getenv("JD_BROWSE_PROB", "0"), default=0.0)
@@ -110,34 +180,75 @@ class JDScraper:
         self.window_maximized = os.getenv("JD_WINDOW_MAXIMIZED", "1") != "0"
         self.window_width = self._safe_int(os.getenv("JD_WINDOW_W", self.viewport["width"]), default=self.viewport["width"])
         self.window_height = self._safe_int(os.getenv("JD_WINDOW_H", self.viewport["height"]), default=self.viewport["height"])
+        # 各步骤耗时样本（按 profile 持久化），用于推导超时与 networkidle 策略
+        self.latency = LatencyTracker(self.profile_dir / "latency.json")
+        # 按类型的令牌桶限速器（线程安全），退避倍率跨次运行保留
+        self.limiters = RateLimiterGroup(
+            self.rate_limits,
+            self.profile_dir / "rate_state.json",
+            bursts=self.rate_bursts,
+            backoff_max=self.rate_backoff_max,
+            recovery_step=self.rate_recovery_step,
+        )
+        self.limiters.load()
+        self.launch_state = self._load_launch_state()
+        # launch.json 由浏览器任务线程（记录通道）与 profile 维护线程共同更新
+        self._launch_state_lock = threading.Lock()
+        self.progress = ScrapeProgress(None, self.limiters)
+        self.cancel_token = CancelToken()
+        self.report = RunReport()
+        self.write_run_report = os.getenv("JD_RUN_REPORT", "1") != "0"
+        self.prom_textfile = (os.getenv("JD_PROM_TEXTFILE", "") or "").strip()
+        # JD_PROFILER=cprofile,sample,tracemalloc 时剖析整次采集或仅导出阶段
+        self.profiler = RunProfiler.from_env()
+        self.run_id = ""
+
+    def _timeout(self, kind: str, default_ms: int) -> int:
+        return self.latency.timeout_ms(kind, default_ms)
+
+    @contextmanager
+    def _track_latency(self, kind: str):
+        start = time.monotonic()
+        try:
+            yield
+        except TimeoutError:
+            self.latency.record(kind, time.monotonic() - start, timed_out=True)
+            raise
+        finally:
+            self.report.record(kind, time.monotonic() - start)
+        self.latency.record(kind, time.monotonic() - start)
+
+    def _wait_networkidle(self, page, default_ms: int = 12000):
+        """按历史耗时等待 networkidle；持续超时的环境下直接跳过，改由选择器等待兜底。"""
+        timeout = self.latency.networkidle_timeout_ms("networkidle", default_ms)
+        if timeout is None:
+            return False
+        try:
+            with self._track_latency("networkidle"):
+                page.wait_for_load_state("networkidle", timeout=timeout)
+            return True
+        except TimeoutError:
+            return False
 
     def _random_sleep(self, min_s=1.5, max_s=4.0):
-        """Random delay to mimic human behavior"""
+        """Random delay to mimic human behavior (returns early on cancel)"""
         delay = random.uniform(min_s, max_s)
-        time.sleep(delay)
+        start = time.monotonic()
+        self.cancel_token.wait(delay)
+        self.report.add_sleep("random", time.monotonic() - start)
 
     def _rate_limit(self, kind: str):
-        min_interval = self.rate_limits.get(kind, 0)
-        if min_interval <= 0:
-            return
-        multiplier = self.rate_multipliers.get(kind, 1.0)
-        min_interval = min_interval * multiplier
-        now = time.monotonic()
-        last = self.rate_last.get(kind, 0.0)
-        sleep_s = min_interval - (now - last)
-        if sleep_s > 0:
-            time.sleep(sleep_s + random.uniform(0.05, 0.25))
-        self.rate_last[kind] = time.monotonic()
+        wait_s = self.limiters[kind].reserve()
+        if wait_s > 0:
+            start = time.monotonic()
+            self.cancel_token.wait(wait_s)
+            self.report.add_sleep(f"rate_{kind}", time.monotonic() - start)
 
     def _bump_backoff(self, kind: str, factor: float = 1.6):
-        current = self.rate_multipliers.get(kind, 1.0)
-        next_val = min(current * factor, self.rate_backoff_max)
-        self.rate_multipliers[kind] = next_val
+        self.limiters[kind].backoff(factor)
 
-    def _decay_backoff(self, kind: str, decay: float = 0.92):
-        current = self.rate_multipliers.get(kind, 1.0)
-        if current > 1.0:
-            self.rate_multipliers[kind] = max(1.0, current * decay)
+    def _decay_backoff(self, kind: str):
+        self.limiters[kind].recover()
 
     def _humanize_page(self):
         """轻量行为模拟：使用脚本滚动，避免占用真实鼠标。"""
@@ -176,14 +287,15 @@ class JDScraper:
 
         browse_page = self.context.new_page()
         try:
-            logger.info(f"Simulating browse path ({stage})...")
+            logger.info("Simulating browse path ({stage})...", stage=stage)
             self._apply_window_state(browse_page)
             for url in self.browse_urls:
                 try:
                     self._rate_limit("page")
-                    browse_page.goto(url, wait_until="domcontentloaded", timeout=20000)
+                    with self._track_latency("goto"):
+                        browse_page.goto(url, wait_until="domcontentloaded", timeout=self._timeout("goto", 20000))
                     try:
-                        browse_page.wait_for_load_state("networkidle", timeout=8000)
+                        self._wait_networkidle(browse_page, 8000)
                     except Exception:
                         pass
                     reason = self._detect_risk_page(browse_page)
@@ -192,7 +304,7 @@ class JDScraper:
                     self._dwell_and_scroll(browse_page, min_s=1.0, max_s=2.6)
                     self._decay_backoff("page")
                 except Exception as e:
-                    logger.warning(f"Browse path step failed: {url} -> {e}")
+                    logger.warning("Browse path step failed: {url} -> {err}", url=url, err=e)
                     self._bump_backoff("page")
         finally:
             try:
@@ -216,7 +328,7 @@ class JDScraper:
                 return True
             except Exception as e:
                 last_err = e
-                logger.warning(f"Login page goto failed ({attempt}/{retries}): {e}")
+                logger.warning("Login page goto failed ({attempt}/{retries}): {err}", attempt=attempt, retries=retries, err=e)
                 self._bump_backoff("page")
                 try:
                     if self.page and not self.page.is_closed():
@@ -286,7 +398,7 @@ class JDScraper:
     def _handle_risk_page(self, page, reason: str, fatal: bool = True, wait_s: int = None):
         if not reason:
             return False
-        logger.warning(f"Detected risk page ({reason}).")
+        logger.warning("Detected risk page ({reason}).", reason=reason)
         self._bump_backoff("page", factor=2.0)
         self._bump_backoff("detail", factor=2.0)
         if wait_s is None:
@@ -299,7 +411,8 @@ class JDScraper:
 
         start = time.time()
         while time.time() - start < wait_s:
-            time.sleep(2)
+            if self.cancel_token.wait(2):
+                raise ScrapeCancelled("风控等待期间取消")
             if not self._detect_risk_page(page):
                 logger.success("Risk page cleared manually.")
                 return False
@@ -328,14 +441,14 @@ class JDScraper:
         for attempt in range(retries):
             try:
                 self._rate_limit("page")
-                url = f"https://www.jd.com/?r={int(time.time()*1000)}"
-                logger.info(f"Opening JD homepage (attempt {attempt+1})...")
+                url = f"{self.home_url}?r={int(time.time()*1000)}"
+                logger.info("Opening JD homepage (attempt {attempt})...", attempt=attempt + 1)
                 # Use domcontentloaded which is faster and sufficient for warm-up
                 self.page.goto(url, wait_until="domcontentloaded", timeout=45000)
                 
                 # Try waiting for network idle but ignore timeout if page is usable
                 try:
-                    self.page.wait_for_load_state("networkidle", timeout=15000)
+                    self._wait_networkidle(self.page, 15000)
                 except Exception:
                     pass
 
@@ -348,7 +461,7 @@ class JDScraper:
                 if "jd.com" in self.page.url:
                     return True
             except Exception as e:
-                logger.warning(f"JD homepage open failed (attempt {attempt+1}): {e}")
+                logger.warning("JD homepage open failed (attempt {attempt}): {err}", attempt=attempt + 1, err=e)
         return False
 
     def _ensure_auth_state(self):
@@ -380,6 +493,14 @@ class JDScraper:
         return _valid("pt_key") and _valid("pt_pin")
 
     def _log_auth_diagnostic(self, reason: str, page=None):
+        """登录态诊断：referrer/cookies 需要与浏览器往返，仅在 WARNING 被某个 sink 接收时才计算。"""
+        logger.bind(event="auth_diagnostic", reason=reason).opt(lazy=True).warning(
+            "Auth diagnostic ({}): {}",
+            lambda: reason,
+            lambda: self._auth_diagnostic_details(page),
+        )
+
+    def _auth_diagnostic_details(self, page=None) -> str:
         try:
             url = page.url if page else ""
         except Exception:
@@ -416,18 +537,10 @@ class JDScraper:
             return f"{name}=missing"
 
         auth_ok = self._has_auth_cookies()
-        logger.warning(
-            "Auth diagnostic (%s): url=%s ref=%s auth_ok=%s %s %s persistent=%s profile=%s auth_file=%s auth_file_exists=%s",
-            reason,
-            url,
-            referrer,
-            auth_ok,
-            _cookie_status("pt_key"),
-            _cookie_status("pt_pin"),
-            self.use_persistent_context,
-            str(self.profile_dir),
-            self.auth_file,
-            os.path.exists(self.auth_file),
+        return (
+            f"url={url} ref={referrer} auth_ok={auth_ok} {_cookie_status('pt_key')} {_cookie_status('pt_pin')} "
+            f"persistent={self.use_persistent_context} profile={self.profile_dir} "
+            f"auth_file={self.auth_file} auth_file_exists={os.path.exists(self.auth_file)}"
         )
 
     def _trim_url(self, url: str, max_len: int = 160):
@@ -503,7 +616,7 @@ class JDScraper:
             try:
                 self._goto_with_retry(f"{self.base_url}?s=4096", wait_until="domcontentloaded", retries=2)
             except Exception as nav_err:
-                logger.warning(f"订单页跳转失败重试: {nav_err}")
+                logger.warning("订单页跳转失败重试: {err}", err=nav_err)
             if "passport.jd.com" not in self.page.url:
                 return True
             self._log_auth_diagnostic("login-redirect-to-passport", self.page)
@@ -511,16 +624,7 @@ class JDScraper:
             time.sleep(2)
         return False
 
-    def start_browser(self, use_storage: bool = True):
-        logger.info(f"Launching Browser (Headless={self.headless})...")
-        self.playwright = sync_playwright().start()
-        # Removed global hook to prevent potential startup hangs
-        if not self.http:
-            self.http = requests.Session()
-
-        ua = self.user_agents[0]
-        # Try launch options: Bundled -> Edge -> Chrome
-        # Try launch options: Bundled -> Edge -> Chrome
+    def _launch_args(self):
         launch_args = [
             "--disable-blink-features=AutomationControlled",
             "--no-first-run",
@@ -533,15 +637,14 @@ class JDScraper:
             launch_args.append("--window-position=0,0")
         if self.window_maximized:
             launch_args.append("--start-maximized")
+        return launch_args
 
-        # Load state if exists
-        load_options = {"storage_state": self.auth_file} if (use_storage and os.path.exists(self.auth_file)) else {}
+    def _context_options(self):
         viewport_options = {"width": self.viewport["width"], "height": self.viewport["height"]}
         if self.window_maximized:
             viewport_options = None
-
-        context_options = {
-            "user_agent": ua,
+        return {
+            "user_agent": self.user_agents[0],
             "viewport": viewport_options,
             "locale": self.locale,
             "timezone_id": self.timezone_id,
@@ -552,21 +655,148 @@ class JDScraper:
             },
         }
 
+    @property
+    def launch_state_file(self) -> Path:
+        return self.profile_dir / "launch.json"
+
+    def _load_launch_state(self) -> dict:
+        try:
+            with open(self.launch_state_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_launch_state(self):
+        try:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.launch_state_file, "w", encoding="utf-8") as f:
+                json.dump(self.launch_state, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            logger.debug("写入 launch.json 失败: {err}", err=e)
+
+    def _remember_channel(self, channel, launch_s: float):
+        with self._launch_state_lock:
+            before = self.launch_state.pop("launch_s_before_trim", None)
+            if before is not None:
+                logger.info("清理缓存后首次启动耗时 {after:.2f}s（清理前 {before:.2f}s）", after=launch_s, before=before)
+            # None 表示 Playwright 自带的 Chromium
+            self.launch_state.update({
+                "channel": channel or "bundled",
+                "launch_s": round(launch_s, 3),
+                "launched_at": datetime.now().isoformat(timespec="seconds"),
+            })
+            self._save_launch_state()
+
+    def _launch_channels(self):
+        channels = []
+        cached = self.launch_state.get("channel")
+        if cached and not self.browser_channel_explicit:
+            # 上次成功的通道排在最前，省去每次先试不存在的 chrome/msedge 的几秒
+            channels.append(None if cached == "bundled" else cached)
+        if self.browser_channel:
+            channels.append(self.browser_channel)
+        channels.extend(["chrome", "msedge", None])
+        seen = set()
+        return [c for c in channels if not (c in seen or (seen.add(c) or False))]
+
+    def _ensure_driver(self):
+        if not self.playwright:
+            self.playwright = sync_playwright().start()
+        return self.playwright
+
+    def prelaunch(self, mode: str = None):
+        """
+        提前启动 Playwright 驱动（mode=context 时连同浏览器一起），之后的登录/采集直接复用。
+        Playwright 同步对象绑定创建它的线程：必须在之后运行任务的同一线程里调用（GUI 见 gui.task_runner）。
+        """
+        mode = (mode or self.prelaunch_mode or "0").lower()
+        if mode in ("0", "off", "false", ""):
+            return False
+        with self._lock:
+            started = time.monotonic()
+            if mode == "context":
+                if not self.context:
+                    self.start_browser()
+            else:
+                self._ensure_driver()
+            logger.info("预启动完成（{mode}），耗时 {elapsed:.2f}s", mode=mode, elapsed=time.monotonic() - started)
+            return True
+
+    def maintain_profiles(self, prune: bool = True, dry_run: bool = False, measure: bool = False,
+                          report: bool = True) -> dict:
+        """
+        报告 profile 大小，并按 JD_PROFILE_CACHE_MB / JD_PROFILE_GC_DAYS 清理缓存、回收旧的轮换 profile。
+        不持有 self._lock，可与登录/采集并行；浏览器正在使用的 profile（SingletonLock）不会被清理。
+        measure 时用 headless 启动测量清理前后的耗时（浏览器已打开时跳过）。
+        """
+        profile_dir = self.profile_dir
+        if measure and self.context:
+            measure = False
+        channel = self.launch_state.get("channel")
+        if channel is None and self.browser_channel_explicit:
+            channel = self.browser_channel
+        summary = maintain_profiles(
+            self.base_dir / "profiles",
+            profile_dir,
+            cache_budget_mb=self.profile_cache_mb if prune else 0,
+            gc_days=self.profile_gc_days if prune else 0,
+            keep_latest=self.profile_keep,
+            prune=prune,
+            dry_run=dry_run,
+            measure=measure,
+            channel=channel,
+            report=report,
+        )
+        # 当前 profile 的缓存被清理时记下上次启动耗时，下次真实启动时在日志里对比
+        trimmed_active = any(
+            t["removed"] and Path(t["profile"]).resolve() == profile_dir for t in summary.get("trimmed", [])
+        )
+        with self._launch_state_lock:
+            if trimmed_active and not dry_run and self.launch_state.get("launch_s") is not None:
+                self.launch_state["launch_s_before_trim"] = self.launch_state["launch_s"]
+                self._save_launch_state()
+            summary["last_launch_s"] = self.launch_state.get("launch_s")
+        return summary
+
+    def startup_maintenance(self):
+        """
+        启动时的 profile 维护（JD_PROFILE_MAINTENANCE=0 关闭）：只统计缓存子目录，不做整目录报告，
+        在独立线程里运行（见 main.py），不阻塞预启动与首次登录/采集；失败不影响启动。
+        """
+        if not self.profile_maintenance:
+            return None
+        try:
+            return self.maintain_profiles(report=False)
+        except Exception as e:
+            logger.warning("Profile 维护失败: {err}", err=e)
+            return None
+
+    def start_browser(self, use_storage: bool = True):
+        logger.info("Launching Browser (Headless={headless})...", headless=self.headless)
+        self._ensure_driver()
+        # Removed global hook to prevent potential startup hangs
+        if not self.http:
+            self.http = requests.Session()
+
+        # Try launch options: Bundled -> Edge -> Chrome
+        launch_args = self._launch_args()
+
+        # Load state if exists
+        load_options = {"storage_state": self.auth_file} if (use_storage and os.path.exists(self.auth_file)) else {}
+        context_options = self._context_options()
+
         if self.use_persistent_context:
             try:
                 self.profile_dir.mkdir(parents=True, exist_ok=True)
-                logger.info(f"Launching persistent context: {self.profile_dir}")
-                channels = []
-                if self.browser_channel:
-                    channels.append(self.browser_channel)
-                channels.extend(["chrome", "msedge", None])
-                seen = set()
-                channels = [c for c in channels if not (c in seen or (seen.add(c) or False))]
+                logger.info("Launching persistent context: {profile_dir}", profile_dir=self.profile_dir)
+                channels = self._launch_channels()
 
                 last_err = None
                 for channel in channels:
                     try:
-                        logger.info(f"Persistent context channel: {channel or 'bundled'}")
+                        logger.info("Persistent context channel: {channel}", channel=channel or "bundled")
+                        launch_started = time.monotonic()
                         common_kwargs = dict(
                             user_data_dir=str(self.profile_dir),
                             headless=self.headless,
@@ -587,6 +817,9 @@ class JDScraper:
                                 **common_kwargs,
                             )
                         last_err = None
+                        if self.launch_state.get("channel") != (channel or "bundled"):
+                            logger.info("记住可用浏览器通道: {channel}", channel=channel or "bundled")
+                        self._remember_channel(channel, time.monotonic() - launch_started)
                         break
                     except Exception as e:
                         last_err = e
@@ -596,7 +829,7 @@ class JDScraper:
                     raise last_err
                 self.browser = self.context.browser
             except Exception as e:
-                logger.warning(f"Persistent context launch failed, fallback to normal context: {e}")
+                logger.warning("Persistent context launch failed, fallback to normal context: {err}", err=e)
                 self.use_persistent_context = False
 
         if not self.use_persistent_context:
@@ -632,23 +865,7 @@ class JDScraper:
         
         self._register_response_logger()
         # Inject stealth scripts to hide webdriver property
-        self.context.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-            });
-            Object.defineProperty(navigator, 'plugins', {
-                get: () => [1, 2, 3, 4, 5]
-            });
-            Object.defineProperty(navigator, 'languages', {
-                get: () => ['zh-CN', 'zh', 'en']
-            });
-            const originalQuery = window.navigator.permissions.query;
-            window.navigator.permissions.query = (parameters) => (
-                parameters.name === 'notifications' ?
-                Promise.resolve({ state: Notification.permission }) :
-                originalQuery(parameters)
-            );
-        """)
+        self.context.add_init_script(STEALTH_INIT_SCRIPT)
 
         pages = []
         try:
@@ -673,12 +890,14 @@ class JDScraper:
         try:
             self.stealth.apply_stealth_sync(self.context)
         except Exception as e:
-            logger.warning(f"Stealth apply failed: {e}")
+            logger.warning("Stealth apply failed: {err}", err=e)
         # Tighter but consistent timeouts avoid long hangs while staying human-like
-        self.context.set_default_timeout(15000)
-        self.context.set_default_navigation_timeout(20000)
+        # 页面动作的默认超时固定，不随选择器等待的统计变化
+        self.context.set_default_timeout(self.action_timeout_ms)
+        self.context.set_default_navigation_timeout(self._timeout("goto", 20000))
 
-    def close_browser(self):
+    def close_browser(self, keep_driver: bool = False):
+        """关闭浏览器；keep_driver 时保留 Playwright 驱动，紧接着重新启动浏览器时省去驱动冷启动。"""
         if self.detail_page:
             try:
                 self.detail_page.close()
@@ -694,10 +913,12 @@ class JDScraper:
             except Exception:
                 pass
             self.browser = None
-        if self.playwright:
+        if self.playwright and not keep_driver:
             self.playwright.stop()
             self.playwright = None
         self.page = None
+        self.latency.save()
+        self.limiters.save()
         if self.http:
             try:
                 self.http.close()
@@ -708,13 +929,20 @@ class JDScraper:
     def login(self, force_fresh: bool = False, relogin: bool = False):
         """Manually login and save state."""
         with self._lock:
-            return self._login_locked(force_fresh=force_fresh, relogin=relogin)
+            log_token = set_log_context(profile=self.profile_name, phase="login")
+            try:
+                return self._login_locked(force_fresh=force_fresh, relogin=relogin)
+            finally:
+                reset_log_context(log_token)
 
     def _login_locked(self, force_fresh: bool = False, relogin: bool = False):
         logger.info("Starting login process (Stealth Mode)...")
         if force_fresh:
+            # 复用中（或预启动）的浏览器属于旧 profile/会话，重新登录前关闭，驱动保留
+            if self.context:
+                self.close_browser(keep_driver=True)
             self._rotate_profile("login", relogin=relogin)
-        if not self.browser:
+        if not self.context:
             self.headless = False
             self.start_browser(use_storage=not force_fresh)
         if force_fresh:
@@ -724,15 +952,16 @@ class JDScraper:
             # If已有会话，直接打开订单列表
             if os.path.exists(self.auth_file) and not force_fresh:
                 logger.info("检测到已有会话，直接打开订单列表...")
-                self.page.goto(f"{self.base_url}?s=4096", wait_until="domcontentloaded")
-                self.page.wait_for_load_state("networkidle")
+                with self._track_latency("goto"):
+                    self.page.goto(f"{self.base_url}?s=4096", wait_until="domcontentloaded")
+                self._wait_networkidle(self.page, 20000)
                 if "passport.jd.com" not in self.page.url:
                     logger.success("会话有效，已打开我的订单列表。")
                     self.context.storage_state(path=self.auth_file)
                     return True
                 logger.warning("会话已失效，转为扫码登录（不再复用旧存储状态）。")
                 # Drop stale cookies/storage to avoid被重定向到风控或验证码页
-                self.close_browser()
+                self.close_browser(keep_driver=True)
                 self.headless = False
                 self.start_browser(use_storage=False)
 
@@ -759,20 +988,80 @@ class JDScraper:
             self.context.storage_state(path=self.auth_file)
             return True
         except Exception as e:
-            logger.error(f"Login failed: {e}")
+            logger.error("Login failed: {err}", err=e)
             return False
         finally:
             self.close_browser()
 
-    def scrape_orders(self, year_filter="1"):
+    def scrape_orders(self, year_filter="1", progress_cb=None, cancel_token=None):
         """
         Robust sequential scraping.
+        progress_cb: optional callable(dict) receiving ScrapeProgress snapshots.
+        cancel_token: optional CancelToken; on cancel the browser is closed and
+        the rows collected so far are exported with status "cancelled".
         """
         with self._lock:
-            return self._scrape_locked(year_filter)
+            self.run_id = uuid.uuid4().hex[:12]
+            log_token = set_log_context(run_id=self.run_id, profile=self.profile_name, phase="launch")
+            try:
+                self.progress = ScrapeProgress(progress_cb, self.limiters)
+                self.cancel_token = cancel_token or CancelToken()
+                self.report = RunReport()
+                self.profiler = RunProfiler.from_env()
+                if self.profiler.scope == "scrape":
+                    self.profiler.start()
+                try:
+                    result = self._scrape_locked(year_filter)
+                finally:
+                    self.profiler.stop()
+                if isinstance(result, dict):
+                    result["run_id"] = self.run_id
+                self._write_run_report(result, year_filter)
+                return result
+            finally:
+                reset_log_context(log_token)
+
+    def _artifact_base(self, result: dict) -> Path:
+        """运行附属文件（报告/剖析）的路径前缀：与导出文件同名，无导出时按时间戳命名。"""
+        if result.get("file"):
+            return Path(result["file"]).with_suffix("")
+        return self.download_dir / f"jd_run_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+    def _write_run_report(self, result, year_filter):
+        """分阶段耗时报告：导出文件旁写 <导出名>.report.json，配置 JD_PROM_TEXTFILE 时另写 Prometheus textfile。"""
+        self.report.finish()
+        if not isinstance(result, dict):
+            return
+        base = self._artifact_base(result)
+        if self.profiler.enabled:
+            result["profile_files"] = self.profiler.write(base)
+        extra = {
+            "run_id": self.run_id,
+            "profile": self.profile_name,
+            "range": year_filter,
+            "status": result.get("status"),
+            "count": result.get("count", 0),
+            "latency": self.latency.summary(),
+            "backoff": self.limiters.multipliers(),
+        }
+        if self.write_run_report:
+            written = self.report.write_json(base.with_name(base.name + ".report.json"), extra)
+            if written:
+                result["report"] = str(written)
+                summary = self.report.summary()
+                logger.info(
+                    "Run report: wall {wall}s, sleep {sleep}s -> {written}",
+                    wall=summary["wall_s"], sleep=summary["sleep_s"], written=written,
+                )
+        if self.prom_textfile:
+            self.report.write_prometheus(self.prom_textfile, labels={"profile": self.profile_name}, extra=extra)
+
+    def cancel(self):
+        """请求取消当前采集（可在任意线程调用）。"""
+        self.cancel_token.cancel()
 
     def _scrape_locked(self, year_filter="1"):
-        logger.info(f"Starting robust scrape task. Filter d={year_filter}")
+        logger.info("Starting robust scrape task. Filter d={year_filter}", year_filter=year_filter)
         
         # Auto-trigger login if no auth is present
         if not os.path.exists(self.auth_file):
@@ -781,10 +1070,16 @@ class JDScraper:
             if not login_success:
                 return {"status": "error", "message": "登录失败或超时，请扫码完成后再试。"}
 
-        if not self.browser:
-            self.start_browser()
+        if self.context and (not self.page or self.page.is_closed()):
+            # 复用的浏览器已被关闭或崩溃，重新启动
+            self.close_browser()
+        if not self.context:
+            with self.report.span("launch"):
+                self.start_browser()
 
-        orders = []
+        # 列式累加：每列一个数组、重复字符串驻留，导出时直接由列构造 DataFrame
+        orders = OrderRows()
+        seen_orders = set()
         page_num = 1
         max_retries = 3
         reauth_attempted = False
@@ -794,10 +1089,13 @@ class JDScraper:
             url = f"{self.base_url}?d={year_filter}&s=4096"
             self._simulate_browse_path(stage="start")
             self._goto_with_retry(url, wait_until="domcontentloaded")
-            self.page.wait_for_load_state("networkidle")
+            self._wait_networkidle(self.page, 20000)
+            self.progress.update(stage="list", force=True)
+            self.profiler.mark("list")
 
             while True:
-                logger.info(f"Processing Page {page_num}...")
+                self.cancel_token.check()
+                logger.info("Processing Page {page}...", page=page_num)
                 self._humanize_page()
                 
                 # Check for auth redirect
@@ -816,7 +1114,7 @@ class JDScraper:
                             self.close_browser()
                         self.start_browser()
                         self._goto_with_retry(url, wait_until="domcontentloaded")
-                        self.page.wait_for_load_state("networkidle")
+                        self._wait_networkidle(self.page, 20000)
                         continue
                     raise Exception("Session expired. Please re-login.")
                 
@@ -837,26 +1135,40 @@ class JDScraper:
                         if not rows:
                             raise Exception("页面没有找到订单列表")
 
-                        logger.info(f"Found {len(rows)} order entries on page {page_num}.")
+                        logger.info("Found {rows} order entries on page {page}.", rows=len(rows), page=page_num)
+                        total_pages = self._read_total_pages()
+                        if total_pages:
+                            self.progress.update(total_pages=max(total_pages, page_num))
+                        self.progress.detail_queued(len(rows) if self.fetch_address else 0)
 
                         for row in rows:
-                            items = self._parse_row(row)
+                            self.cancel_token.check()
+                            with self.report.span("parse_row"):
+                                items = self._parse_row(row)
                             if items:
                                 orders.extend(items)
+                                seen_orders.add(items[0]["订单"])
 
                         last_first_id = rows[0].get_attribute("id") if rows else None
                         success = True
                         break # Exit retry loop
+                    except ScrapeCancelled:
+                        raise
                     except Exception as pg_err:
-                        logger.warning(f"Error parsing page {page_num}: {pg_err}. Retrying ({retry_count+1}/{max_retries})...")
+                        logger.warning("Error parsing page {page}: {err}. Retrying ({attempt}/{retries})...",
+                                       page=page_num, err=pg_err, attempt=retry_count + 1, retries=max_retries)
                         self._bump_backoff("page")
                         self._random_sleep(2, 4)
                         self.page.reload()
                         retry_count += 1
                 
                 if not success:
-                    logger.error(f"Failed to parse page {page_num} after retries. Stopping to preserve data.")
+                    logger.error(
+                        "Failed to parse page {page_num} after retries. Stopping to preserve data.", page_num=page_num
+                    )
                     break
+                self.progress.page_done(page_num, len(seen_orders), len(orders))
+                self.progress.update(detail_pending=0)
                 if self.address_blocked:
                     raise Exception(f"地址抓取被登录重定向中断: {self.address_blocked_reason}")
 
@@ -870,55 +1182,128 @@ class JDScraper:
                 page_num += 1
                 
             # Save Data
-            if orders:
-                df = pd.DataFrame(orders)
-                if "日期" in df.columns:
-                    try:
-                        df["日期"] = pd.to_datetime(df["日期"], errors="coerce")
-                        # 保证同一订单行紧邻，便于后续金额合并
-                        sort_cols = ["日期", "订单"] if "订单" in df.columns else ["日期"]
-                        sort_order = [False, True] if len(sort_cols) == 2 else [False]
-                        df.sort_values(by=sort_cols, ascending=sort_order, inplace=True)
-                    except Exception:
-                        logger.warning("日期列无法解析为时间，保持原始顺序。")
-                split_orders = set(df.loc[df.get("拆单标记") == True, "订单"].tolist()) if "拆单标记" in df.columns else set()
-                # 同一订单多商品且未拆单：仅保留首行金额，便于后续合并。
-                df = self._collapse_order_amounts(df, split_orders)
-                filename = f"jd_orders_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-                filepath = self.download_dir / filename
-                os.makedirs(self.download_dir, exist_ok=True)
-                if "拆单标记" in df.columns:
-                    df = df.drop(columns=["拆单标记"])
-                df.to_excel(filepath, index=False)
-                # 合并金额单元格，避免一单多行重复显示。
-                try:
-                    self._merge_order_amount_cells(filepath, df, split_orders)
-                except Exception as merge_err:
-                    logger.warning(f"金额单元格合并失败: {merge_err}")
-                # Embed images if possible
-                if self.embed_images:
-                    try:
-                        self._embed_images(filepath, df)
-                    except Exception as img_err:
-                        logger.warning(f"Embed images failed: {img_err}")
-                else:
-                    logger.info("跳过商品图片嵌入（JD_EMBED_IMAGES=0）。")
-                unique_orders = len(set(o["订单"] for o in orders if "订单" in o))
-                logger.success(f"Task Completed. Captured {unique_orders} orders ({len(orders)} items). Saved to {filepath}")
-                return {
-                    "status": "success", 
-                    "file": str(filepath), 
-                    "count": len(orders), 
-                    "order_count": unique_orders
-                }
-            else:
-                return {"status": "empty", "message": "No orders found"}
+            return self._export_orders(orders)
 
+        except ScrapeCancelled:
+            return self._flush_cancelled(orders)
         except Exception as e:
-            logger.error(f"Critical Scraping Error: {e}")
+            logger.error("Critical Scraping Error: {err}", err=e)
             return {"status": "error", "message": str(e)}
         finally:
+            self._release_browser()
+
+    def _flush_cancelled(self, orders):
+        """取消：先关闭浏览器，再把已采集的行写出（不再嵌入图片）。"""
+        logger.warning("采集已取消，保存已采集的 {rows} 行。", rows=len(orders))
+        try:
             self.close_browser()
+        except Exception as e:
+            logger.debug("close browser after cancel failed: {err}", err=e)
+        result = self._export_orders(orders)
+        if result.get("status") == "success":
+            result["status"] = "cancelled"
+            result["message"] = "采集已取消，已保存部分结果"
+        return result
+
+    def _release_browser(self):
+        """任务结束：默认关闭浏览器；keep_browser 时保留会话供下一个任务复用，仅落盘学习到的状态。"""
+        if not (self.context or self.browser or self.playwright):
+            # 已由 _flush_cancelled 关闭并落盘，不再重复
+            return
+        if not self.keep_browser:
+            self.close_browser()
+            return
+        self._reset_detail_page()
+        self.latency.save()
+        self.limiters.save()
+
+    def _export_orders(self, orders, image_source=None):
+        """Write collected rows to xlsx (sort, collapse/merge amounts, embed images)."""
+        if not orders:
+            return {"status": "empty", "message": "No orders found"}
+        own_profile = self.profiler.scope == "export" and not self.profiler.active
+        if own_profile:
+            self.profiler.start()
+        try:
+            return self._export_orders_locked(orders, image_source)
+        finally:
+            if own_profile:
+                self.profiler.stop()
+
+    def _export_orders_locked(self, orders, image_source=None):
+        self.progress.update(stage="export", force=True)
+        self.profiler.mark("export")
+        # 定型：日期为时间、金额为分（Int64）、店铺/状态等为 category，见 core.schema
+        df = apply_schema(rows_to_frame(orders))
+        item_count = len(df)
+        unique_orders = int(df["订单"].nunique()) if "订单" in df.columns else 0
+        if "日期" in df.columns:
+            # 保证同一订单行紧邻，便于后续金额合并（无法解析的日期为 NaT，排在最后）
+            sort_cols = ["日期", "订单"] if "订单" in df.columns else ["日期"]
+            sort_order = [False, True] if len(sort_cols) == 2 else [False]
+            df.sort_values(by=sort_cols, ascending=sort_order, inplace=True)
+        split_orders = set(df.loc[df["拆单标记"], "订单"]) if "拆单标记" in df.columns else set()
+        # 同一订单多商品且未拆单：仅保留首行金额，便于后续合并。
+        df = self._collapse_order_amounts(df, split_orders)
+        export_format = self.export_format if self.export_format in ("xlsx", "parquet", "csv") else "xlsx"
+        filename = f"jd_orders_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+        filepath = self.download_dir / filename
+        os.makedirs(self.download_dir, exist_ok=True)
+        # 写文件的视图：金额换回元，其余列共用定型数据。全文索引需要拆单标记判断金额口径，保留去掉该列之前的视图；
+        # 非数值金额的原文在 xlsx/csv 中写回金额单元格，parquet 单独成列（见 core.schema）
+        index_df = for_export(df, keep_text_column=True)
+        export_df = index_df if export_format == "parquet" else for_export(df)
+        df = export_df.drop(columns=["拆单标记"]) if "拆单标记" in df.columns else export_df
+        if export_format == "parquet":
+            # 定型后各列类型单一；category 列写为字典编码
+            with self.report.span("export_write"):
+                df.to_parquet(filepath, index=False)
+        elif export_format == "csv":
+            with self.report.span("export_write"):
+                df.to_csv(filepath, index=False, encoding="utf-8-sig")
+        else:
+            with self.report.span("export_write"):
+                df.to_excel(filepath, index=False)
+            # 合并金额单元格，避免一单多行重复显示。
+            try:
+                with self.report.span("merge_cells"):
+                    self._merge_order_amount_cells(filepath, df, split_orders)
+            except Exception as merge_err:
+                logger.warning("金额单元格合并失败: {err}", err=merge_err)
+            # Embed images if possible
+            if self.cancel_token.cancelled:
+                logger.info("已取消，跳过商品图片嵌入。")
+            elif self.embed_images:
+                try:
+                    with self.report.span("embed_images"):
+                        self._embed_images(filepath, df, image_source=image_source)
+                except Exception as img_err:
+                    logger.warning("Embed images failed: {err}", err=img_err)
+            else:
+                logger.info("跳过商品图片嵌入（JD_EMBED_IMAGES=0）。")
+        if self.columnar_cache:
+            try:
+                with self.report.span("columnar_cache"):
+                    write_columnar_cache(df, filepath)
+            except Exception as cache_err:
+                logger.warning("列式副本写入失败: {err}", err=cache_err)
+        if self.search_index:
+            try:
+                with self.report.span("search_index"):
+                    OrderIndex().index_orders(index_df, source=str(filepath), profile=self.profile_name)
+            except Exception as index_err:
+                logger.warning("全文索引更新失败: {err}", err=index_err)
+        logger.success(
+            "Task Completed. Captured {unique_orders} orders ({item_count} items). Saved to {filepath}",
+            unique_orders=unique_orders, item_count=item_count, filepath=filepath,
+        )
+        self.progress.update(stage="done", orders=unique_orders, items=item_count, force=True)
+        return {
+            "status": "success",
+            "file": str(filepath),
+            "count": item_count,
+            "order_count": unique_orders
+        }
 
     def _parse_row(self, tbody):
         """
@@ -971,7 +1356,7 @@ class JDScraper:
                     detail_url = urljoin(self.base_url, detail_url)
             if not detail_url and order_id:
                 # JD 订单详情页通用格式
-                detail_url = f"https://details.jd.com/normal/item.action?orderid={order_id}"
+                detail_url = self.detail_url_template.format(order_id=order_id)
 
             product_rows = tbody.query_selector_all("tr.tr-bd") or []
             if not product_rows:
@@ -1051,24 +1436,24 @@ class JDScraper:
                         src = "https:" + src
                     img_src = src
 
-                parsed_items.append({
-                    "日期": order_time,
-                    "订单": order_id,
-                    "商品名称": product_name,
-                    "型号": sku,
-                    "数量": qty,
-                    "下单金额": amount_val,
-                    "姓名": receiver,
-                    "地址": order_address or "",
-                    "店铺": shop_name,
-                    "状态": status,
-                    "拆单标记": is_split,
-                    "商品图片": img_src, # Moved to last
-                })
+                parsed_items.append(OrderItem(
+                    order_time=order_time,
+                    order_id=order_id,
+                    name=product_name,
+                    sku=sku,
+                    quantity=qty,
+                    amount=amount_val,
+                    receiver=receiver,
+                    address=order_address or "",
+                    shop=shop_name,
+                    status=status,
+                    is_split=is_split,
+                    image=img_src,  # 商品图片列在最后
+                ))
 
             return parsed_items
         except Exception as e:
-            logger.warning(f"Error parsing order {tbody.get_attribute('id')}: {e}")
+            logger.opt(lazy=True).warning("Error parsing order {}: {}", lambda: tbody.get_attribute("id"), lambda: e)
             return []
 
     def _extract_number(self, text):
@@ -1143,7 +1528,10 @@ class JDScraper:
         self.viewport = self.fingerprint["viewport"]
         self.device_scale_factor = self.fingerprint["device_scale_factor"]
         self.is_mobile = self.fingerprint["is_mobile"]
-        logger.info(f"Profile rotated ({reason}): {self.profile_dir}")
+        # 网络耗时、限速节奏与可用浏览器通道与账号无关，沿用已学习的状态，仅切换持久化位置（launch.json 随 profile_dir）
+        self.latency.path = self.profile_dir / "latency.json"
+        self.limiters.path = self.profile_dir / "rate_state.json"
+        logger.info("Profile rotated ({reason}): {profile_dir}", reason=reason, profile_dir=self.profile_dir)
         return True
 
     def _clear_context_storage(self):
@@ -1166,7 +1554,7 @@ class JDScraper:
                 with open(self.fingerprint_file, "r", encoding="utf-8") as f:
                     data = json.load(f) or {}
             except Exception as e:
-                logger.warning(f"读取指纹文件失败，将重新生成: {e}")
+                logger.warning("读取指纹文件失败，将重新生成: {err}", err=e)
 
         def _env_int(name, fallback):
             raw = os.getenv(name)
@@ -1205,24 +1593,18 @@ class JDScraper:
             with open(self.fingerprint_file, "w", encoding="utf-8") as f:
                 json.dump(fingerprint, f, ensure_ascii=True, indent=2)
         except Exception as e:
-            logger.warning(f"写入指纹文件失败: {e}")
+            logger.warning("写入指纹文件失败: {err}", err=e)
 
         return fingerprint
 
     def _collapse_order_amounts(self, df: pd.DataFrame, split_orders: set):
-        """同一订单的多商品仅保留首行金额（拆单订单保留各行金额）。"""
+        """同一订单的多商品仅保留首行金额（拆单订单保留各行金额），其余行金额置为 <NA>。"""
         if "订单" not in df.columns or "下单金额" not in df.columns:
             return df
-        orders = df["订单"].tolist()
-        # 记录第一个出现的位置，后续同订单的金额置空（仅限未拆单）
-        first_seen = {}
-        for idx, oid in enumerate(orders):
-            if oid in split_orders:
-                continue
-            if oid not in first_seen:
-                first_seen[oid] = idx
-            else:
-                df.at[df.index[idx], "下单金额"] = ""
+        repeated = df["订单"].duplicated() & ~df["订单"].isin(split_orders)
+        df.loc[repeated, "下单金额"] = pd.NA
+        if AMOUNT_TEXT_COLUMN in df.columns:
+            df.loc[repeated, AMOUNT_TEXT_COLUMN] = pd.NA
         return df
 
     def _merge_order_amount_cells(self, filepath: Path, df: pd.DataFrame, split_orders: set):
@@ -1257,7 +1639,7 @@ class JDScraper:
             if order_id in self.address_cache:
                 return self.address_cache[order_id]
 
-            if not detail_url:
+            if not detail_url or self.cancel_token.cancelled:
                 return ""
 
             target = detail_url
@@ -1269,9 +1651,11 @@ class JDScraper:
             detail_page = self._get_detail_page()
             info_text = ""
             detail_ok = False
+            detail_start = time.monotonic()
             try:
                 self._rate_limit("detail")
-                detail_page.goto(target, wait_until="domcontentloaded", timeout=20000)
+                with self._track_latency("detail"):
+                    detail_page.goto(target, wait_until="domcontentloaded", timeout=self._timeout("detail", 20000))
                 if "passport.jd.com" in (detail_page.url or ""):
                     self._log_auth_diagnostic("detail-redirect-to-passport", detail_page)
                     self._reset_detail_page()
@@ -1288,9 +1672,10 @@ class JDScraper:
                     self._dwell_and_scroll(detail_page, min_s=1.0, max_s=2.8)
                 # 等待地址区域渲染（容忍动态加载）
                 try:
-                    detail_page.wait_for_selector(".item .label, .addr, .info-rcol", timeout=8000)
+                    with self._track_latency("selector"):
+                        detail_page.wait_for_selector(".item .label, .addr, .info-rcol", timeout=self._timeout("selector", 8000))
                 except TimeoutError:
-                    logger.warning(f"订单详情未及时加载地址元素: {order_id}")
+                    logger.warning("订单详情未及时加载地址元素: {order_id}", order_id=order_id)
 
                 # 优先：label 含“地址”或“收货地址”，寻找同级 info-rcol
                 label_locator = detail_page.locator("span.label").filter(has_text=re.compile("地址"))
@@ -1334,25 +1719,124 @@ class JDScraper:
             finally:
                 try:
                     if not info_text:
-                        logger.warning(f"订单地址为空，可能页面结构变化或需要登录态验证：{order_id}")
+                        logger.warning("订单地址为空，可能页面结构变化或需要登录态验证：{order_id}", order_id=order_id)
                 finally:
                     if detail_ok:
                         self._decay_backoff("detail")
+                    self.report.record("detail_page", time.monotonic() - detail_start)
+                    self.progress.detail_done()
+        except ScrapeCancelled:
+            return ""
         except Exception as e:
-            logger.warning(f"获取订单地址失败 {order_id}: {e}")
+            logger.warning("获取订单地址失败 {order_id}: {err}", order_id=order_id, err=e)
             self._bump_backoff("detail")
             self._reset_detail_page()
             self.address_cache[order_id] = ""
             return ""
 
-    def _embed_images(self, filepath, df):
+    def _embed_images(self, filepath, df, image_source=None):
         """
         Download images from '商品图片' column and embed into Excel file.
         Uses a temp file to avoid corrupting the main file on failure.
+        image_source: optional callable(url) -> bytes for pre-fetched images.
         """
         if "商品图片" not in df.columns:
             return
+        if self.image_embed_mode == "openpyxl":
+            return self._embed_images_openpyxl(filepath, df, image_source=image_source)
+        return self._embed_images_streaming(filepath, df, image_source=image_source)
 
+    def _image_headers(self) -> dict:
+        return {
+            "User-Agent": random.choice(self.user_agents),
+            "Accept-Language": self.accept_language,
+            "Referer": "https://www.jd.com/",
+        }
+
+    def _embed_images_streaming(self, filepath, df, image_source=None):
+        """
+        流式嵌入：每个不同的图片 URL 只下载一次，字节直接写入输出 zip 后即释放，
+        内容相同的图片只存一份、各行以锚点引用；openpyxl 只负责（不含图片的）单元格改动。
+        """
+        logger.info("Starting image embedding process (streaming)...")
+        filepath = Path(filepath)
+        tmp_path = filepath.with_suffix(".tmp.xlsx")
+        data_path = filepath.with_suffix(".data.tmp.xlsx")
+        col_idx = list(df.columns).index("商品图片")  # 0-based
+        headers = self._image_headers()
+
+        embedded_rows = []
+        failed_keys = set()
+        fetches = 0
+        phash_distance = self.image_phash_distance if self.image_phash else None
+        self.progress.images_started(int((df["商品图片"].astype(str) != "").sum()))
+        self.profiler.mark("images")
+        try:
+            with StreamingImageEmbedder(tmp_path, column=col_idx, phash_distance=phash_distance) as embedder:
+                for idx, url in enumerate(df["商品图片"]):
+                    if self.cancel_token.cancelled:
+                        logger.warning("图片嵌入已取消，保存已嵌入的部分。")
+                        break
+                    if not url:
+                        continue
+                    excel_row = idx + 2  # header is row 1
+                    # 同一张图的尺寸/镜像/格式变体归一为同一个 key，每个 key 只取一次
+                    key = image_key(url)
+                    try:
+                        if embedder.has(key):
+                            ok = embedder.add(excel_row - 1, key)
+                        elif key in failed_keys:
+                            ok = False
+                        else:
+                            fetches += 1
+                            with self.report.span("image_fetch"):
+                                img_bytes = self._fetch_image_shared(url, key, headers, image_source)
+                            ok = embedder.add(excel_row - 1, key, img_bytes)
+                            if not ok:
+                                failed_keys.add(key)
+                        if ok:
+                            embedded_rows.append(excel_row)
+                    except Exception as e:
+                        failed_keys.add(key)
+                        if idx % 10 == 0:
+                            logger.warning("Embed image failed for row {row}: {err}", row=excel_row, err=e)
+                    finally:
+                        self.progress.image_done()
+
+                self.profiler.mark("workbook_save")
+                with self.report.span("workbook_save"):
+                    wb = load_workbook(filepath)
+                    ws = wb.active
+                    col_letter = get_column_letter(col_idx + 1)
+                    ws.column_dimensions[col_letter].width = 12
+                    for excel_row in embedded_rows:
+                        ws[f"{col_letter}{excel_row}"].value = None  # Clear URL text
+                        ws.row_dimensions[excel_row].height = 65
+                    wb.save(data_path)
+                    del wb, ws
+                    embedder.finish(data_path)
+                images = len(embedder.media)
+            with self.report.span("temp_replace"):
+                tmp_path.replace(filepath)
+        finally:
+            for leftover in (data_path, tmp_path):
+                try:
+                    leftover.unlink()
+                except OSError:
+                    pass
+        logger.success(
+            f"Embedded {len(embedded_rows)} images successfully "
+            f"({fetches} fetched, {images} stored)."
+        )
+
+    def _fetch_image_shared(self, url: str, key: str, headers: dict, image_source=None):
+        """按归一 key 单飞取图：同进程内并发导出请求同一张图时只发一次请求，其余等待共享结果。"""
+        if image_source is not None:
+            return image_source(url)
+        return self._image_flight.do(key, lambda: self._fetch_image_bytes(url, headers))
+
+    def _embed_images_openpyxl(self, filepath, df, image_source=None):
+        """旧实现：所有图片以 openpyxl Image 对象驻留内存直到保存（JD_IMAGE_EMBED_MODE=openpyxl）。"""
         logger.info("Starting image embedding process...")
         tmp_path = Path(filepath).with_suffix(".tmp.xlsx")
         wb = load_workbook(filepath)
@@ -1364,19 +1848,25 @@ class JDScraper:
         # Set column width (approximate for 80px)
         ws.column_dimensions[col_letter].width = 12
 
-        headers = {
-            "User-Agent": random.choice(self.user_agents),
-            "Accept-Language": self.accept_language,
-            "Referer": "https://www.jd.com/",
-        }
+        headers = self._image_headers()
 
         success_count = 0
+        fetched = {}
+        self.progress.images_started(int((df["商品图片"].astype(str) != "").sum()))
+        self.profiler.mark("images")
         for idx, url in enumerate(df["商品图片"]):
+            if self.cancel_token.cancelled:
+                logger.warning("图片嵌入已取消，保存已嵌入的部分。")
+                break
             if not url:
                 continue
             excel_row = idx + 2  # header is row 1
             try:
-                img_bytes = self._fetch_image_bytes(url, headers)
+                key = image_key(url)
+                if key not in fetched:
+                    with self.report.span("image_fetch"):
+                        fetched[key] = self._fetch_image_shared(url, key, headers, image_source)
+                img_bytes = fetched[key]
                 if not img_bytes:
                     continue
                     
@@ -1393,12 +1883,17 @@ class JDScraper:
             except Exception as e:
                 # Log only occasional errors to avoid spam
                 if idx % 10 == 0:
-                    logger.warning(f"Embed image failed for row {excel_row}: {e}")
+                    logger.warning("Embed image failed for row {row}: {err}", row=excel_row, err=e)
                 continue
+            finally:
+                self.progress.image_done()
 
-        wb.save(tmp_path)
-        Path(tmp_path).replace(filepath)
-        logger.success(f"Embedded {success_count} images successfully.")
+        self.profiler.mark("workbook_save")
+        with self.report.span("workbook_save"):
+            wb.save(tmp_path)
+        with self.report.span("temp_replace"):
+            Path(tmp_path).replace(filepath)
+        logger.success("Embedded {success_count} images successfully.", success_count=success_count)
 
     def _fetch_image_bytes(self, url: str, headers: dict):
         """
@@ -1419,7 +1914,11 @@ class JDScraper:
                 if resp.status_code in (403, 429):
                     last_err = Exception(f"requests status {resp.status_code}")
                     self._bump_backoff("image", factor=1.8)
-                    self._random_sleep(1.0, 2.0)
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    if retry_after is not None:
+                        self.limiters["image"].retry_after(min(retry_after, 120.0))
+                    else:
+                        self._random_sleep(1.0, 2.0)
                     continue
                 resp.raise_for_status()
                 self._decay_backoff("image")
@@ -1441,36 +1940,57 @@ class JDScraper:
                 self._random_sleep(0.6, 1.2)
                 
         if last_err:
-            logger.warning(f"Failed to fetch image {url}: {last_err}")
+            logger.warning("Failed to fetch image {url}: {err}", url=url, err=last_err)
         return None
 
+    def _read_total_pages(self):
+        """从分页控件读取总页数（取页码链接中的最大数字），读不到返回 None。"""
+        try:
+            texts = self.page.eval_on_selector_all(
+                "div.pagin a, div.pagin span, .ui-pager a",
+                "els => els.map(e => (e.innerText || '').trim())",
+            )
+        except Exception:
+            return None
+        nums = [int(t) for t in texts if t.isdigit()]
+        return max(nums) if nums else None
+
     def _wait_for_orders_ready(self):
         """Ensure the order table and rows are present before parsing."""
-        self.page.wait_for_selector("table.order-tb", timeout=8000)
-        self.page.wait_for_selector("tbody[id^='tb-']", timeout=8000)
+        # 两次等待各记一个样本，否则合并耗时会抬高每次等待各自的超时
+        with self._track_latency("selector"):
+            self.page.wait_for_selector("table.order-tb", timeout=self._timeout("selector", 8000))
+        with self._track_latency("selector"):
+            self.page.wait_for_selector("tbody[id^='tb-']", timeout=self._timeout("selector", 8000))
         if "passport.jd.com" in self.page.url:
             raise Exception("会话失效，请重新登录。")
         reason = self._detect_risk_page(self.page)
         if reason:
             self._handle_risk_page(self.page, reason, fatal=True)
 
-    def _goto_with_retry(self, url: str, wait_until="domcontentloaded", retries: int = None, timeout: int = 20000):
+    def _goto_with_retry(self, url: str, wait_until="domcontentloaded", retries: int = None, timeout: int = None):
         """Navigate with basic retry to handle临时 DNS/网络抖动."""
         retries = retries or self.goto_retries
+        timeout = timeout or self._timeout("goto", 20000)
         last_err = None
         for attempt in range(1, retries + 1):
+            # 取消后不再发起新的导航，否则重试耗尽时取消会变成普通错误，已采集的行也不会写出
+            self.cancel_token.check()
             try:
                 self._rate_limit("page")
-                self.page.goto(url, wait_until=wait_until, timeout=timeout)
+                with self._track_latency("goto"):
+                    self.page.goto(url, wait_until=wait_until, timeout=timeout)
                 reason = self._detect_risk_page(self.page)
                 if reason:
                     self._handle_risk_page(self.page, reason, fatal=True)
                 self._decay_backoff("page")
-                logger.info(f"Goto success [{attempt}/{retries}]: {url}")
+                logger.info("Goto success [{attempt}/{retries}]: {url}", attempt=attempt, retries=retries, url=url)
                 return True
+            except ScrapeCancelled:
+                raise
             except Exception as e:
                 last_err = e
-                logger.warning(f"Goto失败({attempt}/{retries}): {url} -> {e}")
+                logger.warning("Goto失败({attempt}/{retries}): {url} -> {err}", attempt=attempt, retries=retries, url=url, err=e)
                 self._bump_backoff("page")
                 self._random_sleep(1.2, 2.5)
         if last_err:
@@ -1501,35 +2021,38 @@ class JDScraper:
 
         href = (next_locator.get_attribute("href") or "").strip()
         self._random_sleep(1.2, 3.5)
+        self.cancel_token.check()
 
         try:
             if href and href != "#" and "javascript" not in href.lower():
                 # Normalize protocol-relative URLs
                 target = f"https:{href}" if href.startswith("//") else urljoin(self.page.url, href)
-                self.page.goto(target, wait_until="domcontentloaded")
+                with self._track_latency("goto"):
+                    self.page.goto(target, wait_until="domcontentloaded", timeout=self._timeout("goto", 20000))
             else:
-                with self.page.expect_navigation(wait_until="domcontentloaded", timeout=12000):
-                    next_locator.click()
+                with self._track_latency("pagination"):
+                    with self.page.expect_navigation(wait_until="domcontentloaded", timeout=self._timeout("pagination", 12000)):
+                        next_locator.click()
         except TimeoutError as e:
-            logger.warning(f"Pagination navigation timeout: {e}")
+            logger.warning("Pagination navigation timeout: {err}", err=e)
             return False
 
         # Wait for content change; JD may be ajax or full navigation.
-        try:
-            self.page.wait_for_load_state("networkidle", timeout=12000)
-        except TimeoutError:
-            logger.warning("Network idle wait timed out, checking DOM change directly.")
+        if not self._wait_networkidle(self.page, 12000):
+            logger.warning("Network idle wait timed out or skipped, checking DOM change directly.")
 
         try:
-            self.page.wait_for_selector("tbody[id^='tb-']", timeout=8000)
-            self.page.wait_for_function(
-                """(firstId) => {
-                    const first = document.querySelector("tbody[id^='tb-']");
-                    return !firstId || (first && first.id !== firstId);
-                }""",
-                arg=last_first_id,
-                timeout=12000
-            )
+            with self._track_latency("selector"):
+                self.page.wait_for_selector("tbody[id^='tb-']", timeout=self._timeout("selector", 8000))
+            with self._track_latency("pagination"):
+                self.page.wait_for_function(
+                    """(firstId) => {
+                        const first = document.querySelector("tbody[id^='tb-']");
+                        return !firstId || (first && first.id !== firstId);
+                    }""",
+                    arg=last_first_id,
+                    timeout=self._timeout("pagination", 12000)
+                )
         except TimeoutError:
             logger.warning("Pagination DOM did not change after navigating.")
 
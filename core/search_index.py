@@ -0,0 +1,365 @@
+import os
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+from core.rollups import ensure_rollups, query_rollups
+from core.rows import rows_to_frame
+
+
+# items 为去重后的商品行（同一订单/型号/商品名只保留一行，后采集的覆盖先前的）；
+# items_fts 为外部内容 FTS5 索引，trigram 分词可对中文做任意 3 字以上子串匹配
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    order_id TEXT NOT NULL,
+    sku TEXT NOT NULL DEFAULT '',
+    name TEXT NOT NULL DEFAULT '',
+    shop TEXT NOT NULL DEFAULT '',
+    receiver TEXT NOT NULL DEFAULT '',
+    address TEXT NOT NULL DEFAULT '',
+    order_time TEXT NOT NULL DEFAULT '',
+    quantity INTEGER,
+    amount REAL,
+    status TEXT NOT NULL DEFAULT '',
+    profile TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL DEFAULT '',
+    UNIQUE (order_id, sku, name)
+);
+CREATE INDEX IF NOT EXISTS items_order_time ON items (order_time);
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5 (
+    name, shop, receiver, address, order_id,
+    content='items', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+    INSERT INTO items_fts (rowid, name, shop, receiver, address, order_id)
+    VALUES (new.id, new.name, new.shop, new.receiver, new.address, new.order_id);
+END;
+CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
+    INSERT INTO items_fts (items_fts, rowid, name, shop, receiver, address, order_id)
+    VALUES ('delete', old.id, old.name, old.shop, old.receiver, old.address, old.order_id);
+END;
+CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE ON items BEGIN
+    INSERT INTO items_fts (items_fts, rowid, name, shop, receiver, address, order_id)
+    VALUES ('delete', old.id, old.name, old.shop, old.receiver, old.address, old.order_id);
+    INSERT INTO items_fts (rowid, name, shop, receiver, address, order_id)
+    VALUES (new.id, new.name, new.shop, new.receiver, new.address, new.order_id);
+END;
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    indexed_at TEXT NOT NULL
+);
+"""
+
+_UPSERT = """
+INSERT INTO items (order_id, sku, name, shop, receiver, address, order_time, quantity, amount, status, profile, source)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (order_id, sku, name) DO UPDATE SET
+    shop = excluded.shop,
+    receiver = CASE WHEN excluded.receiver != '' THEN excluded.receiver ELSE items.receiver END,
+    address = CASE WHEN excluded.address != '' THEN excluded.address ELSE items.address END,
+    order_time = CASE WHEN excluded.order_time != '' THEN excluded.order_time ELSE items.order_time END,
+    quantity = COALESCE(excluded.quantity, items.quantity),
+    amount = excluded.amount,
+    status = excluded.status,
+    profile = CASE WHEN excluded.profile != '' THEN excluded.profile ELSE items.profile END,
+    source = excluded.source
+"""
+
+# 被索引（可搜索）的列；1~2 个字的短词低于 trigram 长度，改用 LIKE 扫描这些列
+SEARCH_FIELDS = ("name", "shop", "receiver", "address", "order_id")
+RESULT_FIELDS = (
+    ("order_time", "日期"),
+    ("order_id", "订单"),
+    ("name", "商品名称"),
+    ("sku", "型号"),
+    ("quantity", "数量"),
+    ("amount", "下单金额"),
+    ("receiver", "姓名"),
+    ("address", "地址"),
+    ("shop", "店铺"),
+    ("status", "状态"),
+    ("source", "来源"),
+)
+EXPORT_PREFIX = "jd_orders_"
+EXPORT_SUFFIXES = (".xlsx", ".parquet", ".csv")
+
+
+def default_db_path() -> Path:
+    raw = os.getenv("JD_SEARCH_DB", "")
+    if raw:
+        return Path(raw).expanduser().resolve()
+    from core.scraper import _data_base_dir
+    return _data_base_dir() / "data" / "orders_index.sqlite3"
+
+
+# 导出列 -> items 列（顺序与 _UPSERT 的 VALUES 一致，末尾追加 profile / source）
+_TEXT_FIELDS = (
+    ("订单", "order_id"),
+    ("型号", "sku"),
+    ("商品名称", "name"),
+    ("店铺", "shop"),
+    ("姓名", "receiver"),
+    ("地址", "address"),
+)
+
+
+def _text_series(df: pd.DataFrame, column: str) -> pd.Series:
+    if column not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[column].astype("string").fillna("").str.strip().astype(object)
+
+
+def _time_series(df: pd.DataFrame) -> pd.Series:
+    if "日期" not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    raw = df["日期"]
+    parsed = pd.to_datetime(raw, errors="coerce")
+    text = parsed.dt.strftime("%Y-%m-%d %H:%M:%S")
+    # 无法解析的保留原文
+    return text.where(parsed.notna(), _text_series(df, "日期")).astype(object)
+
+
+def _numeric_series(df: pd.DataFrame, column: str) -> pd.Series:
+    if column not in df.columns:
+        return pd.Series(float("nan"), index=df.index)
+    return pd.to_numeric(df[column], errors="coerce")
+
+
+def _nullable(series: pd.Series) -> pd.Series:
+    return series.astype(object).where(series.notna(), None)
+
+
+def _prepare_rows(df: pd.DataFrame, source: str = "", profile: str = "") -> list:
+    """
+    向量化整理一批商品行为 _UPSERT 参数：文本清洗、时间统一格式、金额/数量转数值，批内按订单+型号+商品名去重（保留最后一条）。
+    金额口径与导出一致：未拆单的一单多商品只保留首行金额（其余行为整单金额的重复），拆单各行保留各自金额；
+    没有“拆单标记”列的数据（来自导出文件）已是该口径，不再处理。
+    """
+    if df.empty:
+        return []
+    out = pd.DataFrame(index=df.index)
+    for label, column in _TEXT_FIELDS:
+        out[column] = _text_series(df, label)
+    out["order_time"] = _time_series(df)
+    out["quantity"] = _nullable(_numeric_series(df, "数量").round().astype("Int64"))
+    amount = _numeric_series(df, "下单金额")
+    if "拆单标记" in df.columns:
+        split = df["拆单标记"].fillna(False).astype(bool).groupby(out["order_id"]).transform("any")
+        amount = amount.mask(out["order_id"].duplicated() & ~split)
+    out["amount"] = _nullable(amount)
+    out["status"] = _text_series(df, "状态")
+    out["profile"] = profile or ""
+    out["source"] = source or ""
+    out = out[out["order_id"] != ""].drop_duplicates(["order_id", "sku", "name"], keep="last")
+    return list(out.itertuples(index=False, name=None))
+
+
+class OrderIndex:
+    """
+    所有采集结果的全文索引（SQLite FTS5）：采集导出后增量写入，旧导出文件按 (mtime, size) 增量导入。
+    同库的消费汇总表（core.rollups）由触发器随写入增量更新。
+    每次调用单独建连接，可在任意线程/进程中使用（WAL + busy timeout 处理并发写）。
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path) if db_path else default_db_path()
+        self._initialized = False
+
+    def connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not self._initialized:
+            conn.executescript(_SCHEMA)
+            ensure_rollups(conn)
+            self._initialized = True
+        return conn
+
+    def index_orders(self, orders, source: str = "", profile: str = "") -> int:
+        """写入一批商品行（OrderRows / list[dict] / DataFrame，字段与 JDScraper._parse_row 一致），返回写入行数。"""
+        rows = _prepare_rows(rows_to_frame(orders), source=source, profile=profile)
+        if not rows:
+            return 0
+        conn = self.connect()
+        try:
+            with conn:
+                conn.executemany(_UPSERT, rows)
+                if source and Path(source).is_file():
+                    self._mark_source(conn, Path(source), len(rows))
+        finally:
+            conn.close()
+        return len(rows)
+
+    def _mark_source(self, conn, path: Path, rows: int):
+        st = path.stat()
+        conn.execute(
+            "INSERT OR REPLACE INTO sources (path, mtime, size, rows, indexed_at) VALUES (?, ?, ?, ?, ?)",
+            (str(path), st.st_mtime, st.st_size, rows, datetime.now().isoformat(timespec="seconds")),
+        )
+
+    def is_indexed(self, path) -> bool:
+        path = Path(path)
+        try:
+            st = path.stat()
+        except OSError:
+            return False
+        conn = self.connect()
+        try:
+            row = conn.execute("SELECT mtime, size FROM sources WHERE path = ?", (str(path),)).fetchone()
+        finally:
+            conn.close()
+        return bool(row) and row[0] == st.st_mtime and row[1] == st.st_size
+
+    def index_file(self, path, force: bool = False, chunk_rows: int = 20000) -> int:
+        """
+        流式导入一个导出文件（xlsx/csv/parquet）：按块读取、整理并写入，内存占用与文件大小无关；
+        文件未变化时跳过，返回写入行数。
+        """
+        from core.columnar import iter_export_chunks
+
+        path = Path(path).expanduser().resolve()
+        if not force and self.is_indexed(path):
+            return 0
+        count = 0
+        conn = self.connect()
+        try:
+            for chunk in iter_export_chunks(path, chunk_rows=chunk_rows):
+                rows = _prepare_rows(chunk, source=str(path))
+                with conn:
+                    conn.executemany(_UPSERT, rows)
+                count += len(rows)
+            with conn:
+                self._mark_source(conn, path, count)
+        finally:
+            conn.close()
+        logger.info(f"Indexed {count} rows from {path.name}")
+        return count
+
+    def import_exports(self, directory, force: bool = False, chunk_rows: int = 20000) -> dict:
+        """
+        增量导入目录下的所有导出文件（jd_orders_*），单个文件失败不影响其他文件。
+        按修改时间从旧到新导入：范围重叠的订单以较新的导出为准（订单+型号+商品名唯一）。
+        """
+        directory = Path(directory)
+        files = sorted(
+            (p for p in directory.glob(f"{EXPORT_PREFIX}*")
+             if p.suffix.lower() in EXPORT_SUFFIXES and not p.name.endswith(".tmp.xlsx")),
+            key=lambda p: p.stat().st_mtime,
+        )
+        summary = {"files": 0, "skipped": 0, "rows": 0, "errors": []}
+        for path in files:
+            if not force and self.is_indexed(path):
+                summary["skipped"] += 1
+                continue
+            try:
+                summary["rows"] += self.index_file(path, force=True, chunk_rows=chunk_rows)
+                summary["files"] += 1
+            except Exception as e:
+                logger.warning(f"导入 {path.name} 失败: {e}")
+                summary["errors"].append(f"{path.name}: {e}")
+        return summary
+
+    def search(self, query: str, limit: int = 200) -> list:
+        """空格分隔的多个词取交集；返回按下单时间倒序的商品行（中文字段名，与导出一致）。"""
+        terms = [t for t in (query or "").split() if t]
+        if not terms:
+            return []
+        long_terms = [t for t in terms if len(t) >= 3]
+        short_terms = [t for t in terms if len(t) < 3]
+        columns = ", ".join(f"items.{col}" for col, _ in RESULT_FIELDS)
+        sql = f"SELECT {columns} FROM items"
+        where, params = [], []
+        if long_terms:
+            sql += " JOIN items_fts ON items_fts.rowid = items.id"
+            where.append("items_fts MATCH ?")
+            params.append(" AND ".join('"' + t.replace('"', '""') + '"' for t in long_terms))
+        for term in short_terms:
+            pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            where.append("(" + " OR ".join(f"items.{col} LIKE ? ESCAPE '\\'" for col in SEARCH_FIELDS) + ")")
+            params.extend([pattern] * len(SEARCH_FIELDS))
+        sql += " WHERE " + " AND ".join(where) + " ORDER BY items.order_time DESC LIMIT ?"
+        params.append(int(limit))
+        conn = self.connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        return [{label: value for (_, label), value in zip(RESULT_FIELDS, row)} for row in rows]
+
+    def export_dataset(self, path, batch_rows: int = 50000) -> int:
+        """
+        把合并去重后的全部商品行写成一个 Parquet 数据集（分批读取、分批写入），
+        附带“订单金额”列：由 orders 汇总表还原的整单金额（即 xlsx 中被合并的金额单元格）。
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = Path(path).expanduser().resolve()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        labels = [label for _, label in RESULT_FIELDS] + ["订单金额"]
+        columns = ", ".join(f"items.{col}" for col, _ in RESULT_FIELDS)
+        sql = (f"SELECT {columns}, orders.amount FROM items LEFT JOIN orders ON orders.order_id = items.order_id "
+               "ORDER BY items.order_time DESC, items.order_id, items.id")
+        tmp = path.with_name(path.name + ".tmp")
+        written = 0
+        conn = self.connect()
+        writer = None
+        try:
+            cursor = conn.execute(sql)
+            while True:
+                batch = cursor.fetchmany(batch_rows)
+                if not batch:
+                    break
+                df = pd.DataFrame.from_records(batch, columns=labels)
+                df["日期"] = pd.to_datetime(df["日期"], errors="coerce")
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(str(tmp), table.schema)
+                writer.write_table(table)
+                written += len(batch)
+        finally:
+            if writer is not None:
+                writer.close()
+            conn.close()
+        if writer is not None:
+            os.replace(tmp, path)
+        return written
+
+    def rollups(self, limit: int = 12) -> dict:
+        """按月/店铺/状态/商品的消费汇总（增量维护的小表，读取耗时与历史订单量无关）。"""
+        conn = self.connect()
+        try:
+            return query_rollups(conn, limit=limit)
+        finally:
+            conn.close()
+
+    def stats(self) -> dict:
+        conn = self.connect()
+        try:
+            items = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+            orders = conn.execute("SELECT COUNT(DISTINCT order_id) FROM items").fetchone()[0]
+            sources = conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0]
+        finally:
+            conn.close()
+        return {"items": items, "orders": orders, "sources": sources, "db": str(self.db_path)}
+
+
+def search_orders(query: str, limit: int = 200, db_path=None) -> dict:
+    """查询入口：返回 {"query", "results", "count", "elapsed_ms"}。"""
+    started = time.perf_counter()
+    results = OrderIndex(db_path).search(query, limit=limit)
+    return {
+        "query": query,
+        "results": results,
+        "count": len(results),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
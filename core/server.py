@@ -0,0 +1,286 @@
+import os
+import platform
+import queue
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque, OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import FileResponse, JSONResponse
+from fastapi.staticfiles import StaticFiles
+from loguru import logger
+
+from core.cancel import CancelToken
+from core.scraper import JDScraper, _data_base_dir
+
+
+class ScrapeJobQueue:
+    """
+    单个常驻工作线程按顺序执行登录/采集任务（Playwright 同步 API 需固定线程），
+    浏览器会话在任务之间复用；HTTP 处理函数只做入队与查询，不会被长任务占住。
+    """
+
+    def __init__(self, scraper: JDScraper, max_history: int = 200, log_lines: int = 300):
+        self.scraper = scraper
+        self.max_history = max_history
+        self.log_lines = log_lines
+        self.jobs = OrderedDict()
+        self._pending = queue.Queue()
+        self._lock = threading.Lock()
+        self._current = None
+        self._thread = threading.Thread(target=self._run, name="scrape-worker", daemon=True)
+        self._sink_id = None
+
+    def start(self):
+        if self._thread.is_alive():
+            return
+        self._thread.start()
+        worker = self._thread
+        self._sink_id = logger.add(
+            self._capture_log,
+            level="INFO",
+            filter=lambda record: record["thread"].id == worker.ident,
+        )
+
+    def _capture_log(self, message):
+        job = self._current
+        if job is None:
+            return
+        record = message.record
+        job["logs"].append(f"[{record['time']:%H:%M:%S}] {record['level'].name}: {record['message']}")
+        job["log_count"] += 1
+
+    def submit(self, kind: str, **params):
+        job = {
+            "id": uuid.uuid4().hex[:12],
+            "kind": kind,
+            "params": params,
+            "status": "queued",
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "progress": None,
+            "logs": deque(maxlen=self.log_lines),
+            "log_count": 0,
+            "cancel": CancelToken(),
+        }
+        with self._lock:
+            self.jobs[job["id"]] = job
+            while len(self.jobs) > self.max_history:
+                oldest_id, oldest = next(iter(self.jobs.items()))
+                if oldest["status"] in ("queued", "running"):
+                    break
+                self.jobs.pop(oldest_id)
+        self._pending.put(job["id"])
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def all(self):
+        with self._lock:
+            return list(self.jobs.values())
+
+    def cancel(self, job_id: str) -> bool:
+        """排队中的任务直接标记取消；运行中的采集任务通知其停止并保存已采集的数据。"""
+        job = self.get(job_id)
+        if job is None or job["status"] not in ("queued", "running"):
+            return False
+        job["cancel"].cancel()
+        return True
+
+    def position(self, job_id: str) -> int:
+        with self._lock:
+            queued = [jid for jid, j in self.jobs.items() if j["status"] == "queued"]
+        return queued.index(job_id) + 1 if job_id in queued else 0
+
+    def snapshot(self, job: dict, log_offset: int = 0):
+        """log_offset 为客户端已收到的日志条数，仅返回其后的新行（环形缓冲外的旧行不再返回）。"""
+        logs = list(job["logs"])
+        total = job["log_count"]
+        first = total - len(logs)
+        return {
+            "id": job["id"],
+            "kind": job["kind"],
+            "params": job["params"],
+            "status": job["status"],
+            "position": self.position(job["id"]),
+            "created_at": job["created_at"],
+            "started_at": job["started_at"],
+            "finished_at": job["finished_at"],
+            "result": job["result"],
+            "progress": job["progress"],
+            "log_total": total,
+            "logs": logs[max(0, log_offset - first):],
+        }
+
+    def _run(self):
+        while True:
+            job_id = self._pending.get()
+            job = self.get(job_id)
+            if job is None:
+                continue
+            if job["cancel"].cancelled:
+                job["status"] = "cancelled"
+                job["result"] = {"status": "cancelled", "message": "任务在开始前被取消"}
+                job["finished_at"] = time.time()
+                continue
+            job["status"] = "running"
+            job["started_at"] = time.time()
+            self._current = job
+            try:
+                result = self._execute(job)
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {e}")
+                result = {"status": "error", "message": str(e)}
+            finally:
+                self._current = None
+            job["result"] = result
+            job["status"] = (result or {}).get("status") or "error"
+            job["finished_at"] = time.time()
+
+    def _execute(self, job: dict):
+        if job["kind"] == "login":
+            ok = self.scraper.login(force_fresh=bool(job["params"].get("force_fresh")))
+            return {"status": "success" if ok else "error", "message": "登录成功" if ok else "登录失败或超时"}
+        if job["kind"] == "scrape":
+            return self.scraper.scrape_orders(
+                job["params"].get("filter_type") or "1",
+                progress_cb=lambda snap: job.__setitem__("progress", snap),
+                cancel_token=job["cancel"],
+            )
+        return {"status": "error", "message": f"unknown job kind: {job['kind']}"}
+
+
+def _file_meta(path: Path):
+    stat = path.stat()
+    return {
+        "name": path.name,
+        "modified": datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M:%S"),
+        "size": stat.st_size,
+        "path": f"/api/files/{path.name}",
+        "full_path": str(path),
+    }
+
+
+def create_app(scraper: JDScraper = None):
+    if scraper is None:
+        scraper = JDScraper(headless=os.getenv("JD_HEADLESS", "0") != "0")
+    scraper.keep_browser = True
+    jobs = ScrapeJobQueue(scraper)
+    static_dir = _data_base_dir() / "static"
+
+    @asynccontextmanager
+    async def lifespan(app):
+        jobs.start()
+        yield
+
+    app = FastAPI(title="JD Order Export", lifespan=lifespan)
+    app.state.jobs = jobs
+    app.state.scraper = scraper
+    if static_dir.exists():
+        app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
+
+    @app.get("/")
+    def index():
+        return FileResponse(str(static_dir / "index.html"))
+
+    @app.get("/api/check-auth")
+    def check_auth():
+        return {"authenticated": os.path.exists(scraper.auth_file)}
+
+    @app.post("/api/login")
+    def login(force_fresh: bool = True):
+        job = jobs.submit("login", force_fresh=force_fresh)
+        return JSONResponse(
+            {"status": "queued", "job_id": job["id"], "message": "登录任务已排队，请在服务器弹出的浏览器中扫码。"},
+            status_code=202,
+        )
+
+    @app.post("/api/scrape")
+    def scrape(filter_type: str = "1"):
+        job = jobs.submit("scrape", filter_type=filter_type)
+        return JSONResponse(
+            {"status": "queued", "job_id": job["id"], "position": jobs.position(job["id"])},
+            status_code=202,
+        )
+
+    @app.get("/api/jobs")
+    def list_jobs():
+        return {"jobs": [jobs.snapshot(j, log_offset=j["log_count"]) for j in reversed(jobs.all())]}
+
+    @app.get("/api/jobs/{job_id}")
+    def job_status(job_id: str, log_offset: int = 0):
+        job = jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="job not found")
+        return jobs.snapshot(job, log_offset=max(0, log_offset))
+
+    @app.post("/api/jobs/{job_id}/cancel")
+    def job_cancel(job_id: str):
+        if jobs.get(job_id) is None:
+            raise HTTPException(status_code=404, detail="job not found")
+        if not jobs.cancel(job_id):
+            raise HTTPException(status_code=409, detail="job already finished")
+        return {"status": "cancelling", "job_id": job_id}
+
+    @app.get("/api/jobs/{job_id}/download")
+    def job_download(job_id: str):
+        job = jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="job not found")
+        path = Path(((job.get("result") or {}).get("file")) or "")
+        if job["status"] not in ("success", "cancelled") or not path.is_file():
+            raise HTTPException(status_code=409, detail="result not available")
+        return FileResponse(str(path), filename=path.name)
+
+    @app.get("/api/latest-file")
+    def latest_file():
+        download_dir = Path(scraper.download_dir)
+        if not download_dir.exists():
+            return {}
+        files = [
+            p for p in download_dir.glob("jd_orders_*")
+            if p.is_file() and p.suffix in (".xlsx", ".parquet", ".csv")
+        ]
+        if not files:
+            return {}
+        return _file_meta(max(files, key=lambda p: p.stat().st_mtime))
+
+    @app.get("/api/files/{name}")
+    def download_file(name: str):
+        download_dir = Path(scraper.download_dir).resolve()
+        path = (download_dir / name).resolve()
+        if path.parent != download_dir or not path.is_file():
+            raise HTTPException(status_code=404, detail="file not found")
+        return FileResponse(str(path), filename=path.name)
+
+    @app.post("/api/open-folder")
+    def open_folder():
+        path = str(scraper.download_dir)
+        try:
+            os.makedirs(path, exist_ok=True)
+            if platform.system() == "Windows":
+                os.startfile(path)
+            elif platform.system() == "Darwin":
+                subprocess.run(["open", path], check=False)
+            else:
+                subprocess.run(["xdg-open", path], check=False)
+            return {"status": "success"}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    return app
+
+
+def run(host: str = "127.0.0.1", port: int = 8000):
+    import uvicorn
+
+    uvicorn.run(create_app(), host=host, port=port)
@@ -0,0 +1,248 @@
+"""
+流式嵌入 xlsx 图片：图片字节一到就写入输出 zip 的 xl/media（内容相同的图片只存一份），
+每行只在临时 drawing XML 中追加一个锚点引用，内存占用与导出行数无关。
+收尾时把（不含图片的）数据工作簿各部件复制进来，并补上 drawing、关系与内容类型。
+"""
+import hashlib
+import io
+import posixpath
+import shutil
+import tempfile
+import zipfile
+from xml.etree import ElementTree as ET
+
+from core.images import dhash_close, image_dhash
+
+
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+NS_CT = "http://schemas.openxmlformats.org/package/2006/content-types"
+REL_DRAWING = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/drawing"
+REL_IMAGE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/image"
+CT_DRAWING = "application/vnd.openxmlformats-officedocument.drawing+xml"
+IMAGE_TYPES = {"jpeg": "image/jpeg", "png": "image/png", "gif": "image/gif"}
+EMU_PER_PX = 9525
+# worksheet 中 <drawing> 必须位于这些元素之前（CT_Worksheet 的元素顺序）
+_AFTER_DRAWING = (b"<legacyDrawing", b"<legacyDrawingHF", b"<drawingHF", b"<picture", b"<oleObjects",
+                  b"<controls", b"<webPublishItems", b"<tableParts", b"<extLst", b"</worksheet>")
+_DRAWING_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<xdr:wsDr xmlns:xdr="http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing" '
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    f'xmlns:r="{NS_REL}">'
+)
+_ANCHOR = (
+    '<xdr:oneCellAnchor><xdr:from><xdr:col>{col}</xdr:col><xdr:colOff>0</xdr:colOff>'
+    '<xdr:row>{row}</xdr:row><xdr:rowOff>0</xdr:rowOff></xdr:from><xdr:ext cx="{cx}" cy="{cy}"/>'
+    '<xdr:pic><xdr:nvPicPr><xdr:cNvPr id="{pid}" name="Image {pid}"/>'
+    '<xdr:cNvPicPr><a:picLocks noChangeAspect="1"/></xdr:cNvPicPr></xdr:nvPicPr>'
+    '<xdr:blipFill><a:blip r:embed="{rid}"/><a:stretch><a:fillRect/></a:stretch></xdr:blipFill>'
+    '<xdr:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+    '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></xdr:spPr></xdr:pic><xdr:clientData/></xdr:oneCellAnchor>'
+)
+
+
+def normalize_image(data: bytes):
+    """返回 (字节, 扩展名)；Excel 只认 JPEG/PNG/GIF，其余格式（如 webp）用 Pillow 转 PNG，失败返回 None。"""
+    if not data:
+        return None
+    if data[:3] == b"\xff\xd8\xff":
+        return data, "jpeg"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return data, "png"
+    if data[:4] == b"GIF8":
+        return data, "gif"
+    try:
+        from PIL import Image
+
+        buf = io.BytesIO()
+        with Image.open(io.BytesIO(data)) as img:
+            img.save(buf, format="PNG")
+        return buf.getvalue(), "png"
+    except Exception:
+        return None
+
+
+def _first_sheet_part(zin: zipfile.ZipFile) -> str:
+    workbook = ET.fromstring(zin.read("xl/workbook.xml"))
+    sheet = workbook.find(f"{{{NS_MAIN}}}sheets/{{{NS_MAIN}}}sheet")
+    rid = sheet.get(f"{{{NS_REL}}}id")
+    rels = ET.fromstring(zin.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels:
+        if rel.get("Id") == rid:
+            target = rel.get("Target")
+            return target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+    raise ValueError("workbook has no worksheet")
+
+
+def _rels_path(part: str) -> str:
+    folder, name = posixpath.split(part)
+    return posixpath.join(folder, "_rels", name + ".rels")
+
+
+class StreamingImageEmbedder:
+    """
+    用法：
+        with StreamingImageEmbedder(out_path, column=11) as emb:
+            emb.add(row, key, data)      # row 为 0-based 的工作表行号，key 用于去重（如归一后的图片 URL）
+            ...
+            emb.finish(data_xlsx_path)   # 复制数据工作簿并写入 drawing
+    """
+
+    def __init__(self, out_path, column: int, width_px: int = 80, height_px: int = 80, phash_distance: int = None):
+        self.out_path = str(out_path)
+        self.column = column
+        self.cx = width_px * EMU_PER_PX
+        self.cy = height_px * EMU_PER_PX
+        self.images = 0
+        self.media = {}
+        self._by_key = {}
+        self._by_digest = {}
+        # phash_distance 非 None 时，内容不同但感知哈希相近（同图重编码/缩放）的图片也只存一份
+        self.phash_distance = phash_distance
+        self._phashes = []
+        self._zip = None
+        self._anchors = None
+
+    def __enter__(self):
+        self._zip = zipfile.ZipFile(self.out_path, "w", zipfile.ZIP_DEFLATED)
+        self._anchors = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        if self._anchors is not None:
+            self._anchors.close()
+            self._anchors = None
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+    def has(self, key) -> bool:
+        return key in self._by_key
+
+    def add(self, row: int, key, data: bytes = None) -> bool:
+        """在第 row 行放一张图；key 已出现过时直接复用已写入的图片（data 可省略）。"""
+        rid = self._by_key.get(key)
+        if rid is None:
+            normalized = normalize_image(data)
+            if normalized is None:
+                return False
+            payload, ext = normalized
+            digest = hashlib.sha1(payload).hexdigest()
+            rid = self._by_digest.get(digest)
+            fingerprint = None
+            if rid is None and self.phash_distance is not None:
+                fingerprint = image_dhash(payload)
+                rid = self._match_phash(fingerprint)
+            if rid is None:
+                rid = f"rId{len(self.media) + 1}"
+                name = f"xl/media/image{len(self.media) + 1}.{ext}"
+                # 图片本身已压缩，按 STORED 写入，不再浪费 CPU 去 deflate
+                self._zip.writestr(zipfile.ZipInfo(name), payload, compress_type=zipfile.ZIP_STORED)
+                self.media[rid] = name
+                if fingerprint is not None:
+                    self._phashes.append((fingerprint, rid))
+            self._by_digest[digest] = rid
+            self._by_key[key] = rid
+        self.images += 1
+        self._anchors.write(_ANCHOR.format(col=self.column, row=row, cx=self.cx, cy=self.cy,
+                                           pid=self.images + 1, rid=rid))
+        return True
+
+    def _match_phash(self, fingerprint):
+        if fingerprint is None:
+            return None
+        for other, rid in self._phashes:
+            if dhash_close(fingerprint, other, self.phash_distance):
+                return rid
+        return None
+
+    def finish(self, data_path):
+        """把数据工作簿（不含图片）复制进输出，并接上 drawing。"""
+        with zipfile.ZipFile(data_path) as zin:
+            names = zin.namelist()
+            sheet = _first_sheet_part(zin)
+            drawing_no = 1
+            while f"xl/drawings/drawing{drawing_no}.xml" in names:
+                drawing_no += 1
+            drawing = f"xl/drawings/drawing{drawing_no}.xml"
+            sheet_rels = _rels_path(sheet)
+            rels_root = ET.fromstring(zin.read(sheet_rels)) if sheet_rels in names else ET.Element(f"{{{NS_PKG_REL}}}Relationships")
+            if self.images:
+                used = {rel.get("Id") for rel in rels_root}
+                n = 1
+                while f"rId{n}" in used:
+                    n += 1
+                drawing_rid = f"rId{n}"
+                ET.SubElement(rels_root, f"{{{NS_PKG_REL}}}Relationship", Id=drawing_rid, Type=REL_DRAWING,
+                              Target=posixpath.relpath(drawing, posixpath.dirname(sheet)))
+
+            for info in zin.infolist():
+                if info.filename in (sheet_rels, "[Content_Types].xml"):
+                    continue
+                if info.filename == sheet and self.images:
+                    self._copy_sheet(zin, info, drawing_rid)
+                    continue
+                with zin.open(info) as src, self._zip.open(info.filename, "w") as dst:
+                    shutil.copyfileobj(src, dst, 1 << 20)
+
+            if self.images or sheet_rels in names:
+                ET.register_namespace("", NS_PKG_REL)
+                self._zip.writestr(sheet_rels, ET.tostring(rels_root, xml_declaration=True, encoding="UTF-8"))
+            self._zip.writestr("[Content_Types].xml", self._content_types(zin.read("[Content_Types].xml"), drawing))
+        if self.images:
+            self._write_drawing(drawing)
+
+    def _copy_sheet(self, zin, info, drawing_rid: str):
+        """流式复制工作表 XML，只在尾部按元素顺序插入 <drawing r:id=…/>。"""
+        tag = f'<drawing xmlns:r="{NS_REL}" r:id="{drawing_rid}"/>'.encode()
+        tail = b""
+        with zin.open(info) as src, self._zip.open(info.filename, "w") as dst:
+            while True:
+                chunk = src.read(1 << 20)
+                if not chunk:
+                    break
+                buf = tail + chunk
+                # 保留末尾一段，插入点（结尾处的少量元素）一定落在其中
+                keep = max(0, len(buf) - 65536)
+                dst.write(buf[:keep])
+                tail = buf[keep:]
+            positions = [p for p in (tail.find(marker) for marker in _AFTER_DRAWING) if p >= 0]
+            if not positions:
+                raise ValueError("worksheet XML has no closing tag")
+            cut = min(positions)
+            dst.write(tail[:cut] + tag + tail[cut:])
+
+    def _content_types(self, raw: bytes, drawing: str) -> bytes:
+        ET.register_namespace("", NS_CT)
+        root = ET.fromstring(raw)
+        defaults = {el.get("Extension", "").lower() for el in root.findall(f"{{{NS_CT}}}Default")}
+        for name in self.media.values():
+            ext = name.rsplit(".", 1)[-1]
+            if ext not in defaults:
+                ET.SubElement(root, f"{{{NS_CT}}}Default", Extension=ext, ContentType=IMAGE_TYPES[ext])
+                defaults.add(ext)
+        if self.images:
+            ET.SubElement(root, f"{{{NS_CT}}}Override", PartName="/" + drawing, ContentType=CT_DRAWING)
+        return ET.tostring(root, xml_declaration=True, encoding="UTF-8")
+
+    def _write_drawing(self, drawing: str):
+        with self._zip.open(drawing, "w") as dst:
+            dst.write(_DRAWING_HEAD.encode("utf-8"))
+            self._anchors.seek(0)
+            while True:
+                chunk = self._anchors.read(1 << 20)
+                if not chunk:
+                    break
+                dst.write(chunk.encode("utf-8"))
+            dst.write(b"</xdr:wsDr>")
+        rels = [f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<Relationships xmlns="{NS_PKG_REL}">']
+        for rid, name in self.media.items():
+            rels.append(f'<Relationship Id="{rid}" Type="{REL_IMAGE}" Target="../media/{posixpath.basename(name)}"/>')
+        rels.append("</Relationships>")
+        self._zip.writestr(_rels_path(drawing), "".join(rels))
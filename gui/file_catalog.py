@@ -0,0 +1,121 @@
+import os
+from pathlib import Path
+
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QFileSystemWatcher,
+    QModelIndex,
+    QObject,
+    QThread,
+    QTimer,
+    Qt,
+    Signal,
+)
+
+
+EXPORT_SUFFIXES = (".xlsx", ".parquet", ".csv")
+
+
+class _ScanWorker(QObject):
+    """后台线程：os.scandir 一次遍历目录（Windows 上 stat 信息随目录项返回，无额外系统调用）。"""
+
+    scanned = Signal(object)
+
+    def __init__(self, directory: Path):
+        super().__init__()
+        self.directory = directory
+
+    def scan(self):
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    name = entry.name
+                    if not name.endswith(EXPORT_SUFFIXES) or name.endswith(".tmp.xlsx"):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((entry.path, name, st.st_mtime, st.st_size))
+        except OSError:
+            pass
+        entries.sort(key=lambda e: e[2], reverse=True)
+        self.scanned.emit(entries)
+
+
+class DownloadCatalog(QObject):
+    """
+    导出目录的文件目录：QFileSystemWatcher 监听变化，合并短时间内的多次事件后交给后台线程重扫，
+    结果通过 changed(list[(path, name, mtime, size)]) 按修改时间倒序回到 GUI 线程。
+    """
+
+    changed = Signal(object)
+    _scan_requested = Signal()
+
+    def __init__(self, directory, debounce_ms: int = 300, parent=None):
+        super().__init__(parent)
+        self.directory = Path(directory)
+        self.entries = []
+        self._thread = QThread(self)
+        self._worker = _ScanWorker(self.directory)
+        self._worker.moveToThread(self._thread)
+        self._scan_requested.connect(self._worker.scan)
+        self._worker.scanned.connect(self._on_scanned)
+        self._thread.finished.connect(self._worker.deleteLater)
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self._scan_requested.emit)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(lambda _path: self.rescan())
+
+    def start(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if str(self.directory) not in self._watcher.directories():
+            self._watcher.addPath(str(self.directory))
+        self._thread.start()
+        self._scan_requested.emit()
+
+    def rescan(self):
+        """请求重扫（去抖动，不阻塞调用方）。"""
+        self._debounce.start()
+
+    def stop(self):
+        self._debounce.stop()
+        self._thread.quit()
+        self._thread.wait(2000)
+
+    def _on_scanned(self, entries):
+        self.entries = entries
+        self.changed.emit(entries)
+
+
+class DownloadListModel(QAbstractListModel):
+    """QListView 的数据源：只保存元组列表，视图按需取可见行的数据。"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._entries = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not (0 <= index.row() < len(self._entries)):
+            return None
+        path, name, _mtime, _size = self._entries[index.row()]
+        if role == Qt.DisplayRole:
+            return name
+        if role in (Qt.ToolTipRole, Qt.UserRole):
+            return path
+        return None
+
+    def set_entries(self, entries):
+        if entries == self._entries:
+            return
+        self.beginResetModel()
+        self._entries = list(entries)
+        self.endResetModel()
@@ -0,0 +1,104 @@
+import os
+from collections import deque
+
+from loguru import logger
+from PySide6.QtCore import QObject, QTimer
+
+
+LOG_LEVELS = ("DEBUG", "INFO", "SUCCESS", "WARNING", "ERROR")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+def default_log_level() -> str:
+    level = (os.getenv("JD_GUI_LOG_LEVEL") or "INFO").upper()
+    return level if level in LOG_LEVELS else "INFO"
+
+
+class LogRingBuffer:
+    """
+    loguru sink：把格式化后的日志行写入有界环形缓冲。
+    deque 的 append/popleft 在 CPython 下是原子操作，工作线程写、GUI 线程读无需加锁；
+    缓冲满时丢弃最旧的行，只计数不阻塞写入方。
+    """
+
+    def __init__(self, capacity: int = 5000):
+        self._buf = deque(maxlen=capacity)
+        self.dropped = 0
+
+    def write(self, message):
+        if len(self._buf) == self._buf.maxlen:
+            self.dropped += 1
+        self._buf.append(str(message).rstrip("\n"))
+
+    def drain(self, max_items: int):
+        lines = []
+        for _ in range(max_items):
+            try:
+                lines.append(self._buf.popleft())
+            except IndexError:
+                break
+        return lines
+
+
+class ConsoleLogPump(QObject):
+    """按固定间隔把环形缓冲中的日志批量追加到 QPlainTextEdit（每批一次 appendPlainText）。"""
+
+    def __init__(self, text_edit, level: str = None, interval_ms: int = None, max_blocks: int = None,
+                 batch: int = 500, parent=None):
+        super().__init__(parent)
+        interval_ms = interval_ms or _env_int("JD_GUI_LOG_INTERVAL_MS", 100)
+        max_blocks = max_blocks or _env_int("JD_GUI_LOG_MAX_LINES", 5000)
+        self.text_edit = text_edit
+        self.batch = batch
+        self.buffer = LogRingBuffer(capacity=max_blocks)
+        self._reported_dropped = 0
+        self.set_level(level or default_log_level())
+        self.text_edit.setMaximumBlockCount(max_blocks)
+        self._sink_id = logger.add(
+            self.buffer.write,
+            level="DEBUG",
+            format="[{time:HH:mm:ss}] {level}: {message}",
+            filter=lambda record: record["level"].no >= self._min_level_no,
+            colorize=False,
+        )
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.drain)
+        self._timer.start()
+
+    def set_level(self, level: str):
+        level = (level or "INFO").upper()
+        try:
+            self._min_level_no = logger.level(level).no
+        except ValueError:
+            self._min_level_no = logger.level("INFO").no
+
+    def drain(self):
+        lines = self.buffer.drain(self.batch)
+        dropped = self.buffer.dropped - self._reported_dropped
+        if dropped > 0:
+            self._reported_dropped = self.buffer.dropped
+            lines.insert(0, f"[系统] 日志过多，已丢弃 {dropped} 行")
+        if not lines:
+            return
+        bar = self.text_edit.verticalScrollBar()
+        at_bottom = bar.value() >= bar.maximum() - 4
+        self.text_edit.appendPlainText("\n".join(lines))
+        if at_bottom:
+            bar.setValue(bar.maximum())
+
+    def stop(self):
+        self._timer.stop()
+        if self._sink_id is not None:
+            try:
+                logger.remove(self._sink_id)
+            except ValueError:
+                pass
+            self._sink_id = None
+        self.drain()
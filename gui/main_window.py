@@ -4,7 +4,7 @@ import subprocess
 from datetime import datetime
 from pathlib import Path
 
-from PySide6.QtCore import Qt, QObject, Signal, QThread, QUrl
+from PySide6.QtCore import Qt, QUrl
 from PySide6.QtGui import QDesktopServices
 from PySide6.QtWidgets import (
     QWidget,
@@ -14,43 +14,38 @@ from PySide6.QtWidgets import (
     QPushButton,
     QComboBox,
     QPlainTextEdit,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QFormLayout,
     QMessageBox,
     QFrame,
     QStackedWidget,
 )
+from core.cancel import CancelToken
+from gui.file_catalog import DownloadCatalog, DownloadListModel
+from gui.order_table import OrderTableView
+from gui.rollup_panel import RollupPanel
+from gui.search_view import OrderSearchView
 from gui.animations import StartupAnimMixin, SmoothStackedWidget, HoverButton, animate_label_number
-
-
-class TaskWorker(QObject):
-    finished = Signal(object, object)
-
-    def __init__(self, func, *args, **kwargs):
-        super().__init__()
-        self._func = func
-        self._args = args
-        self._kwargs = kwargs
-
-    def run(self):
-        try:
-            result = self._func(*self._args, **self._kwargs)
-            self.finished.emit(result, None)
-        except Exception as exc:
-            self.finished.emit(None, exc)
+from gui.log_sink import ConsoleLogPump, LOG_LEVELS, default_log_level
+from gui.task_runner import TaskRunner
 
 
 class MainWindow(QWidget, StartupAnimMixin):
-    def __init__(self, scraper):
+    def __init__(self, scraper, runner=None):
         super().__init__()
         self.scraper = scraper
+        # 浏览器任务的常驻线程（main.py 在登录窗口阶段已用它预启动浏览器）
+        self.runner = runner or TaskRunner()
+        self.runner.finished.connect(self._on_worker_finished)
+        self.runner.progress.connect(self._on_task_progress)
         self.download_dir = Path(scraper.download_dir)
         self.auth_path = Path(scraper.auth_file)
         self._latest_file = None
         self._busy = False
-        self._worker_thread = None
-        self._worker = None
+        self._task_label = ""
+        self._task_on_done = None
+        self._task_on_progress = None
+        self._cancel_token = None
 
         self.setObjectName("appRoot")
         self.setWindowTitle("JDTools 控制台")
@@ -58,15 +53,30 @@ class MainWindow(QWidget, StartupAnimMixin):
 
         self._build_ui()
         self._apply_styles()
+        self.log_pump = ConsoleLogPump(self.log_box, parent=self)
+        self._sync_log_level()
         self._refresh_auth_status()
-        self.refresh_downloads()
-        self.refresh_downloads()
+        # 下载目录由后台线程扫描并监听变化，切换视图不再同步遍历磁盘
+        self.catalog = DownloadCatalog(self.download_dir, parent=self)
+        self.catalog.changed.connect(self._on_catalog_changed)
+        self.catalog.start()
         self.switch_view("console")
 
     def showEvent(self, event):
         super().showEvent(event)
         self.animate_entry()
 
+    def closeEvent(self, event):
+        if self._cancel_token is not None:
+            self._cancel_token.cancel()
+        self.log_pump.stop()
+        self.catalog.stop()
+        self.order_view.stop()
+        self.search_panel.stop()
+        self.rollup_panel.stop()
+        self.runner.shutdown(self.scraper.close_browser)
+        super().closeEvent(event)
+
     def _build_ui(self):
         root = QHBoxLayout(self)
         root.setContentsMargins(0, 0, 0, 0)
@@ -96,8 +106,12 @@ class MainWindow(QWidget, StartupAnimMixin):
         self.nav_data = HoverButton("数据预览 / Data")
         self.nav_data.setProperty("nav", True)
         self.nav_data.clicked.connect(lambda: self.switch_view("data"))
+        self.nav_search = HoverButton("订单搜索 / Search")
+        self.nav_search.setProperty("nav", True)
+        self.nav_search.clicked.connect(lambda: self.switch_view("search"))
         sidebar_layout.addWidget(self.nav_console)
         sidebar_layout.addWidget(self.nav_data)
+        sidebar_layout.addWidget(self.nav_search)
 
         sidebar_layout.addStretch()
 
@@ -124,11 +138,14 @@ class MainWindow(QWidget, StartupAnimMixin):
 
         self.console_view = QWidget()
         self.data_view = QWidget()
+        self.search_view = QWidget()
         self.stack.addWidget(self.console_view)
         self.stack.addWidget(self.data_view)
+        self.stack.addWidget(self.search_view)
 
         self._build_console_view()
         self._build_data_view()
+        self._build_search_view()
 
     def _build_console_view(self):
         layout = QVBoxLayout(self.console_view)
@@ -145,6 +162,12 @@ class MainWindow(QWidget, StartupAnimMixin):
         status_row.addWidget(count_card)
         layout.addLayout(status_row)
 
+        self.progress_label = QLabel("")
+        self.progress_label.setObjectName("progressLabel")
+        self.progress_label.setWordWrap(True)
+        self.progress_label.setVisible(False)
+        layout.addWidget(self.progress_label)
+
         self.log_box = QPlainTextEdit()
         self.log_box.setObjectName("consoleBox")
         self.log_box.setReadOnly(True)
@@ -152,6 +175,15 @@ class MainWindow(QWidget, StartupAnimMixin):
         layout.addWidget(self.log_box, 1)
 
         action_row = QHBoxLayout()
+        action_row.addWidget(QLabel("日志级别:"))
+
+        self.log_level_combo = QComboBox()
+        self.log_level_combo.setObjectName("logLevelCombo")
+        self.log_level_combo.addItems(LOG_LEVELS)
+        self.log_level_combo.setCurrentText(default_log_level())
+        self.log_level_combo.currentTextChanged.connect(self._sync_log_level)
+        action_row.addWidget(self.log_level_combo)
+
         action_row.addStretch()
         action_row.addWidget(QLabel("时间范围:"))
 
@@ -165,6 +197,12 @@ class MainWindow(QWidget, StartupAnimMixin):
         self.start_btn.clicked.connect(self.start_scrape)
         action_row.addWidget(self.start_btn)
 
+        self.stop_btn = HoverButton("停止")
+        self.stop_btn.setObjectName("stopBtn")
+        self.stop_btn.clicked.connect(self.stop_scrape)
+        self.stop_btn.setVisible(False)
+        action_row.addWidget(self.stop_btn)
+
         layout.addLayout(action_row)
 
     def _build_data_view(self):
@@ -223,7 +261,35 @@ class MainWindow(QWidget, StartupAnimMixin):
         meta_layout.addRow(self._meta_key("保存路径:"), self.latest_path)
 
         data_layout.addLayout(meta_layout)
-        layout.addWidget(data_card)
+
+        rollup_card = QFrame()
+        rollup_card.setObjectName("dataCard")
+        rollup_layout = QVBoxLayout(rollup_card)
+        rollup_layout.setContentsMargins(20, 20, 20, 20)
+        rollup_layout.setSpacing(12)
+
+        rollup_title = QLabel("消费汇总（全部历史采集）")
+        rollup_title.setObjectName("dataTitle")
+        rollup_layout.addWidget(rollup_title)
+
+        self.rollup_panel = RollupPanel()
+        self.rollup_panel.summary_loaded.connect(self._on_rollups_loaded)
+        rollup_layout.addWidget(self.rollup_panel, 1)
+
+        top_row = QHBoxLayout()
+        top_row.setSpacing(20)
+        top_row.addWidget(data_card, 1)
+        top_row.addWidget(rollup_card, 1)
+        layout.addLayout(top_row)
+
+        stats_row = QHBoxLayout()
+        stats_row.setSpacing(20)
+        self.rollup_labels = {}
+        for key, title in (("spend", "累计有效消费"), ("month", "本月消费"), ("orders", "订单数"), ("shops", "店铺数")):
+            card = self._build_card(title, "-", "rollupValue")
+            self.rollup_labels[key] = card.findChild(QLabel, "rollupValue")
+            stats_row.addWidget(card)
+        layout.addLayout(stats_row)
 
         list_card = QFrame()
         list_card.setObjectName("dataCard")
@@ -235,12 +301,59 @@ class MainWindow(QWidget, StartupAnimMixin):
         list_title.setObjectName("dataTitle")
         list_layout.addWidget(list_title)
 
-        self.download_list = QListWidget()
+        # 模型/视图：只为可见行取数据，文件再多也不卡
+        self.download_model = DownloadListModel(self)
+        self.download_list = QListView()
         self.download_list.setObjectName("downloadList")
-        self.download_list.itemDoubleClicked.connect(self.open_selected_file)
+        self.download_list.setModel(self.download_model)
+        self.download_list.setUniformItemSizes(True)
+        self.download_list.setLayoutMode(QListView.Batched)
+        self.download_list.setEditTriggers(QListView.NoEditTriggers)
+        self.download_list.doubleClicked.connect(self.open_selected_file)
+        self.download_list.selectionModel().currentChanged.connect(self._preview_selected_file)
         list_layout.addWidget(self.download_list, 1)
 
-        layout.addWidget(list_card, 1)
+        preview_card = QFrame()
+        preview_card.setObjectName("dataCard")
+        preview_layout = QVBoxLayout(preview_card)
+        preview_layout.setContentsMargins(20, 20, 20, 20)
+        preview_layout.setSpacing(12)
+
+        preview_title = QLabel("数据预览")
+        preview_title.setObjectName("dataTitle")
+        preview_layout.addWidget(preview_title)
+
+        self.order_view = OrderTableView()
+        preview_layout.addWidget(self.order_view, 1)
+
+        bottom_row = QHBoxLayout()
+        bottom_row.setSpacing(20)
+        bottom_row.addWidget(list_card, 1)
+        bottom_row.addWidget(preview_card, 3)
+        layout.addLayout(bottom_row, 1)
+
+    def _build_search_view(self):
+        layout = QVBoxLayout(self.search_view)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(20)
+
+        search_card = QFrame()
+        search_card.setObjectName("dataCard")
+        search_layout = QVBoxLayout(search_card)
+        search_layout.setContentsMargins(20, 20, 20, 20)
+        search_layout.setSpacing(12)
+
+        title = QLabel("订单搜索（全部历史采集）")
+        title.setObjectName("dataTitle")
+        subtitle = QLabel("双击结果打开对应的导出文件")
+        subtitle.setObjectName("dataSubtitle")
+        search_layout.addWidget(title)
+        search_layout.addWidget(subtitle)
+
+        self.search_panel = OrderSearchView(self.download_dir)
+        search_layout.addWidget(self.search_panel, 1)
+
+        layout.addWidget(search_card, 1)
 
     def _build_card(self, title: str, value: str, value_object: str) -> QFrame:
         card = QFrame()
@@ -358,6 +471,16 @@ class MainWindow(QWidget, StartupAnimMixin):
                 font-weight: 700;
                 color: #3fb950;
             }
+            QLabel#rollupValue {
+                font-size: 24px;
+                font-weight: 700;
+                color: #d2a8ff;
+            }
+            QLabel#progressLabel {
+                color: #8b949e;
+                font-size: 13px;
+                padding: 0 4px;
+            }
             QPlainTextEdit#consoleBox {
                 background-color: #0d1117;
                 color: #c9d1d9;
@@ -368,7 +491,7 @@ class MainWindow(QWidget, StartupAnimMixin):
                 font-size: 13px;
                 line-height: 1.4;
             }
-            QComboBox#rangeCombo {
+            QComboBox#rangeCombo, QComboBox#logLevelCombo {
                 background-color: #161b22;
                 color: #c9d1d9;
                 border: 1px solid #30363d;
@@ -376,13 +499,13 @@ class MainWindow(QWidget, StartupAnimMixin):
                 padding: 6px 12px;
                 min-width: 160px;
             }
-            QComboBox#rangeCombo:hover {
+            QComboBox#rangeCombo:hover, QComboBox#logLevelCombo:hover {
                 border-color: #58a6ff;
             }
-            QComboBox#rangeCombo::drop-down {
+            QComboBox#rangeCombo::drop-down, QComboBox#logLevelCombo::drop-down {
                 border: none;
             }
-            QComboBox#rangeCombo QAbstractItemView {
+            QComboBox#rangeCombo QAbstractItemView, QComboBox#logLevelCombo QAbstractItemView {
                 background-color: #161b22;
                 color: #c9d1d9;
                 selection-background-color: #1f6feb;
@@ -406,6 +529,22 @@ class MainWindow(QWidget, StartupAnimMixin):
                 background-color: #21262d;
                 color: #484f58;
             }
+            QPushButton#stopBtn {
+                background-color: #da3633;
+                color: #ffffff;
+                border: none;
+                border-radius: 6px;
+                padding: 8px 24px;
+                font-weight: 600;
+                font-size: 14px;
+            }
+            QPushButton#stopBtn:hover {
+                background-color: #f85149;
+            }
+            QPushButton#stopBtn:disabled {
+                background-color: #21262d;
+                color: #484f58;
+            }
             QLabel#dataTitle {
                 font-size: 18px;
                 font-weight: 600;
@@ -442,24 +581,57 @@ class MainWindow(QWidget, StartupAnimMixin):
                 background-color: #21262d;
                 border-color: #8b949e;
             }
-            QListWidget#downloadList {
+            QListView#downloadList {
                 background-color: #0d1117;
                 color: #c9d1d9;
                 border: 1px solid #30363d;
                 border-radius: 8px;
                 padding: 5px;
             }
-            QListWidget#downloadList::item {
+            QListView#downloadList::item {
                 padding: 8px 12px;
                 border-radius: 6px;
                 margin-bottom: 2px;
             }
-            QListWidget#downloadList::item:selected {
+            QListView#downloadList::item:selected {
                 background-color: #1f6feb;
                 color: #ffffff;
             }
-            QListWidget#downloadList::item:hover:!selected {
+            QListView#downloadList::item:hover:!selected {
+                background-color: #161b22;
+            }
+            QTableView#orderTable {
+                background-color: #0d1117;
+                alternate-background-color: #161b22;
+                color: #c9d1d9;
+                gridline-color: #21262d;
+                border: 1px solid #30363d;
+                border-radius: 8px;
+                selection-background-color: #1f6feb;
+                selection-color: #ffffff;
+            }
+            QTableView#orderTable QHeaderView::section {
+                background-color: #161b22;
+                color: #8b949e;
+                border: none;
+                border-right: 1px solid #30363d;
+                border-bottom: 1px solid #30363d;
+                padding: 6px 8px;
+                font-weight: 500;
+            }
+            QTableView#orderTable QTableCornerButton::section {
                 background-color: #161b22;
+                border: none;
+            }
+            QLineEdit#tableSearch, QDateEdit#tableDate {
+                background-color: #161b22;
+                color: #c9d1d9;
+                border: 1px solid #30363d;
+                border-radius: 6px;
+                padding: 6px 10px;
+            }
+            QLineEdit#tableSearch:focus, QDateEdit#tableDate:focus {
+                border-color: #58a6ff;
             }
             QScrollBar:vertical {
                 border: none;
@@ -489,6 +661,9 @@ class MainWindow(QWidget, StartupAnimMixin):
         for year in range(current_year - 1, 2014, -1):
             self.range_combo.addItem(f"{year}年订单", str(year))
 
+    def _sync_log_level(self, *_):
+        self.log_pump.set_level(self.log_level_combo.currentText())
+
     def _append_log(self, message: str):
         ts = datetime.now().strftime("%H:%M:%S")
         self.log_box.appendPlainText(f"[{ts}] {message}")
@@ -499,30 +674,33 @@ class MainWindow(QWidget, StartupAnimMixin):
         self.account_btn.setEnabled(not busy)
         self.start_btn.setEnabled(not busy)
         self.range_combo.setEnabled(not busy)
+        self.stop_btn.setVisible(busy and self._cancel_token is not None)
+        self.stop_btn.setEnabled(busy)
         self.open_latest_btn.setEnabled(not busy and self._latest_file is not None)
         self.open_downloads_btn.setEnabled(not busy)
 
-    def _start_task(self, label: str, func, on_done):
+    def _start_task(self, label: str, func, on_done, on_progress=None):
         if self._busy:
             return
         self._set_busy(True)
         self._append_log(label)
-        worker = TaskWorker(func)
-        thread = QThread(self)
-        worker.moveToThread(thread)
-        thread.started.connect(worker.run)
-        worker.finished.connect(thread.quit)
-        worker.finished.connect(worker.deleteLater)
-        thread.finished.connect(thread.deleteLater)
-        worker.finished.connect(lambda result, err: self._handle_task_done(label, result, err, on_done))
-        self._worker_thread = thread
-        self._worker = worker
-        thread.start()
+        # 回调经本对象的方法转发（排队到 GUI 线程，且在进度信号之后执行）
+        self._task_label = label
+        self._task_on_done = on_done
+        self._task_on_progress = on_progress
+        self.runner.submit(func, with_progress=on_progress is not None)
+
+    def _on_task_progress(self, snap):
+        if self._task_on_progress is not None:
+            self._task_on_progress(snap)
+
+    def _on_worker_finished(self, result, err):
+        self._handle_task_done(self._task_label, result, err, self._task_on_done)
 
     def _handle_task_done(self, label, result, err, on_done):
+        self._cancel_token = None
+        self._task_on_progress = None
         self._set_busy(False)
-        self._worker = None
-        self._worker_thread = None
         if err is not None:
             self._append_log(f"{label}失败: {err}")
             QMessageBox.warning(self, "任务失败", str(err))
@@ -538,6 +716,38 @@ class MainWindow(QWidget, StartupAnimMixin):
             self.auth_label.setText("登录状态: 未登录")
             self.account_btn.setText("京东账号登录")
 
+    def _format_eta(self, seconds) -> str:
+        if seconds is None:
+            return "估算中"
+        seconds = int(seconds)
+        if seconds >= 3600:
+            return f"{seconds // 3600}小时{seconds % 3600 // 60}分"
+        if seconds >= 60:
+            return f"{seconds // 60}分{seconds % 60}秒"
+        return f"{seconds}秒"
+
+    def _on_scrape_progress(self, snap: dict):
+        stage = snap.get("stage")
+        self.status_label.setText(snap.get("stage_label") or "采集中")
+        self.count_label.setText(str(snap.get("orders") or 0))
+        parts = []
+        if snap.get("page"):
+            total = snap.get("total_pages")
+            parts.append(f"第 {snap['page']}/{total} 页" if total else f"第 {snap['page']} 页")
+        parts.append(f"订单 {snap.get('orders', 0)} / 商品 {snap.get('items', 0)}")
+        if snap.get("detail_pending") or snap.get("detail_done"):
+            parts.append(f"详情 已取 {snap.get('detail_done', 0)} 待取 {snap.get('detail_pending', 0)}")
+        if snap.get("images_total"):
+            parts.append(f"图片 {snap.get('images_done', 0)}/{snap['images_total']}")
+        backoff = {k: v for k, v in (snap.get("backoff") or {}).items() if v > 1.0}
+        if backoff:
+            parts.append("退避 " + " ".join(f"{k}×{v:.1f}" for k, v in backoff.items()))
+        if stage in ("list", "images"):
+            parts.append(f"预计剩余 {self._format_eta(snap.get('eta_s'))}")
+        parts.append(f"已用时 {self._format_eta(snap.get('elapsed_s'))}")
+        self.progress_label.setText(" | ".join(parts))
+        self.progress_label.setVisible(True)
+
     def _format_size(self, size: int) -> str:
         if size is None:
             return "-"
@@ -550,24 +760,19 @@ class MainWindow(QWidget, StartupAnimMixin):
         return f"{value:.1f} {units[idx]}"
 
     def refresh_downloads(self):
-        self.download_dir.mkdir(parents=True, exist_ok=True)
-        files = sorted(self.download_dir.glob("*.xlsx"), key=lambda p: p.stat().st_mtime, reverse=True)
-
-        self.download_list.clear()
-        for f in files:
-            item = QListWidgetItem(f.name)
-            item.setData(Qt.UserRole, str(f))
-            item.setToolTip(str(f))
-            self.download_list.addItem(item)
-
-        if files:
-            latest = files[0]
-            stat = latest.stat()
-            self._latest_file = latest
-            self.latest_name.setText(latest.name)
-            self.latest_time.setText(datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M:%S"))
-            self.latest_size.setText(self._format_size(stat.st_size))
-            self.latest_path.setText(str(latest))
+        self.catalog.rescan()
+
+    def _on_catalog_changed(self, entries):
+        self.download_model.set_entries(entries)
+        # 新导出写入时汇总表已由触发器更新，这里只需重新读取
+        self.rollup_panel.refresh()
+        if entries:
+            path, name, mtime, size = entries[0]
+            self._latest_file = Path(path)
+            self.latest_name.setText(name)
+            self.latest_time.setText(datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M:%S"))
+            self.latest_size.setText(self._format_size(size))
+            self.latest_path.setText(path)
             self.open_latest_btn.setEnabled(not self._busy)
         else:
             self._latest_file = None
@@ -578,15 +783,23 @@ class MainWindow(QWidget, StartupAnimMixin):
             self.open_latest_btn.setEnabled(False)
 
     def switch_view(self, view: str):
+        views = {
+            "console": (self.console_view, self.nav_console),
+            "data": (self.data_view, self.nav_data),
+            "search": (self.search_view, self.nav_search),
+        }
+        view = view if view in views else "console"
+        self.stack.setCurrentWidget(views[view][0])
+        for name, (_widget, btn) in views.items():
+            self._set_nav_active(btn, name == view)
         if view == "data":
-            self.stack.setCurrentWidget(self.data_view)
-            self._set_nav_active(self.nav_data, True)
-            self._set_nav_active(self.nav_console, False)
-            self.refresh_downloads()
-        else:
-            self.stack.setCurrentWidget(self.console_view)
-            self._set_nav_active(self.nav_console, True)
-            self._set_nav_active(self.nav_data, False)
+            self.rollup_panel.refresh()
+            if self.order_view.path is None and self._latest_file is not None:
+                self.order_view.open_file(self._latest_file)
+        elif view == "search":
+            # 增量导入尚未索引的导出文件（例如手动放入下载目录的旧 xlsx）
+            self.search_panel.refresh_index()
+            self.search_panel.search_edit.setFocus()
 
     def _set_nav_active(self, btn: QPushButton, active: bool):
         btn.setProperty("active", active)
@@ -598,11 +811,25 @@ class MainWindow(QWidget, StartupAnimMixin):
             return
         QDesktopServices.openUrl(QUrl.fromLocalFile(str(self._latest_file)))
 
-    def open_selected_file(self, item: QListWidgetItem):
-        path = item.data(Qt.UserRole)
+    def open_selected_file(self, index):
+        path = index.data(Qt.UserRole)
         if path:
             QDesktopServices.openUrl(QUrl.fromLocalFile(path))
 
+    def _on_rollups_loaded(self, summary: dict):
+        totals = summary.get("totals", {})
+        this_month = datetime.now().strftime("%Y-%m")
+        month_spend = next((row["spend"] for row in summary.get("month", []) if row["key"] == this_month), 0)
+        self.rollup_labels["spend"].setText(f"¥{totals.get('spend', 0):,.2f}")
+        self.rollup_labels["month"].setText(f"¥{month_spend:,.2f}")
+        self.rollup_labels["orders"].setText(str(totals.get("orders", 0)))
+        self.rollup_labels["shops"].setText(str(totals.get("shops", 0)))
+
+    def _preview_selected_file(self, index, _previous=None):
+        path = index.data(Qt.UserRole) if index.isValid() else None
+        if path:
+            self.order_view.open_file(path)
+
     def open_downloads_folder(self):
         path = str(self.download_dir)
         try:
@@ -666,6 +893,9 @@ class MainWindow(QWidget, StartupAnimMixin):
                     # self.count_label.setText(str(count))
                     self.status_label.setText("完成")
                     self._append_log("采集完成。")
+                elif status == "cancelled":
+                    self.status_label.setText("已取消")
+                    self._append_log(f"采集已取消，已保存 {result.get('count', 0)} 行: {result.get('file')}")
                 elif status == "empty":
                     self.status_label.setText("无数据")
                     self._append_log("未找到订单数据。")
@@ -678,5 +908,22 @@ class MainWindow(QWidget, StartupAnimMixin):
 
             self.refresh_downloads()
 
+        if self._busy:
+            return
+        token = CancelToken()
+        self._cancel_token = token
         self.status_label.setText("采集中")
-        self._start_task(f"开始采集 (Filter={filter_type})...", lambda: self.scraper.scrape_orders(filter_type), _done)
+        self._start_task(
+            f"开始采集 (Filter={filter_type})...",
+            lambda progress_cb: self.scraper.scrape_orders(filter_type, progress_cb=progress_cb, cancel_token=token),
+            _done,
+            on_progress=self._on_scrape_progress,
+        )
+
+    def stop_scrape(self):
+        if self._cancel_token is None or self._cancel_token.cancelled:
+            return
+        self._cancel_token.cancel()
+        self.stop_btn.setEnabled(False)
+        self.status_label.setText("正在停止")
+        self._append_log("已请求停止，正在关闭浏览器并保存已采集的数据...")
@@ -0,0 +1,376 @@
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from PySide6.QtCore import (
+    QAbstractTableModel,
+    QDate,
+    QModelIndex,
+    QObject,
+    QThread,
+    QTimer,
+    Qt,
+    Signal,
+)
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QComboBox,
+    QDateEdit,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QLineEdit,
+    QTableView,
+    QVBoxLayout,
+    QWidget,
+)
+
+from core.columnar import open_columnar, prune_cache
+
+
+ALL_LABEL = "全部"
+# 可下拉筛选的列
+FACET_COLUMNS = ("店铺", "状态")
+SEARCH_COLUMNS = ("订单", "商品名称", "型号", "姓名", "地址")
+NUMERIC_COLUMNS = ("下单金额", "数量")
+
+
+class _QueryWorker(QObject):
+    """
+    后台线程：打开（必要时构建）列式副本，并用 pandas/NumPy 向量化计算筛选与排序后的行号。
+    只把参与计算的列转成 pandas 并缓存，其余列始终留在内存映射里。
+    """
+
+    loaded = Signal(int, object, object)
+    queried = Signal(int, object)
+    failed = Signal(int, str)
+
+    def __init__(self):
+        super().__init__()
+        self._table = None
+        self._series = {}
+
+    def load(self, token: int, path: str):
+        try:
+            prune_cache(Path(path).parent)
+            table = open_columnar(path)
+        except Exception as e:
+            self._table = None
+            self.failed.emit(token, str(e))
+            return
+        self._table = table
+        self._series = {}
+        facets = {}
+        for col in FACET_COLUMNS:
+            if col in table.column_names:
+                values = self._column(col).dropna().unique().tolist()
+                facets[col] = sorted(v for v in values if v != "")
+        self.loaded.emit(token, table, facets)
+
+    def _column(self, name: str) -> pd.Series:
+        series = self._series.get(name)
+        if series is None:
+            series = self._table.column(name).to_pandas()
+            self._series[name] = series
+        return series
+
+    def query(self, token: int, spec: dict):
+        table = self._table
+        if table is None:
+            return
+        try:
+            mask = np.ones(table.num_rows, dtype=bool)
+            for col in FACET_COLUMNS:
+                value = spec.get(col)
+                if value and col in table.column_names:
+                    mask &= (self._column(col) == value).to_numpy(dtype=bool, na_value=False)
+            if "日期" in table.column_names and (spec.get("date_from") or spec.get("date_to")):
+                dates = self._column("日期")
+                if spec.get("date_from"):
+                    mask &= (dates >= pd.Timestamp(spec["date_from"])).to_numpy(dtype=bool, na_value=False)
+                if spec.get("date_to"):
+                    # 截止日期包含当天
+                    end = pd.Timestamp(spec["date_to"]) + pd.Timedelta(days=1)
+                    mask &= (dates < end).to_numpy(dtype=bool, na_value=False)
+            text = (spec.get("text") or "").strip()
+            if text:
+                hit = np.zeros(table.num_rows, dtype=bool)
+                for col in SEARCH_COLUMNS:
+                    if col in table.column_names:
+                        contains = self._column(col).astype("string").str.contains(text, case=False, regex=False)
+                        hit |= contains.to_numpy(dtype=bool, na_value=False)
+                mask &= hit
+            rows = np.flatnonzero(mask)
+            sort_col = spec.get("sort_col")
+            if sort_col and sort_col in table.column_names:
+                keys = self._column(sort_col).iloc[rows].reset_index(drop=True)
+                order = keys.sort_values(ascending=spec.get("ascending", True), kind="stable",
+                                         na_position="last").index.to_numpy()
+                rows = rows[order]
+        except Exception as e:
+            self.failed.emit(token, str(e))
+            return
+        self.queried.emit(token, rows)
+
+
+def _format_cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return "" if value != value else f"{value:.2f}"
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return str(value)
+
+
+class OrderTableModel(QAbstractTableModel):
+    """
+    惰性表格模型：数据留在 Arrow 表（内存映射）里，视图请求某行时才按块（BLOCK 行）取出并格式化，
+    最近使用的块放在 LRU 中；排序/筛选只替换行号数组，不复制数据。
+    """
+
+    BLOCK = 256
+    MAX_BLOCKS = 64
+
+    sort_requested = Signal(str, bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._table = None
+        self._columns = []
+        self._rows = np.arange(0)
+        self._blocks = OrderedDict()
+
+    def set_table(self, table):
+        self.beginResetModel()
+        self._table = table
+        self._columns = list(table.column_names) if table is not None else []
+        self._rows = np.arange(table.num_rows if table is not None else 0)
+        self._blocks.clear()
+        self.endResetModel()
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = rows
+        self._blocks.clear()
+        self.endResetModel()
+
+    @property
+    def total_rows(self) -> int:
+        return self._table.num_rows if self._table is not None else 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self._columns[section] if section < len(self._columns) else None
+        return str(section + 1)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or self._table is None:
+            return None
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            row = index.row()
+            block = self._block(row // self.BLOCK)
+            return block[index.column()][row % self.BLOCK]
+        if role == Qt.TextAlignmentRole and self._columns[index.column()] in NUMERIC_COLUMNS:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def _block(self, number: int):
+        block = self._blocks.get(number)
+        if block is not None:
+            self._blocks.move_to_end(number)
+            return block
+        start = number * self.BLOCK
+        chunk = self._table.take(self._rows[start:start + self.BLOCK])
+        block = [[_format_cell(v) for v in chunk.column(i).to_pylist()] for i in range(chunk.num_columns)]
+        self._blocks[number] = block
+        if len(self._blocks) > self.MAX_BLOCKS:
+            self._blocks.popitem(last=False)
+        return block
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        # 排序放到后台线程计算，结果通过 set_rows 回来
+        if 0 <= column < len(self._columns):
+            self.sort_requested.emit(self._columns[column], order == Qt.AscendingOrder)
+
+
+class OrderTableView(QWidget):
+    """数据视图中的订单表格预览：筛选栏 + 惰性 QTableView + 行数统计。"""
+
+    _load_requested = Signal(int, str)
+    _query_requested = Signal(int, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.path = None
+        self._token = 0
+        self._sort = (None, True)
+        self._thread = QThread(self)
+        self._worker = _QueryWorker()
+        self._worker.moveToThread(self._thread)
+        self._load_requested.connect(self._worker.load)
+        self._query_requested.connect(self._worker.query)
+        self._worker.loaded.connect(self._on_loaded)
+        self._worker.queried.connect(self._on_queried)
+        self._worker.failed.connect(self._on_failed)
+        self._thread.finished.connect(self._worker.deleteLater)
+        self._thread.start()
+
+        self._query_timer = QTimer(self)
+        self._query_timer.setSingleShot(True)
+        self._query_timer.setInterval(250)
+        self._query_timer.timeout.connect(self._run_query)
+
+        self._build_ui()
+
+    def _build_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(10)
+
+        filter_row = QHBoxLayout()
+        self.facet_combos = {}
+        for col in FACET_COLUMNS:
+            combo = QComboBox()
+            combo.setObjectName("rangeCombo")
+            combo.addItem(f"{col}: {ALL_LABEL}", "")
+            combo.currentIndexChanged.connect(self._schedule_query)
+            self.facet_combos[col] = combo
+            filter_row.addWidget(combo)
+
+        self.date_from = self._date_edit("起始日期")
+        self.date_to = self._date_edit("截止日期")
+        filter_row.addWidget(self.date_from)
+        filter_row.addWidget(self.date_to)
+
+        self.search_edit = QLineEdit()
+        self.search_edit.setObjectName("tableSearch")
+        self.search_edit.setPlaceholderText("搜索订单号 / 商品 / 型号 / 收货人")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(self._schedule_query)
+        filter_row.addWidget(self.search_edit, 1)
+        layout.addLayout(filter_row)
+
+        self.model = OrderTableModel(self)
+        self.model.sort_requested.connect(self._on_sort_requested)
+        self.table = QTableView()
+        self.table.setObjectName("orderTable")
+        self.table.setModel(self.model)
+        self.table.setSortingEnabled(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setWordWrap(False)
+        self.table.setAlternatingRowColors(True)
+        self.table.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        # 固定行高、不按内容计算列宽：视图只渲染可见区域，行数再多也不需要遍历全部数据
+        vheader = self.table.verticalHeader()
+        vheader.setSectionResizeMode(QHeaderView.Fixed)
+        vheader.setDefaultSectionSize(28)
+        hheader = self.table.horizontalHeader()
+        hheader.setSectionResizeMode(QHeaderView.Interactive)
+        hheader.setDefaultSectionSize(140)
+        hheader.setSortIndicatorShown(True)
+        layout.addWidget(self.table, 1)
+
+        self.status_label = QLabel("选择左侧文件以预览")
+        self.status_label.setObjectName("dataSubtitle")
+        layout.addWidget(self.status_label)
+
+    def _date_edit(self, placeholder: str) -> QDateEdit:
+        edit = QDateEdit()
+        edit.setObjectName("tableDate")
+        edit.setCalendarPopup(True)
+        edit.setDisplayFormat("yyyy-MM-dd")
+        # 最小日期显示为占位文字，表示不限
+        edit.setMinimumDate(QDate(2000, 1, 1))
+        edit.setSpecialValueText(placeholder)
+        edit.setDate(edit.minimumDate())
+        edit.dateChanged.connect(self._schedule_query)
+        return edit
+
+    def open_file(self, path):
+        path = str(path)
+        if path == self.path:
+            return
+        self.path = path
+        self._token += 1
+        self.status_label.setText(f"正在加载 {Path(path).name} …")
+        self._load_requested.emit(self._token, path)
+
+    def reload(self):
+        path, self.path = self.path, None
+        if path:
+            self.open_file(path)
+
+    def stop(self):
+        self._query_timer.stop()
+        self._thread.quit()
+        self._thread.wait(2000)
+
+    def _schedule_query(self, *_args):
+        self._query_timer.start()
+
+    def _on_sort_requested(self, column: str, ascending: bool):
+        self._sort = (column, ascending)
+        self._run_query()
+
+    def _spec(self) -> dict:
+        spec = {col: combo.currentData() for col, combo in self.facet_combos.items()}
+        for key, edit in (("date_from", self.date_from), ("date_to", self.date_to)):
+            spec[key] = None if edit.date() == edit.minimumDate() else edit.date().toString("yyyy-MM-dd")
+        spec["text"] = self.search_edit.text()
+        spec["sort_col"], spec["ascending"] = self._sort
+        return spec
+
+    def _run_query(self):
+        if self.model.total_rows:
+            self.status_label.setText("筛选中…")
+            self._query_requested.emit(self._token, self._spec())
+
+    def _on_loaded(self, token: int, table, facets: dict):
+        if token != self._token:
+            return
+        self._sort = (None, True)
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        for col, combo in self.facet_combos.items():
+            current = combo.currentData()
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItem(f"{col}: {ALL_LABEL}", "")
+            for value in facets.get(col, []):
+                combo.addItem(value, value)
+            idx = combo.findData(current)
+            combo.setCurrentIndex(max(idx, 0))
+            combo.blockSignals(False)
+        self.model.set_table(table)
+        self._update_status()
+        if any(v for k, v in self._spec().items() if k not in ("sort_col", "ascending")):
+            self._run_query()
+
+    def _on_queried(self, token: int, rows):
+        if token != self._token:
+            return
+        self.model.set_rows(rows)
+        self._update_status()
+
+    def _on_failed(self, token: int, message: str):
+        if token != self._token:
+            return
+        self.status_label.setText(f"预览失败: {message}")
+
+    def _update_status(self):
+        total = self.model.total_rows
+        shown = self.model.rowCount()
+        name = Path(self.path).name if self.path else "-"
+        text = f"{name}  ·  共 {total} 行" if shown == total else f"{name}  ·  筛选后 {shown} / {total} 行"
+        self.status_label.setText(text)
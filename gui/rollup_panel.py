@@ -0,0 +1,133 @@
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QObject, QThread, Qt, Signal
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QComboBox,
+    QHeaderView,
+    QTableView,
+    QVBoxLayout,
+    QWidget,
+)
+
+from core.search_index import OrderIndex
+
+
+# 维度 -> (下拉显示名, [(字段, 表头)])
+DIMENSIONS = {
+    "month": ("按月", [("key", "月份"), ("orders", "订单"), ("items", "件数"), ("spend", "有效消费"), ("cancelled", "取消单")]),
+    "shop": ("按店铺", [("key", "店铺"), ("orders", "订单"), ("items", "件数"), ("spend", "有效消费"), ("cancelled", "取消单")]),
+    "status": ("按状态", [("key", "状态"), ("orders", "订单"), ("items", "件数"), ("amount", "金额")]),
+    "sku": ("按商品", [("name", "商品名称"), ("key", "型号"), ("quantity", "数量"), ("amount", "金额")]),
+}
+MONEY_FIELDS = ("spend", "amount")
+
+
+class _RollupWorker(QObject):
+    loaded = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.index = OrderIndex()
+
+    def load(self):
+        try:
+            self.loaded.emit(self.index.rollups(limit=24))
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class _RollupModel(QAbstractTableModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._fields = []
+        self._rows = []
+
+    def set_rows(self, fields, rows):
+        self.beginResetModel()
+        self._fields = fields
+        self._rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._fields)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self._fields[section][1]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        field = self._fields[index.column()][0]
+        value = self._rows[index.row()].get(field)
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            if field in MONEY_FIELDS:
+                return f"{value or 0:,.2f}"
+            return "" if value is None else str(value)
+        if role == Qt.TextAlignmentRole and field != "key" and field != "name":
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+
+class RollupPanel(QWidget):
+    """消费汇总明细表（按月/店铺/状态/商品）；读取在后台线程进行，summary_loaded 供外部更新卡片。"""
+
+    summary_loaded = Signal(object)
+    _load_requested = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.summary = None
+        self._thread = QThread(self)
+        self._worker = _RollupWorker()
+        self._worker.moveToThread(self._thread)
+        self._load_requested.connect(self._worker.load)
+        self._worker.loaded.connect(self._on_loaded)
+        self._thread.finished.connect(self._worker.deleteLater)
+        self._thread.start()
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(10)
+
+        self.dimension_combo = QComboBox()
+        self.dimension_combo.setObjectName("rangeCombo")
+        for key, (label, _fields) in DIMENSIONS.items():
+            self.dimension_combo.addItem(label, key)
+        self.dimension_combo.currentIndexChanged.connect(self._show_dimension)
+        layout.addWidget(self.dimension_combo, 0, Qt.AlignLeft)
+
+        self.model = _RollupModel(self)
+        self.table = QTableView()
+        self.table.setObjectName("orderTable")
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setAlternatingRowColors(True)
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(26)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.table, 1)
+
+    def refresh(self):
+        self._load_requested.emit()
+
+    def stop(self):
+        self._thread.quit()
+        self._thread.wait(2000)
+
+    def _on_loaded(self, summary: dict):
+        self.summary = summary
+        self._show_dimension()
+        self.summary_loaded.emit(summary)
+
+    def _show_dimension(self, *_args):
+        if not self.summary:
+            return
+        key = self.dimension_combo.currentData()
+        self.model.set_rows(DIMENSIONS[key][1], self.summary.get(key, []))
@@ -0,0 +1,198 @@
+from pathlib import Path
+
+from PySide6.QtCore import (
+    QAbstractTableModel,
+    QModelIndex,
+    QObject,
+    QThread,
+    QTimer,
+    Qt,
+    QUrl,
+    Signal,
+)
+from PySide6.QtGui import QDesktopServices
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QHeaderView,
+    QLabel,
+    QLineEdit,
+    QTableView,
+    QVBoxLayout,
+    QWidget,
+)
+
+from core.search_index import RESULT_FIELDS, OrderIndex, search_orders
+
+
+class _SearchWorker(QObject):
+    """后台线程：先增量导入导出目录中尚未索引的文件，再执行查询（SQLite 连接只在本线程内使用）。"""
+
+    imported = Signal(object)
+    searched = Signal(int, object)
+    failed = Signal(int, str)
+
+    def __init__(self):
+        super().__init__()
+        self.index = OrderIndex()
+
+    def import_exports(self, directory: str):
+        try:
+            summary = self.index.import_exports(directory)
+            summary.update(self.index.stats())
+        except Exception as e:
+            summary = {"error": str(e)}
+        self.imported.emit(summary)
+
+    def search(self, token: int, query: str):
+        try:
+            result = search_orders(query, limit=500, db_path=self.index.db_path)
+        except Exception as e:
+            self.failed.emit(token, str(e))
+            return
+        self.searched.emit(token, result)
+
+
+class SearchResultModel(QAbstractTableModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._headers = [label for _, label in RESULT_FIELDS]
+        self._rows = []
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = list(rows)
+        self.endResetModel()
+
+    def row(self, number: int) -> dict:
+        return self._rows[number]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        return self._headers[section] if orientation == Qt.Horizontal else str(section + 1)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self._rows[index.row()].get(self._headers[index.column()])
+        if role == Qt.DisplayRole:
+            if value is None:
+                return ""
+            if self._headers[index.column()] == "来源":
+                return Path(value).name
+            if isinstance(value, float):
+                return f"{value:.2f}"
+            return str(value)
+        if role == Qt.ToolTipRole:
+            return "" if value is None else str(value)
+        return None
+
+
+class OrderSearchView(QWidget):
+    """全部历史订单的全文搜索：输入即查（去抖动），双击结果打开来源导出文件。"""
+
+    _import_requested = Signal(str)
+    _search_requested = Signal(int, str)
+
+    def __init__(self, download_dir, parent=None):
+        super().__init__(parent)
+        self.download_dir = str(download_dir)
+        self._token = 0
+        self._thread = QThread(self)
+        self._worker = _SearchWorker()
+        self._worker.moveToThread(self._thread)
+        self._import_requested.connect(self._worker.import_exports)
+        self._search_requested.connect(self._worker.search)
+        self._worker.imported.connect(self._on_imported)
+        self._worker.searched.connect(self._on_searched)
+        self._worker.failed.connect(self._on_failed)
+        self._thread.finished.connect(self._worker.deleteLater)
+        self._thread.start()
+
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(200)
+        self._search_timer.timeout.connect(self._run_search)
+
+        self._build_ui()
+
+    def _build_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(12)
+
+        self.search_edit = QLineEdit()
+        self.search_edit.setObjectName("tableSearch")
+        self.search_edit.setPlaceholderText("搜索全部订单：商品名称 / 店铺 / 收货人 / 地址 / 订单号（空格分隔多个词）")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(lambda _text: self._search_timer.start())
+        self.search_edit.returnPressed.connect(self._run_search)
+        layout.addWidget(self.search_edit)
+
+        self.model = SearchResultModel(self)
+        self.table = QTableView()
+        self.table.setObjectName("orderTable")
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setWordWrap(False)
+        self.table.setAlternatingRowColors(True)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(28)
+        self.table.horizontalHeader().setDefaultSectionSize(140)
+        self.table.doubleClicked.connect(self._open_source)
+        layout.addWidget(self.table, 1)
+
+        self.status_label = QLabel("索引准备中…")
+        self.status_label.setObjectName("dataSubtitle")
+        layout.addWidget(self.status_label)
+
+    def refresh_index(self):
+        """增量导入导出目录（已导入且未修改的文件直接跳过）。"""
+        self._import_requested.emit(self.download_dir)
+
+    def stop(self):
+        self._search_timer.stop()
+        self._thread.quit()
+        self._thread.wait(2000)
+
+    def _run_search(self):
+        self._search_timer.stop()
+        self._token += 1
+        query = self.search_edit.text().strip()
+        if not query:
+            self.model.set_rows([])
+            return
+        self._search_requested.emit(self._token, query)
+
+    def _on_imported(self, summary: dict):
+        if summary.get("error"):
+            self.status_label.setText(f"索引失败: {summary['error']}")
+            return
+        text = f"已索引 {summary.get('orders', 0)} 个订单 / {summary.get('items', 0)} 件商品"
+        if summary.get("files"):
+            text += f"（本次导入 {summary['files']} 个文件）"
+        self.status_label.setText(text)
+        if self.search_edit.text().strip():
+            self._run_search()
+
+    def _on_searched(self, token: int, result: dict):
+        if token != self._token:
+            return
+        self.model.set_rows(result["results"])
+        self.status_label.setText(f"{result['count']} 条结果 · {result['elapsed_ms']} ms")
+
+    def _on_failed(self, token: int, message: str):
+        if token == self._token:
+            self.status_label.setText(f"搜索失败: {message}")
+
+    def _open_source(self, index):
+        source = self.model.row(index.row()).get("来源")
+        if source and Path(source).exists():
+            QDesktopServices.openUrl(QUrl.fromLocalFile(source))
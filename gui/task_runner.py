@@ -0,0 +1,61 @@
+import queue
+import threading
+
+from loguru import logger
+from PySide6.QtCore import QObject, Signal
+
+
+class TaskRunner(QObject):
+    """
+    浏览器相关任务（预启动、登录、采集）串行运行在同一个常驻线程里。
+    Playwright 同步 API 的对象绑定创建它的线程：登录窗口阶段预启动的驱动/浏览器，
+    以及 JD_KEEP_BROWSER 保留的会话，只有在同一线程里才能被之后的任务复用。
+    这里用 Python 线程 + 队列而不是 QThread 槽：槽调用之间 Python 线程状态不保留，
+    跨调用存活的 greenlet（Playwright 驱动）会在下一次调用时崩溃。
+    """
+
+    finished = Signal(object, object)
+    progress = Signal(object)
+
+    def __init__(self):
+        super().__init__()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="browser-tasks", daemon=True)
+        self._thread.start()
+
+    def submit(self, func, with_progress: bool = False):
+        """排队运行 func；完成后发出 finished(result, err)。with_progress 时 func 接收 progress_cb。"""
+        self._queue.put((self._run, func, with_progress))
+
+    def warmup(self, func):
+        """排队运行不需要结果的后台准备（如预启动浏览器），不发出 finished，异常只记日志。"""
+        self._queue.put((self._warmup, func))
+
+    def shutdown(self, cleanup=None, timeout_s: float = 5.0):
+        """排在已有任务之后、在任务线程里执行收尾（如关闭浏览器）并退出线程，最多等待 timeout_s。"""
+        if cleanup is not None:
+            self.warmup(cleanup)
+        self._queue.put(None)
+        self._thread.join(timeout_s)
+
+    def _loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            handler, *args = item
+            handler(*args)
+
+    def _run(self, func, with_progress: bool):
+        try:
+            # 跨线程发射信号，槽函数在 GUI 线程执行
+            result = func(progress_cb=self.progress.emit) if with_progress else func()
+            self.finished.emit(result, None)
+        except Exception as exc:
+            self.finished.emit(None, exc)
+
+    def _warmup(self, func):
+        try:
+            func()
+        except Exception as exc:
+            logger.warning(f"后台任务失败: {exc}")
@@ -1,21 +1,32 @@
 ﻿import sys
+import threading
 from PySide6.QtWidgets import QApplication
+from core.logs import setup_logging
 from core.scraper import JDScraper
 from gui.login import LoginWindow
 from gui.main_window import MainWindow
+from gui.task_runner import TaskRunner
 
 
 def main():
     try:
+        setup_logging("gui")
         app = QApplication(sys.argv)
 
+        # 登录窗口显示期间在浏览器任务线程里预启动 Playwright（JD_PRELAUNCH），首次登录/采集不再冷启动
+        scraper = JDScraper(headless=False)
+        runner = TaskRunner()
+        runner.warmup(scraper.prelaunch)
+        # profile 维护（清理超预算缓存、回收旧的轮换 profile）在独立线程里进行，不排在浏览器任务之前
+        threading.Thread(target=scraper.startup_maintenance, name="profile-maintenance", daemon=True).start()
+
         login_window = LoginWindow()
         if login_window.exec():
-            scraper = JDScraper(headless=False)
-            window = MainWindow(scraper)
+            window = MainWindow(scraper, runner=runner)
             window.show()
             sys.exit(app.exec())
         else:
+            runner.shutdown(scraper.close_browser)
             sys.exit(0)
     except Exception as e:
         import traceback
@@ -1,3 +1,3 @@
 #!/bin/bash
 echo "Starting JD Order Scraper (Desktop App)..."
-python3 desktop_main.py
+python3 main.py
@@ -4,6 +4,10 @@ async function startLogin() {
         const res = await fetch('/api/login', { method: 'POST' });
         const data = await res.json();
         log("API响应: " + data.message);
+        if (data.job_id) {
+            const job = await pollJob(data.job_id);
+            log(job.result && job.result.status === 'success' ? "登录成功。" : "登录失败或超时。");
+        }
     } catch (e) {
         log("请求失败: " + e);
     }
@@ -11,13 +15,18 @@ async function startLogin() {
 
 async function startScrape() {
     const range = document.getElementById('dateRange').value;
-    log(`开始采集 (Filter=${range})... 此过程可能需要几分钟，请保持后端运行。`);
+    log(`开始采集 (Filter=${range})... 任务已提交到后台队列，可关闭页面稍后查看。`);
 
-    document.getElementById('statusText').innerText = "运行中...";
+    document.getElementById('statusText').innerText = "排队中...";
 
     try {
         const res = await fetch('/api/scrape?filter_type=' + range, { method: 'POST' });
-        const data = await res.json();
+        const queued = await res.json();
+        if (queued.position > 1) {
+            log(`前方还有 ${queued.position - 1} 个任务。`);
+        }
+        const job = await pollJob(queued.job_id);
+        const data = job.result || {};
 
         if (data.status === 'success') {
             const countStr = data.order_count ? `${data.order_count} 个订单 (${data.count} 商品)` : `${data.count} 个订单`;
@@ -34,6 +43,24 @@ async function startScrape() {
     }
 }
 
+// 轮询任务状态，逐条输出后台日志，直到任务结束
+async function pollJob(jobId, intervalMs = 2000) {
+    let offset = 0;
+    while (true) {
+        const res = await fetch(`/api/jobs/${jobId}?log_offset=${offset}`);
+        const job = await res.json();
+        (job.logs || []).forEach(line => log(line));
+        offset = job.log_total || offset;
+        if (job.status === 'running') {
+            document.getElementById('statusText').innerText = "运行中...";
+        }
+        if (job.status !== 'queued' && job.status !== 'running') {
+            return job;
+        }
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+}
+
 function log(msg) {
     const box = document.getElementById('consoleBox');
     const line = document.createElement('div');
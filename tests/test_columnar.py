@@ -0,0 +1,86 @@
+import io
+import zipfile
+
+import pandas as pd
+import pytest
+
+from core.columnar import iter_xlsx_chunks, load_export
+
+pytest.importorskip("PIL")
+
+
+def _png(color):
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", (16, 16), color).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _record(date, order_id, name, amount, split=False, image=""):
+    return {
+        "日期": date, "订单": order_id, "商品名称": name, "型号": "", "数量": 1, "下单金额": amount,
+        "姓名": "张三", "地址": "北京", "店铺": "京东自营", "状态": "已完成", "拆单标记": split, "商品图片": image,
+    }
+
+
+@pytest.fixture
+def exported(tmp_path, monkeypatch):
+    monkeypatch.setenv("JD_PROFILE_DIR", str(tmp_path / "profile"))
+    monkeypatch.setenv("JD_DOWNLOAD_DIR", str(tmp_path / "out"))
+    for name, value in (("JD_EXPORT_FORMAT", "xlsx"), ("JD_EMBED_IMAGES", "1"), ("JD_RUN_REPORT", "0"),
+                        ("JD_SEARCH_INDEX", "0"), ("JD_COLUMNAR_CACHE", "0")):
+        monkeypatch.setenv(name, value)
+    from core.rows import OrderRows
+    from core.scraper import JDScraper
+
+    images = {"https://img/red.png": _png("red"), "https://img/blue.png": _png("blue")}
+    orders = OrderRows.from_records([
+        # 未拆单的一单多商品：导出时金额只留首行并合并单元格
+        _record("2024-03-01 10:00:00", "1001", "键盘", 299.0, image="https://img/red.png"),
+        _record("2024-03-01 10:00:00", "1001", "鼠标", 299.0, image="https://img/blue.png"),
+        _record("2024-03-01 10:00:00", "1001", "鼠标垫", 299.0, image="https://img/red.png"),
+        # 拆单：各行保留各自金额
+        _record("2024-02-01 09:00:00", "1002", "耳机", 88.0, split=True, image="https://img/blue.png"),
+        _record("2024-02-01 09:00:00", "1002", "耳机套", 12.5, split=True),
+        _record("2024-01-01 08:00:00", "1003", "赠品", "暂无"),
+    ])
+    result = JDScraper(headless=True)._export_orders(orders, image_source=images.get)
+    assert result["status"] == "success"
+    return result["file"]
+
+
+def test_streamed_export_reimports_rows_and_amounts(exported):
+    with zipfile.ZipFile(exported) as z:
+        assert any(n.startswith("xl/media/") for n in z.namelist())
+    df = load_export(exported)
+    assert len(df) == 6
+    assert df["订单"].tolist() == ["1001", "1001", "1001", "1002", "1002", "1003"]
+    amounts = df["下单金额"].tolist()
+    # 合并单元格在只读模式下只有首格有值
+    assert amounts[0] == 299.0 and amounts[1] is None and amounts[2] is None
+    assert amounts[3:] == [88.0, 12.5, "暂无"]
+    assert pd.to_numeric(df["下单金额"], errors="coerce").sum() == pytest.approx(399.5)
+
+
+def test_chunks_pad_short_rows_and_name_blank_headers(tmp_path):
+    from openpyxl import Workbook
+
+    path = tmp_path / "jd_orders_short.xlsx"
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["订单", "商品名称", "下单金额"])
+    ws.append([1001, "键盘"])
+    ws.append([])
+    ws.append(["1002", "耳机", 12.5, "多余的列"])
+    ws.append(["1003", "鼠标", 3])
+    wb.save(path)
+    chunks = list(iter_xlsx_chunks(path, chunk_rows=2))
+    assert [len(c) for c in chunks] == [2, 1]
+    df = pd.concat(chunks, ignore_index=True)
+    # 表头之外的单元格归入按位置命名的列，短行补 None，空行跳过
+    assert list(df.columns) == ["订单", "商品名称", "下单金额", "col3"]
+    assert df["订单"].tolist() == ["1001", "1002", "1003"]
+    assert df["下单金额"].isna().tolist() == [True, False, False]
+    assert df["下单金额"].tolist()[1:] == [12.5, 3]
+    assert df["col3"].tolist()[1] == "多余的列" and df["col3"].isna().tolist() == [True, False, True]
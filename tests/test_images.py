@@ -0,0 +1,88 @@
+import io
+import threading
+import time
+
+import pytest
+
+from core.images import SingleFlight, dhash_close, image_dhash, image_fetch_url, image_key
+
+
+def test_jd_size_mirror_and_format_variants_share_a_key():
+    key = "360buyimg.com/jfs/t1/123/45/6789/abc.jpg"
+    variants = [
+        "//img10.360buyimg.com/n1/s110x110_jfs/t1/123/45/6789/abc.jpg",
+        "https://img30.360buyimg.com/n5/jfs/t1/123/45/6789/abc.jpg!q70.dpg.webp",
+        "http://IMG14.360buyimg.com/N7/s54x54_jfs/t1/123/45/6789/abc.jpg.avif",
+        "https://img11.360buyimg.com/jfs/t1/123/45/6789/abc.jpg#frag",
+    ]
+    assert {image_key(url) for url in variants} == {key}
+
+
+def test_different_jd_images_keep_distinct_keys():
+    a = image_key("//img10.360buyimg.com/n1/jfs/t1/1/a.jpg")
+    b = image_key("//img10.360buyimg.com/n1/jfs/t1/1/b.jpg")
+    c = image_key("//img10.360buyimg.com/n1/jfs/t1/1/a.png")
+    assert len({a, b, c}) == 3
+
+
+def test_other_hosts_keep_query_and_drop_scheme():
+    assert image_key("https://Example.com/p.png?w=100#x") == "example.com/p.png?w=100"
+    assert image_key("http://example.com/p.png?w=100") == "example.com/p.png?w=100"
+    assert image_key("") == image_key(None) == ""
+    assert image_fetch_url(" //img10.360buyimg.com/a.jpg ") == "https://img10.360buyimg.com/a.jpg"
+
+
+def test_single_flight_shares_one_call():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return b"data"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", fetch)))
+    leader.start()
+    started.wait(1)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("k", fetch))) for _ in range(4)]
+    for t in followers:
+        t.start()
+    for t in [leader] + followers:
+        t.join(2)
+    assert calls == [1]
+    assert results == [b"data"] * 5
+    # 结束后不缓存，下一次重新执行
+    assert flight.do("k", fetch) == b"data" and len(calls) == 2
+
+
+def test_single_flight_propagates_errors():
+    flight = SingleFlight()
+
+    def boom():
+        raise ValueError("bad")
+
+    with pytest.raises(ValueError):
+        flight.do("k", boom)
+    assert flight.do("k", lambda: 1) == 1
+
+
+def _png(size, fill):
+    from PIL import Image, ImageDraw
+
+    img = Image.new("RGB", (size, size), "white")
+    ImageDraw.Draw(img).rectangle([0, 0, size // 2, size], fill=fill)
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def test_dhash_merges_rescaled_copies_only():
+    pytest.importorskip("PIL")
+    small, large = image_dhash(_png(64, "black")), image_dhash(_png(200, "black"))
+    other = image_dhash(_png(64, "white"))
+    assert dhash_close(small, large, distance=4)
+    assert not dhash_close(small, other, distance=4)
+    assert image_dhash(b"not an image") is None
@@ -0,0 +1,73 @@
+import json
+
+from core.latency import LatencyTracker
+
+
+def _tracker(tmp_path, monkeypatch, **env):
+    for name in ("JD_ADAPTIVE_TIMEOUT", "JD_TIMEOUT_MIN_MS", "JD_TIMEOUT_MAX_MS", "JD_TIMEOUT_HEADROOM",
+                 "JD_LATENCY_MIN_SAMPLES", "JD_TIMEOUT_RAISE_RATIO", "JD_TIMEOUT_RAISE_STEP"):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, str(value))
+    return LatencyTracker(tmp_path / "latency.json")
+
+
+def test_percentile_over_successful_samples(tmp_path, monkeypatch):
+    t = _tracker(tmp_path, monkeypatch)
+    for ms in range(1, 101):
+        t.record("goto", ms / 1000.0)
+    assert t.percentile("goto", 50) == 51.0
+    assert t.percentile("goto", 95) == 95.0
+    assert t.percentile("missing", 95) is None
+
+
+def test_default_until_enough_samples(tmp_path, monkeypatch):
+    t = _tracker(tmp_path, monkeypatch, JD_LATENCY_MIN_SAMPLES=8)
+    for _ in range(7):
+        t.record("goto", 1.0)
+    assert t.timeout_ms("goto", 20000) == 20000
+    t.record("goto", 1.0)
+    assert t.timeout_ms("goto", 20000) == 2500
+
+
+def test_timeout_clamped_to_bounds(tmp_path, monkeypatch):
+    t = _tracker(tmp_path, monkeypatch, JD_TIMEOUT_MIN_MS=2000, JD_TIMEOUT_MAX_MS=60000)
+    for _ in range(10):
+        t.record("fast", 0.05)
+        t.record("slow", 50.0)
+    assert t.timeout_ms("fast", 8000) == 2000
+    assert t.timeout_ms("slow", 8000) == 60000
+
+
+def test_timeouts_raise_by_one_bounded_step(tmp_path, monkeypatch):
+    t = _tracker(tmp_path, monkeypatch, JD_TIMEOUT_RAISE_STEP=0.5)
+    for _ in range(20):
+        t.record("selector", 2.0)
+    base = t.timeout_ms("selector", 8000)
+    assert base == 5000
+    # 持续超时（如没有订单的年份）不会让超时逐次放大到上限
+    for _ in range(100):
+        t.record("selector", t.timeout_ms("selector", 8000) / 1000.0, timed_out=True)
+    assert t.timeout_ms("selector", 8000) == 7500
+    assert t.count("selector") == 20
+    assert t.attempts("selector") == 120
+
+
+def test_save_and_load_round_trip(tmp_path, monkeypatch):
+    t = _tracker(tmp_path, monkeypatch)
+    for _ in range(10):
+        t.record("goto", 0.5)
+    t.record("goto", 20.0, timed_out=True)
+    t.save()
+    loaded = _tracker(tmp_path, monkeypatch)
+    assert loaded.count("goto") == 10
+    assert loaded.attempts("goto") == 11
+    assert loaded.timeout_ms("goto", 20000) == t.timeout_ms("goto", 20000)
+
+
+def test_legacy_file_drops_timed_out_samples(tmp_path, monkeypatch):
+    legacy = {"kinds": {"goto": {"samples": [100] * 10 + [20000] * 5, "timeouts": [0] * 10 + [1] * 5}}}
+    (tmp_path / "latency.json").write_text(json.dumps(legacy), encoding="utf-8")
+    t = _tracker(tmp_path, monkeypatch)
+    assert t.percentile("goto", 95) == 100
+    assert round(t.timeout_ratio("goto"), 3) == 0.333
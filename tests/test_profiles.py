@@ -0,0 +1,62 @@
+import os
+
+from core.profiles import gc_profiles, maintain_profiles, trim_caches
+
+
+def _profile(root, name, cache_kb=0, code_kb=0):
+    path = root / name
+    for sub, kb in (("Default/Cache", cache_kb), ("Default/Code Cache", code_kb)):
+        (path / sub).mkdir(parents=True, exist_ok=True)
+        (path / sub / "data").write_bytes(b"x" * (kb * 1024))
+    (path / "auth.json").write_text("{}", encoding="utf-8")
+    (path / "Default" / "Cookies").write_bytes(b"c")
+    return path
+
+
+def test_trim_removes_largest_caches_until_within_budget(tmp_path):
+    path = _profile(tmp_path, "default", cache_kb=600, code_kb=300)
+    result = trim_caches(path, budget_bytes=400 * 1024)
+    assert result["removed"] == ["Default/Cache"]
+    assert not (path / "Default" / "Cache").exists()
+    assert (path / "Default" / "Code Cache").exists()
+    assert (path / "auth.json").exists() and (path / "Default" / "Cookies").exists()
+
+
+def test_trim_skips_profile_in_use(tmp_path):
+    path = _profile(tmp_path, "default", cache_kb=600)
+    os.symlink("host-1234", path / "SingletonLock")
+    result = trim_caches(path, budget_bytes=0)
+    assert result["skipped"] == "in_use"
+    assert (path / "Default" / "Cache").exists()
+
+
+def test_gc_keeps_latest_and_active(tmp_path):
+    active = _profile(tmp_path, "default_20200101_000000")
+    _profile(tmp_path, "default_20200201_000000")
+    _profile(tmp_path, "default_20200301_000000")
+    _profile(tmp_path, "default")
+    removed = gc_profiles(tmp_path, active, max_age_days=30, keep_latest=1)
+    assert [r["name"] for r in removed] == ["default_20200201_000000"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "default", "default_20200101_000000", "default_20200301_000000",
+    ]
+
+
+def test_dry_run_deletes_nothing(tmp_path):
+    _profile(tmp_path, "default", cache_kb=600)
+    _profile(tmp_path, "default_20200101_000000")
+    _profile(tmp_path, "default_20200201_000000")
+    summary = maintain_profiles(tmp_path, tmp_path / "default", cache_budget_mb=0, gc_days=30, dry_run=True)
+    assert [r["name"] for r in summary["removed_profiles"]] == ["default_20200101_000000"]
+    assert (tmp_path / "default_20200101_000000").exists()
+    assert "after" not in summary
+
+
+def test_startup_mode_skips_full_reports(tmp_path):
+    _profile(tmp_path, "default", cache_kb=2048)
+    _profile(tmp_path, "default_20200101_000000")
+    _profile(tmp_path, "default_20200201_000000")
+    summary = maintain_profiles(tmp_path, tmp_path / "default", cache_budget_mb=1, gc_days=30, report=False)
+    assert "before" not in summary and "after" not in summary
+    assert summary["trimmed"][0]["removed"] == ["Default/Cache"]
+    assert summary["removed_profiles"][0]["size_mb"] is None
@@ -0,0 +1,104 @@
+import time
+from email.utils import formatdate
+
+import pytest
+
+from core import ratelimit
+from core.ratelimit import RateLimiter, RateLimiterGroup, parse_retry_after
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_reserve_spaces_requests_after_burst(clock):
+    limiter = RateLimiter("page", 2.0, burst=3, jitter=None)
+    assert [limiter.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.reserve() == pytest.approx(2.0)
+    clock[0] += 10.0
+    # 空闲后令牌最多补回 burst 个
+    assert [limiter.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.reserve() == pytest.approx(2.0)
+
+
+def test_default_burst_keeps_one_interval_between_requests(clock):
+    limiter = RateLimiter("image", 1.5, jitter=None)
+    assert limiter.reserve() == 0.0
+    assert limiter.reserve() == pytest.approx(1.5)
+    assert limiter.reserve() == pytest.approx(3.0)
+
+
+def test_jitter_only_added_when_waiting(clock):
+    limiter = RateLimiter("detail", 1.0, jitter=(0.1, 0.1))
+    assert limiter.reserve() == 0.0
+    assert limiter.reserve() == pytest.approx(1.1)
+
+
+def test_backoff_is_capped_and_recovery_is_additive(clock):
+    limiter = RateLimiter("page", 1.0, backoff_max=3.0, recovery_step=0.5, jitter=None)
+    limiter.backoff(2.0)
+    assert limiter.interval == pytest.approx(2.0)
+    limiter.backoff(2.0)
+    assert limiter.multiplier == 3.0
+    limiter.recover()
+    assert limiter.multiplier == pytest.approx(2.5)
+    for _ in range(10):
+        limiter.recover()
+    assert limiter.multiplier == 1.0
+
+
+def test_retry_after_blocks_and_drops_burst(clock):
+    limiter = RateLimiter("image", 1.0, burst=3, jitter=None)
+    limiter.retry_after(5.0)
+    assert limiter.reserve() == pytest.approx(5.0)
+    clock[0] += 5.0
+    # 冷却结束后从空桶开始，不会马上放出积攒的突发
+    assert limiter.reserve() == pytest.approx(1.0)
+
+
+def test_zero_interval_never_waits(clock):
+    limiter = RateLimiter("page", 0.0)
+    limiter.backoff(5.0)
+    assert all(limiter.reserve() == 0.0 for _ in range(10))
+
+
+def test_zero_interval_still_honours_retry_after(clock):
+    limiter = RateLimiter("image", 0.0)
+    limiter.retry_after(5)
+    assert limiter.reserve() == pytest.approx(5.0)
+    clock[0] += 5.0
+    assert limiter.reserve() == 0.0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert 50 < parse_retry_after(formatdate(time.time() + 60, usegmt=True)) <= 60
+
+
+def test_group_persists_backoff_and_recovers_with_age(tmp_path):
+    path = tmp_path / "ratelimit.json"
+    group = RateLimiterGroup({"page": 1.0, "image": 0.5}, path, recovery_step=0.1)
+    group["page"].backoff(3.0)
+    group.save()
+
+    loaded = RateLimiterGroup({"page": 1.0, "image": 0.5}, path, recovery_step=0.1)
+    loaded.load()
+    assert loaded.multipliers() == {"page": 3.0, "image": 1.0}
+
+    limiter = RateLimiter("page", 1.0, recovery_step=0.1)
+    limiter.restore({"multiplier": 3.0}, elapsed_s=3600)
+    assert limiter.multiplier == pytest.approx(2.4)
+    limiter.restore({"multiplier": "bad"})
+    assert limiter.multiplier == pytest.approx(2.4)
+
+
+def test_group_unknown_kind_is_unlimited(tmp_path):
+    group = RateLimiterGroup({"page": 1.0}, tmp_path / "ratelimit.json")
+    assert group.get("other").reserve() == 0.0
+    assert group["other"] is group.get("other")
@@ -0,0 +1,96 @@
+import sqlite3
+
+from core.rollups import ORDER_DIMENSIONS, ensure_rollups, query_rollups
+from core.search_index import OrderIndex
+
+
+def _item(order_id, name, amount, status="已完成", shop="京东自营", date="2024-01-02 10:00:00", qty=1, split=False):
+    return {
+        "日期": date, "订单": order_id, "商品名称": name, "型号": "", "数量": qty, "下单金额": amount,
+        "姓名": "张三", "地址": "北京", "店铺": shop, "状态": status, "拆单标记": split,
+    }
+
+
+def _orders():
+    return [
+        _item("1001", "键盘", 199.0),
+        _item("1001", "鼠标", 199.0),  # 未拆单：整单金额的重复，不计入
+        _item("1002", "显示器", 999.0, shop="数码旗舰店", date="2024-02-03 09:00:00", qty=2),
+        _item("1003", "耳机", 88.0, split=True, date="2024-02-05 12:00:00"),
+        _item("1003", "耳机套", 12.0, split=True, date="2024-02-05 12:00:00"),
+    ]
+
+
+def _snapshot(index):
+    # 汇总读取结果，去掉与顺序无关的列表顺序差异
+    data = index.rollups(limit=100)
+    return {
+        "totals": data["totals"],
+        **{dim: sorted(tuple(sorted(r.items())) for r in data[dim]) for dim in ("month", "shop", "status", "sku")},
+    }
+
+
+def _rebuilt(index):
+    """同一份 items 从头回填得到的汇总，作为触发器增量维护结果的对照。"""
+    conn = sqlite3.connect(str(index.db_path))
+    try:
+        conn.execute("DELETE FROM rollup_meta")
+        conn.commit()
+        ensure_rollups(conn)
+    finally:
+        conn.close()
+    return _snapshot(OrderIndex(index.db_path))
+
+
+def test_rollups_follow_export_amount_rules(tmp_path):
+    index = OrderIndex(tmp_path / "index.sqlite3")
+    index.index_orders(_orders())
+    data = index.rollups()
+    assert data["totals"] == {"orders": 3, "cancelled": 0, "items": 5, "amount": 1298.0, "spend": 1298.0, "shops": 2}
+    assert {r["key"]: r["amount"] for r in data["month"]} == {"2024-01": 199.0, "2024-02": 1099.0}
+    assert {r["key"]: r["quantity"] for r in data["shop"]} == {"京东自营": 4, "数码旗舰店": 2}
+
+
+def test_reindex_same_rows_is_idempotent(tmp_path):
+    index = OrderIndex(tmp_path / "index.sqlite3")
+    index.index_orders(_orders())
+    first = _snapshot(index)
+    index.index_orders(_orders())
+    index.index_orders(_orders()[2:])
+    assert _snapshot(index) == first
+    assert _rebuilt(index) == first
+
+
+def test_status_change_moves_order_between_rollups(tmp_path):
+    index = OrderIndex(tmp_path / "index.sqlite3")
+    index.index_orders(_orders())
+    index.index_orders([_item("1002", "显示器", 999.0, status="已取消", shop="数码旗舰店",
+                              date="2024-02-03 09:00:00", qty=2)])
+    data = index.rollups()
+    assert data["totals"]["orders"] == 3
+    assert data["totals"]["cancelled"] == 1
+    assert data["totals"]["amount"] == 1298.0
+    assert data["totals"]["spend"] == 299.0
+    assert {r["key"]: r["orders"] for r in data["status"]} == {"已完成": 2, "已取消": 1}
+    shop = {r["key"]: r for r in data["shop"]}
+    assert shop["数码旗舰店"]["spend"] == 0 and shop["数码旗舰店"]["cancelled"] == 1
+    assert _rebuilt(index) == _snapshot(index)
+
+
+def test_deleting_items_empties_rollups(tmp_path):
+    index = OrderIndex(tmp_path / "index.sqlite3")
+    index.index_orders(_orders())
+    conn = index.connect()
+    try:
+        with conn:
+            conn.execute("DELETE FROM items WHERE order_id = '1001'")
+        data = query_rollups(conn)
+        assert data["totals"]["orders"] == 2
+        assert "键盘" not in {r["key"] for r in data["sku"]}
+        with conn:
+            conn.execute("DELETE FROM items")
+        for dim in ORDER_DIMENSIONS:
+            assert conn.execute(f"SELECT COUNT(*) FROM rollup_{dim}").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0] == 0
+    finally:
+        conn.close()
@@ -0,0 +1,68 @@
+import numpy as np
+
+from core.rows import ORDER_FIELDS, OrderItem, OrderRows, rows_to_frame
+
+
+def _record(order_id, name, amount="", qty=1, split=False, address=""):
+    return {
+        "日期": "2024-01-02 10:00:00", "订单": order_id, "商品名称": name, "型号": "", "数量": qty,
+        "下单金额": amount, "姓名": "张三", "地址": address, "店铺": "京东自营", "状态": "已完成",
+        "拆单标记": split, "商品图片": "",
+    }
+
+
+def test_from_records_round_trip():
+    records = [_record("1001", "键盘", 199.0), _record("1001", "鼠标", "暂无", qty="2"), _record("1002", "耳机")]
+    rows = OrderRows.from_records(records)
+    assert len(rows) == 3 and rows.order_count == 2
+    items = list(rows)
+    assert all(isinstance(item, OrderItem) for item in items)
+    assert [item.to_dict() for item in items] == [
+        {**records[0]}, {**records[1], "数量": 2}, {**records[2]},
+    ]
+    # 金额保持原始取值（浮点或原文）
+    assert rows.column("下单金额") == [199.0, "暂无", ""]
+
+
+def test_bad_quantity_and_missing_values_are_normalized():
+    rows = OrderRows()
+    rows.append(OrderItem(order_id="1001", quantity="x", receiver=None, is_split=1))
+    item = next(iter(rows))
+    assert item.quantity == 1 and item.receiver == "" and item.is_split
+
+
+def test_repeated_strings_are_interned():
+    rows = OrderRows()
+    for i in range(3):
+        rows.append(_record("".join(["10", "01"]), f"商品{i}", address="".join(["北京", "朝阳"])))
+    orders, addresses = rows.column("订单"), rows.column("地址")
+    assert orders[0] is orders[1] is orders[2]
+    assert addresses[0] is addresses[2]
+
+
+def test_fill_by_order():
+    rows = OrderRows.from_records([_record("1001", "键盘"), _record("1002", "耳机"), _record("1001", "鼠标")])
+    rows.fill_by_order("地址", {"1001": "".join(["北京", "朝阳"])})
+    assert rows.column("地址") == ["北京朝阳", "", "北京朝阳"]
+    assert rows.column("地址")[0] is rows.column("地址")[2]
+
+
+def test_to_frame_dtypes_and_append_afterwards():
+    rows = OrderRows.from_records([_record("1001", "键盘", 199.0, qty=2, split=True), _record("1002", "耳机")])
+    df = rows.to_frame()
+    assert list(df.columns) == list(ORDER_FIELDS)
+    assert df["数量"].dtype == np.int64 and df["数量"].tolist() == [2, 1]
+    assert df["拆单标记"].dtype == bool and df["拆单标记"].tolist() == [True, False]
+    # 转成 DataFrame 后累加器仍可继续追加，已生成的 DataFrame 不受影响
+    rows.append(_record("1003", "鼠标", qty=5))
+    assert len(rows) == 3 and len(df) == 2
+    assert rows.to_frame()["数量"].tolist() == [2, 1, 5]
+
+
+def test_empty_frame_and_rows_to_frame():
+    df = OrderRows().to_frame()
+    assert df.empty and list(df.columns) == list(ORDER_FIELDS)
+    assert df["数量"].dtype == np.int64 and df["拆单标记"].dtype == bool
+    records = [_record("1001", "键盘")]
+    assert rows_to_frame(records)["订单"].tolist() == ["1001"]
+    assert rows_to_frame(OrderRows.from_records(records))["订单"].tolist() == ["1001"]
@@ -0,0 +1,61 @@
+import pandas as pd
+
+from core.schema import AMOUNT_TEXT_COLUMN, amount_to_cents, apply_schema, cents_to_yuan, for_export
+
+
+def _rows(amounts):
+    return pd.DataFrame({
+        "日期": ["2024-01-02 10:00:00"] * len(amounts),
+        "订单": [str(1000 + i) for i in range(len(amounts))],
+        "下单金额": amounts,
+        "数量": [1] * len(amounts),
+        "店铺": ["京东自营"] * len(amounts),
+        "拆单标记": [False] * len(amounts),
+    })
+
+
+def test_amount_to_cents_parses_numbers_and_price_text():
+    cents = amount_to_cents(pd.Series([12.3, "12.30", "¥1,299.00", " 0.1 ", "", None], dtype=object))
+    assert cents.dtype == "Int64"
+    assert cents.tolist()[:4] == [1230, 1230, 129900, 10]
+    assert cents.isna().tolist()[4:] == [True, True]
+
+
+def test_cents_round_trip_without_float_drift():
+    cents = amount_to_cents(pd.Series([0.1, 0.2, 19.99]))
+    assert int(cents.sum()) == 2029
+    assert cents_to_yuan(cents).tolist() == [0.1, 0.2, 19.99]
+
+
+def test_apply_schema_types():
+    df = apply_schema(_rows([12.5, 3.0]))
+    assert df["下单金额"].tolist() == [1250, 300]
+    assert isinstance(df["店铺"].dtype, pd.CategoricalDtype)
+    assert str(df["数量"].dtype) == "Int32"
+    assert df["拆单标记"].dtype == bool
+    assert AMOUNT_TEXT_COLUMN not in df.columns
+
+
+def test_non_numeric_amount_text_is_kept():
+    # “暂无”之类的金额原样写进导出（之前的行为），不会变成空白
+    df = apply_schema(_rows([12.5, "暂无", ""]))
+    assert df["下单金额"].isna().tolist() == [False, True, True]
+    assert df[AMOUNT_TEXT_COLUMN].tolist()[1] == "暂无"
+    assert df[AMOUNT_TEXT_COLUMN].isna().tolist() == [True, False, True]
+
+    exported = for_export(df)
+    assert AMOUNT_TEXT_COLUMN not in exported.columns
+    assert exported["下单金额"].tolist() == [12.5, "暂无", None]
+
+    typed = for_export(df, keep_text_column=True)
+    assert str(typed["下单金额"].dtype) == "Float64"
+    assert typed[AMOUNT_TEXT_COLUMN].tolist()[1] == "暂无"
+
+
+def test_amount_text_survives_csv_round_trip(tmp_path):
+    path = tmp_path / "orders.csv"
+    for_export(apply_schema(_rows([12.5, "暂无"]))).to_csv(path, index=False)
+    back = pd.read_csv(path, dtype=str, keep_default_na=False)
+    assert back["下单金额"].tolist() == ["12.5", "暂无"]
+    again = for_export(apply_schema(back))
+    assert again["下单金额"].tolist() == [12.5, "暂无"]
@@ -0,0 +1,54 @@
+import pandas as pd
+
+from core.search_index import OrderIndex, search_orders
+
+
+def _rows():
+    return pd.DataFrame({
+        "日期": ["2024-01-02 10:00:00", "2024-01-02 10:00:00", "2024-03-01 08:00:00"],
+        "订单": ["1001", "1001", "1002"],
+        "商品名称": ["罗技无线机械键盘", "罗技无线鼠标", "100%纯棉毛巾"],
+        "型号": ["K1", "M1", ""],
+        "数量": [1, 2, 3],
+        "下单金额": [299.0, 299.0, 19.9],
+        "姓名": ["张三", "张三", "李四"],
+        "地址": ["北京市朝阳区", "北京市朝阳区", "上海市浦东新区"],
+        "店铺": ["罗技京东自营旗舰店", "罗技京东自营旗舰店", "京东超市"],
+        "拆单标记": [False, False, False],
+    })
+
+
+def test_index_normalizes_amounts_and_dedupes(tmp_path):
+    index = OrderIndex(tmp_path / "index.sqlite3")
+    assert index.index_orders(_rows()) == 3
+    assert index.index_orders(_rows()) == 3
+    assert index.stats()["items"] == 3 and index.stats()["orders"] == 2
+    by_name = {r["商品名称"]: r for r in index.search("罗技")}
+    # 未拆单的一单多商品只有首行带整单金额
+    assert by_name["罗技无线机械键盘"]["下单金额"] == 299.0
+    assert by_name["罗技无线鼠标"]["下单金额"] is None
+    assert by_name["罗技无线鼠标"]["数量"] == 2
+
+
+def test_search_terms_are_intersected(tmp_path):
+    index = OrderIndex(tmp_path / "index.sqlite3")
+    index.index_orders(_rows())
+    assert [r["商品名称"] for r in index.search("机械键盘 朝阳")] == ["罗技无线机械键盘"]
+    # 短于 trigram 的词走 LIKE；结果按下单时间倒序
+    assert [r["订单"] for r in index.search("京东")] == ["1002", "1001", "1001"]
+    assert index.search("键盘 上海") == []
+    assert index.search("   ") == []
+
+
+def test_like_wildcards_are_literal(tmp_path):
+    index = OrderIndex(tmp_path / "index.sqlite3")
+    index.index_orders(_rows())
+    assert [r["订单"] for r in index.search("0%")] == ["1002"]
+    assert index.search("_") == []
+
+
+def test_search_orders_reports_count(tmp_path):
+    OrderIndex(tmp_path / "index.sqlite3").index_orders(_rows())
+    result = search_orders("毛巾", db_path=tmp_path / "index.sqlite3")
+    assert result["count"] == 1 and result["results"][0]["姓名"] == "李四"
+    assert result["elapsed_ms"] >= 0
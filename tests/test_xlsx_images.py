@@ -0,0 +1,77 @@
+import io
+import zipfile
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from core.xlsx_images import StreamingImageEmbedder, normalize_image
+
+PIL = pytest.importorskip("PIL")
+
+
+def _image(color, fmt="PNG", size=20):
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", (size, size), color).save(buf, format=fmt)
+    return buf.getvalue()
+
+
+def _data_workbook(path, rows=4):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["订单", "商品名称", "下单金额", "商品图片"])
+    for i in range(rows):
+        ws.append(["1001" if i < 2 else str(1002 + i), f"商品{i}", 10.0 * (i + 1), f"https://img/{i}.png"])
+    # 与导出一致：同一订单的订单号/金额单元格合并
+    ws.merge_cells("A2:A3")
+    ws.merge_cells("C2:C3")
+    ws["B6"].hyperlink = "https://item.jd.com/1.html"
+    wb.save(path)
+
+
+def test_streamed_workbook_opens_with_merged_cells_and_images(tmp_path):
+    data_path = tmp_path / "orders.data.xlsx"
+    out_path = tmp_path / "orders.xlsx"
+    _data_workbook(data_path)
+    red, blue = _image("red"), _image("blue", fmt="JPEG")
+    with StreamingImageEmbedder(out_path, column=3) as emb:
+        assert emb.add(1, "red", red)
+        assert emb.add(2, "red")  # 同一 key 复用已写入的图片
+        assert emb.add(3, "blue", blue)
+        assert emb.add(4, "red-copy", red)  # 不同 key、相同内容只存一份
+        emb.finish(data_path)
+
+    with zipfile.ZipFile(out_path) as z:
+        assert z.testzip() is None
+        media = sorted(n for n in z.namelist() if n.startswith("xl/media/"))
+        assert media == ["xl/media/image1.png", "xl/media/image2.jpeg"]
+        assert all(z.getinfo(n).compress_type == zipfile.ZIP_STORED for n in media)
+
+    wb = load_workbook(out_path)
+    ws = wb.active
+    assert sorted(str(r) for r in ws.merged_cells.ranges) == ["A2:A3", "C2:C3"]
+    assert ws["A2"].value == "1001" and ws["C2"].value == 10.0
+    assert ws["B6"].hyperlink.target == "https://item.jd.com/1.html"
+    anchors = sorted((img.anchor._from.row, img.anchor._from.col) for img in ws._images)
+    assert anchors == [(1, 3), (2, 3), (3, 3), (4, 3)]
+
+
+def test_no_images_copies_data_workbook(tmp_path):
+    data_path = tmp_path / "orders.data.xlsx"
+    out_path = tmp_path / "orders.xlsx"
+    _data_workbook(data_path, rows=2)
+    with StreamingImageEmbedder(out_path, column=3) as emb:
+        assert not emb.add(1, "broken", b"not an image")
+        emb.finish(data_path)
+    ws = load_workbook(out_path).active
+    assert ws._images == []
+    assert sorted(str(r) for r in ws.merged_cells.ranges) == ["A2:A3", "C2:C3"]
+
+
+def test_normalize_image_converts_unsupported_formats():
+    assert normalize_image(_image("red"))[1] == "png"
+    assert normalize_image(_image("red", fmt="JPEG"))[1] == "jpeg"
+    payload, ext = normalize_image(_image("red", fmt="WEBP"))
+    assert ext == "png" and payload.startswith(b"\x89PNG")
+    assert normalize_image(b"") is None